@@ -2,25 +2,29 @@
 import os
 import json
 import secrets
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
+from connect4_core import Position, to_bigint
+
 # =========================
 # Config
 # =========================
 PORT = int(os.environ.get("PORT", "8000"))
 
 
-def db_conn():
+def database_url():
     """
     Render: mets DATABASE_URL dans Environment.
-    On force sslmode=require (Render Postgres).
     On normalise postgres:// -> postgresql:// (compat psycopg2).
     """
     url = os.environ.get("DATABASE_URL")
@@ -31,8 +35,57 @@ def db_conn():
 
     if url.startswith("postgres://"):
         url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def db_conn():
+    """Connexion dédiée. On force sslmode=require (Render Postgres)."""
+    return psycopg2.connect(database_url(), sslmode="require")
+
+
+# Pool pour les endpoints appelés à chaque coup (explorer). Créé une seule fois
+# (au démarrage, ou au 1er appel sous verrou). Le threadpool FastAPI a ~40
+# threads pour POOL_MAX connexions: le sémaphore fait attendre une requête
+# au lieu de lever PoolError quand le pool est épuisé.
+POOL_MAX = 8
+_POOL = None
+_POOL_LOCK = threading.Lock()
+_POOL_SLOTS = threading.BoundedSemaphore(POOL_MAX)
+
+
+def get_pool():
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadedConnectionPool(
+                    1, POOL_MAX, database_url(), sslmode="require"
+                )
+    return _POOL
 
-    return psycopg2.connect(url, sslmode="require")
+
+@contextmanager
+def pooled_conn():
+    """
+    Connexion réutilisée (pool) : évite le handshake TCP+SSL d'un db_conn()
+    par requête. Une connexion cassée (OperationalError / InterfaceError)
+    est fermée au lieu d'être rendue au pool.
+    """
+    pool = get_pool()
+    with _POOL_SLOTS:
+        conn = pool.getconn()
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn, close=broken or bool(conn.closed))
 
 
 def now_utc_iso():
@@ -112,8 +165,33 @@ ALTER TABLE saved_games
 
 -- 4) Index: seulement si la colonne existe (elle existe après l'ALTER ci-dessus)
 CREATE INDEX IF NOT EXISTS idx_saved_games_created_at ON saved_games(created_at DESC);
+
+-- 5) Opening explorer : agrégats précalculés par (position canonique, colonne)
+--    position_hash = Zobrist canonique (connect4_core, miroir gauche/droite fusionné)
+--    col = colonne dans le repère canonique
+CREATE TABLE IF NOT EXISTS explorer_stats (
+  rows_count INT NOT NULL,
+  cols_count INT NOT NULL,
+  position_hash BIGINT NOT NULL,
+  col INT NOT NULL,
+  games INT NOT NULL DEFAULT 0,
+  red_wins INT NOT NULL DEFAULT 0,
+  yellow_wins INT NOT NULL DEFAULT 0,
+  draws INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (rows_count, cols_count, position_hash, col)
+);
+
+ALTER TABLE saved_games
+  ADD COLUMN IF NOT EXISTS explorer_indexed BOOLEAN NOT NULL DEFAULT FALSE;
+
+CREATE INDEX IF NOT EXISTS idx_saved_games_explorer_pending
+  ON saved_games(game_id) WHERE NOT explorer_indexed;
 """
 
+EXPLORER_BATCH = 500
+# parties ajoutées par les imports (bga_*, fill_db_random) intégrées toutes les N s
+EXPLORER_REFRESH_SECONDS = float(os.environ.get("EXPLORER_REFRESH_SECONDS", "60"))
+
 
 def init_db():
     with db_conn() as conn:
@@ -122,6 +200,137 @@ def init_db():
         conn.commit()
 
 
+# =========================
+# Opening explorer (agrégats)
+# =========================
+def explorer_rows_for_game(rows, cols, starting_color, moves, winner=None):
+    """
+    Une ligne (rows, cols, hash_canonique, col_canonique, 1, r, y, d) par coup
+    joué. Retourne [] si la partie n'a pas de résultat (en cours / illégale).
+    """
+    try:
+        pos = Position(int(rows), int(cols), starting_color or "R")
+        keys = []
+        for col in moves:
+            col = int(col)
+            canon_col = pos.cols - 1 - col if pos.is_mirrored_canonical() else col
+            keys.append((pos.canonical_hash(), canon_col))
+            pos.play(col)
+            if pos.winner() is not None:
+                break
+    except (ValueError, TypeError):
+        return []
+
+    result = winner if winner in ("R", "Y", "D") else pos.winner()
+    if result not in ("R", "Y", "D"):
+        return []
+
+    r, y, d = int(result == "R"), int(result == "Y"), int(result == "D")
+    return [
+        (pos.rows, pos.cols, to_bigint(h), c, 1, r, y, d) for h, c in keys
+    ]
+
+
+def aggregate_explorer_rows(values):
+    """(rows, cols, hash, col) -> [games, red, yellow, draws] (plusieurs parties
+    peuvent passer par la même position -> on pré-agrège avant l'upsert)."""
+    agg = {}
+    for rows, cols, h, c, g, r, y, d in values:
+        k = (rows, cols, h, c)
+        a = agg.get(k)
+        if a is None:
+            agg[k] = [g, r, y, d]
+        else:
+            a[0] += g
+            a[1] += r
+            a[2] += y
+            a[3] += d
+    return agg
+
+
+def upsert_explorer_rows(cur, values):
+    if not values:
+        return
+    agg = aggregate_explorer_rows(values)
+    execute_values(
+        cur,
+        """
+        INSERT INTO explorer_stats(rows_count, cols_count, position_hash, col,
+                                   games, red_wins, yellow_wins, draws)
+        VALUES %s
+        ON CONFLICT (rows_count, cols_count, position_hash, col) DO UPDATE SET
+          games = explorer_stats.games + EXCLUDED.games,
+          red_wins = explorer_stats.red_wins + EXCLUDED.red_wins,
+          yellow_wins = explorer_stats.yellow_wins + EXCLUDED.yellow_wins,
+          draws = explorer_stats.draws + EXCLUDED.draws
+        """,
+        [(*k, *a) for k, a in agg.items()],
+        page_size=1000,
+    )
+
+
+def refresh_explorer_stats():
+    """
+    Intègre aux agrégats les parties pas encore indexées (explorer_indexed = FALSE).
+    Incrémental : chaque partie n'est lue qu'une seule fois.
+    """
+    total = 0
+    with db_conn() as conn:
+        while True:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    """
+                    SELECT game_id, rows_count, cols_count, starting_color, winner, moves
+                    FROM saved_games
+                    WHERE NOT explorer_indexed
+                    ORDER BY game_id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    (EXPLORER_BATCH,),
+                )
+                games = cur.fetchall()
+                if not games:
+                    break
+
+                values = []
+                for g in games:
+                    if g["rows_count"] and g["cols_count"]:
+                        values.extend(
+                            explorer_rows_for_game(
+                                g["rows_count"],
+                                g["cols_count"],
+                                g["starting_color"],
+                                g["moves"] or [],
+                                g["winner"],
+                            )
+                        )
+                upsert_explorer_rows(cur, values)
+                cur.execute(
+                    "UPDATE saved_games SET explorer_indexed = TRUE WHERE game_id = ANY(%s)",
+                    ([g["game_id"] for g in games],),
+                )
+            conn.commit()
+            total += len(games)
+    return total
+
+
+_EXPLORER_STOP = threading.Event()
+
+
+def explorer_refresh_loop(every: float = EXPLORER_REFRESH_SECONDS, stop=_EXPLORER_STOP):
+    """Thread de fond: refresh_explorer_stats tout de suite puis toutes les `every` s."""
+    while True:
+        try:
+            n = refresh_explorer_stats()
+            if n:
+                print(f"explorer: {n} parties indexées")
+        except Exception as e:
+            print(f"⚠️ explorer: refresh échoué ({e})")
+        if stop.wait(every):
+            return
+
+
 # =========================
 # Game logic (connect4)
 # =========================
@@ -204,6 +413,14 @@ if os.path.isdir("public"):
 @app.on_event("startup")
 def _startup():
     init_db()
+    get_pool()
+    # hors du démarrage: l'API répond pendant le rattrapage des anciennes parties
+    threading.Thread(target=explorer_refresh_loop, name="explorer-refresh", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def _shutdown():
+    _EXPLORER_STOP.set()
 
 
 @app.get("/api/health")
@@ -491,10 +708,12 @@ def save_game(req: SaveReq):
                 """
                 INSERT INTO saved_games(
                   user_id, save_name, game_index, rows_count, cols_count, starting_color,
-                  ai_mode, ai_depth, game_mode, status, winner, view_index, moves, player_red, player_yellow
+                  ai_mode, ai_depth, game_mode, status, winner, view_index, moves, player_red, player_yellow,
+                  explorer_indexed
                 ) VALUES (
                   %s,%s,%s,%s,%s,%s,
-                  %s,%s,%s,%s,%s,%s,%s,%s,%s
+                  %s,%s,%s,%s,%s,%s,%s,%s,%s,
+                  TRUE
                 )
                 RETURNING game_id
                 """,
@@ -517,6 +736,17 @@ def save_game(req: SaveReq):
                 ),
             )
             gid = cur.fetchone()["game_id"]
+
+            upsert_explorer_rows(
+                cur,
+                explorer_rows_for_game(
+                    req.rows_count,
+                    req.cols_count,
+                    req.starting_color,
+                    req.moves,
+                    req.winner,
+                ),
+            )
         conn.commit()
     return {"game_id": gid}
 
@@ -548,3 +778,66 @@ def get_game(game_id: int):
             if not g:
                 raise HTTPException(404, "Partie introuvable.")
     return g
+
+
+# =========================
+# Opening explorer
+# =========================
+@app.get("/api/explorer")
+def explorer(rows: int = 9, cols: int = 9, moves: str = "", starting_color: str = "R"):
+    """
+    Statistiques par colonne candidate pour la position atteinte après `moves`
+    (colonnes 0-based séparées par des virgules, ex: "4,4,3").
+    Une seule lecture indexée sur explorer_stats (jamais de scan de saved_games).
+    """
+    rows = max(4, min(20, int(rows)))
+    cols = max(4, min(20, int(cols)))
+    starting = starting_color if starting_color in ("R", "Y") else "R"
+
+    try:
+        played = [int(x) for x in moves.split(",") if x.strip() != ""]
+        pos = Position.from_moves(rows, cols, played, starting)
+    except ValueError as e:
+        raise HTTPException(400, f"Coups invalides: {e}")
+
+    mirrored = pos.is_mirrored_canonical()
+    position_hash = to_bigint(pos.canonical_hash())
+
+    with pooled_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT col, games, red_wins, yellow_wins, draws
+                FROM explorer_stats
+                WHERE rows_count=%s AND cols_count=%s AND position_hash=%s
+                """,
+                (rows, cols, position_hash),
+            )
+            stats = cur.fetchall()
+
+    candidates = []
+    for col, games, red, yellow, draws in stats:
+        real_col = cols - 1 - col if mirrored else col
+        if not pos.can_play(real_col) or games <= 0:
+            continue
+        candidates.append(
+            {
+                "col": real_col,
+                "games": games,
+                "red_rate": red / games,
+                "yellow_rate": yellow / games,
+                "draw_rate": draws / games,
+            }
+        )
+    candidates.sort(key=lambda c: (-c["games"], c["col"]))
+
+    return {
+        "rows": rows,
+        "cols": cols,
+        "moves": played,
+        "to_move": pos.to_move,
+        # string: un entier 64 bits n'est pas représentable exactement en JS
+        "position_hash": str(position_hash),
+        "total_games": sum(c["games"] for c in candidates),
+        "candidates": candidates,
+    }
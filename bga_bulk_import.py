@@ -0,0 +1,260 @@
+"""
+bga_bulk_import.py
+============================================================
+Import en masse du dossier scraped_moves/ vers saved_games
+✅ Lit moves_*_table_*.json (bga_to_db) et bga_table_*.json (bga_loader)
+✅ Parse + normalise en parallèle (process pool, mêmes règles que bga_import)
+✅ Dédoublonne dans le lot puis contre la base (requête ensembliste)
+✅ Chargement via COPY dans une table temporaire, gros commits
+✅ Reprenable: les fichiers déjà traités sont notés dans un manifeste
+✅ Chaque partie est rejouée (coups illégaux refusés, gagnant + hash final stockés)
+============================================================
+
+Usage:
+    python bga_bulk_import.py --dir scraped_moves --workers 8
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+from bga_import import (
+    _ensure_schema_once,
+    _extract_cols_from_moves,
+    _normalize_cols,
+    db_connect,
+)
+from connect4_core import replay_game, to_bigint
+
+PROJECT_DIR = Path(__file__).resolve().parent
+DEFAULT_DIR = PROJECT_DIR / "scraped_moves"
+MANIFEST_NAME = ".bulk_import_done.txt"
+
+CONFIANCE = 3  # 3=BGA/humain (comme bga_to_db)
+
+TABLE_RE = re.compile(r"table_(\d+)")
+MOVES_FILE_RE = re.compile(r"^moves_(.+)_(\d+)_table_(\d+)\.json$")
+
+STAGING_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS bga_bulk_staging (
+    save_name VARCHAR(100),
+    rows INTEGER,
+    cols INTEGER,
+    moves JSONB,
+    distinct_cols INTEGER,
+    winner CHAR(1),
+    win_ply INTEGER,
+    final_hash BIGINT
+) ON COMMIT DELETE ROWS;
+"""
+
+COPY_SQL = """
+COPY bga_bulk_staging
+  (save_name, rows, cols, moves, distinct_cols, winner, win_ply, final_hash)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+INSERT_SQL = """
+INSERT INTO saved_games
+  (save_name, rows, cols, starting_color, mode, game_index,
+   moves, view_index, ai_mode, ai_depth, confidence, distinct_cols,
+   winner, win_ply, final_hash, save_date)
+SELECT s.save_name, s.rows, s.cols, 'R', 2, 1,
+       s.moves, 0, 'bga', 4, %s, s.distinct_cols,
+       s.winner, s.win_ply, s.final_hash, NOW()
+FROM bga_bulk_staging s
+WHERE NOT EXISTS (
+    SELECT 1 FROM saved_games g
+    WHERE g.rows = s.rows AND g.cols = s.cols AND g.moves = s.moves
+);
+"""
+
+
+# =======================
+# Parsing (workers)
+# =======================
+def parse_file(path: str):
+    """
+    Retourne (nom_fichier, row | None, erreur | None) avec
+    row = (save_name, rows, cols, cols_0_based, replay).
+    """
+    name = os.path.basename(path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        m = TABLE_RE.search(name)
+        table_id = m.group(1) if m else None
+
+        if isinstance(data, dict):
+            # bga_loader: {"table_id", "moves" (déjà 0-based), "size": [rows, cols]}
+            rows, cols = data.get("size") or (9, 9)
+            rows, cols = int(rows), int(cols)
+            table_id = str(data.get("table_id") or table_id)
+            cols_0 = _extract_cols_from_moves(data.get("moves"))
+            if cols_0 and (min(cols_0) < 0 or max(cols_0) > cols - 1):
+                raise ValueError(
+                    f"Colonnes incohérentes: min={min(cols_0)}, max={max(cols_0)}, cols_count={cols}"
+                )
+            save_name = f"BGA_table_{table_id}"
+        else:
+            # bga_to_db: liste brute (1-based gamereview ou 0-based archive)
+            rows, cols = 9, 9
+            cols_0 = _normalize_cols(_extract_cols_from_moves(data), cols_count=cols)
+            mf = MOVES_FILE_RE.match(name)
+            if mf:
+                save_name = f"BGA_table_{mf.group(3)}_from_{mf.group(1)}"
+            else:
+                save_name = f"BGA_table_{table_id}"
+
+        if not cols_0:
+            raise ValueError("Aucun coup valide à importer.")
+        replay = replay_game(rows, cols, cols_0, "R")
+        return name, (save_name[:100], rows, cols, cols_0, replay), None
+    except Exception as e:
+        return name, None, str(e)[:300]
+
+
+# =======================
+# Manifeste (reprise)
+# =======================
+def load_manifest(path: Path) -> set:
+    if not path.exists():
+        return set()
+    return {
+        line.strip()
+        for line in path.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    }
+
+
+def append_manifest(path: Path, names):
+    with open(path, "a", encoding="utf-8") as f:
+        for n in names:
+            f.write(n + "\n")
+
+
+# =======================
+# Chargement DB
+# =======================
+def load_chunk(
+    conn, rows_batch, confidence: int, insert_sql: str = INSERT_SQL, commit: bool = True
+) -> int:
+    """
+    COPY d'un lot dans la table temporaire puis insertion sans doublons.
+    commit=False: l'appelant termine la transaction (ex: avec son watermark).
+    """
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    for save_name, rows, cols, cols_0, replay in rows_batch:
+        w.writerow(
+            (
+                save_name,
+                rows,
+                cols,
+                json.dumps(cols_0, separators=(",", ":")),
+                len(set(cols_0)),
+                replay["winner"] or "",  # "" = NULL en CSV
+                "" if replay["win_ply"] is None else replay["win_ply"],
+                to_bigint(replay["final_hash"]),
+            )
+        )
+    buf.seek(0)
+
+    with conn.cursor() as cur:
+        cur.execute(STAGING_SQL)
+        cur.copy_expert(COPY_SQL, buf)
+        cur.execute(insert_sql, (int(confidence),))
+        inserted = cur.rowcount
+        cur.execute("TRUNCATE bga_bulk_staging")
+    if commit:
+        conn.commit()
+    return inserted
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Import en masse de scraped_moves/ vers saved_games"
+    )
+    ap.add_argument("--dir", default=str(DEFAULT_DIR))
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunk", type=int, default=5000, help="fichiers par transaction")
+    ap.add_argument("--confidence", type=int, default=CONFIANCE)
+    ap.add_argument(
+        "--restart",
+        action="store_true",
+        help="ignore le manifeste et retraite tous les fichiers",
+    )
+    args = ap.parse_args(argv)
+
+    src = Path(args.dir)
+    manifest = src / MANIFEST_NAME
+    if args.restart and manifest.exists():
+        manifest.unlink()
+    done = load_manifest(manifest)
+
+    paths = sorted(
+        str(p)
+        for pattern in ("moves_*_table_*.json", "bga_table_*.json")
+        for p in src.glob(pattern)
+        if p.name not in done
+    )
+    print(f"📁 {len(paths)} fichiers à traiter ({len(done)} déjà faits) dans {src}")
+    if not paths:
+        return
+
+    t0 = time.perf_counter()
+    seen = set()  # (rows, cols, coups) -> dédoublonnage dans le lot
+    batch, batch_names = [], []
+    n_files = n_inserted = n_dups = n_errors = 0
+
+    def flush(conn):
+        nonlocal n_inserted, batch, batch_names
+        if batch:
+            n_inserted += load_chunk(conn, batch, args.confidence)
+        else:
+            conn.commit()
+        append_manifest(manifest, batch_names)
+        batch, batch_names = [], []
+        rate = n_files / (time.perf_counter() - t0)
+        print(
+            f"✅ {n_files}/{len(paths)} fichiers ({rate:,.0f} fichiers/s), "
+            f"insérées={n_inserted}, doublons={n_dups}, erreurs={n_errors}"
+        )
+
+    with db_connect() as conn, Pool(max(1, args.workers)) as pool:
+        _ensure_schema_once(conn)
+        for name, row, err in pool.imap_unordered(parse_file, paths, chunksize=64):
+            n_files += 1
+            batch_names.append(name)
+            if err:
+                n_errors += 1
+                if n_errors <= 20:
+                    print(f"   ⚠️ {name}: {err}")
+            else:
+                key = (row[1], row[2], tuple(row[3]))
+                if key in seen:
+                    n_dups += 1
+                else:
+                    seen.add(key)
+                    batch.append(row)
+
+            if len(batch_names) >= args.chunk:
+                flush(conn)
+        flush(conn)
+
+    dt = time.perf_counter() - t0
+    print(
+        f"🎉 Terminé: {n_files} fichiers en {dt:.1f}s ({n_files / dt:,.0f} fichiers/s), "
+        f"{n_inserted} parties insérées."
+    )
+
+
+if __name__ == "__main__":
+    main()
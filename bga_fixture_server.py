@@ -0,0 +1,105 @@
+"""
+bga_fixture_server.py
+============================================================
+Faux BGA local qui sert les pages enregistrées de fixtures/bga/
+✅ Mêmes URLs que le vrai site (le scraper ne change que BASE)
+✅ Route selon le chemin + l'id passé en query string:
+     /gamepanel?game=...          -> gamepanel.html
+     /gamestats?player=P&...      -> gamestats_P.html
+     /table?table=T               -> table_T.html
+     /gamereview?table=T          -> gamereview_T.html
+     /archive/replay/...?table=T  -> replay_T.html
+     /                            -> index.html
+✅ Utilisable en ligne de commande ou depuis les tests (port 0 = libre)
+============================================================
+
+Usage (crawl complet hors-ligne, Chrome requis pour la découverte):
+    python bga_fixture_server.py --port 8765
+    python bga_to_db.py --base-url http://127.0.0.1:8765 --no-login --workers 2
+"""
+
+import argparse
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+PROJECT_DIR = Path(__file__).resolve().parent
+DEFAULT_FIXTURES_DIR = PROJECT_DIR / "fixtures" / "bga"
+DEFAULT_PORT = 8765
+
+# chemin -> (paramètre de query servant d'id, préfixe du fichier)
+ROUTES = {
+    "/gamepanel": (None, "gamepanel"),
+    "/gamestats": ("player", "gamestats"),
+    "/table": ("table", "table"),
+    "/gamereview": ("table", "gamereview"),
+    "/archive/replay": ("table", "replay"),
+    "/": (None, "index"),
+}
+
+
+def fixture_name(url_path: str) -> str | None:
+    """Nom du fichier de fixture pour une URL BGA (None si route inconnue)."""
+    u = urlparse(url_path)
+    path = u.path.rstrip("/") or "/"
+    if path.startswith("/archive/replay"):
+        path = "/archive/replay"
+    route = ROUTES.get(path)
+    if route is None:
+        return None
+    param, prefix = route
+    if param is None:
+        return f"{prefix}.html"
+    value = (parse_qs(u.query).get(param) or [""])[0]
+    if not value.isdigit():
+        return None
+    return f"{prefix}_{value}.html"
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    fixtures_dir = DEFAULT_FIXTURES_DIR
+
+    def do_GET(self):
+        name = fixture_name(self.path)
+        path = self.fixtures_dir / name if name else None
+        if path is None or not path.is_file():
+            self.send_error(404, "fixture absente")
+            return
+        body = path.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # silencieux (tests)
+
+
+def start_server(fixtures_dir=DEFAULT_FIXTURES_DIR, port: int = 0):
+    """Démarre le serveur dans un thread. Retourne (server, base_url)."""
+    handler = type("Handler", (FixtureHandler,), {"fixtures_dir": Path(fixtures_dir)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Faux BGA local (pages de fixtures/bga/)")
+    ap.add_argument("--dir", default=str(DEFAULT_FIXTURES_DIR))
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = ap.parse_args(argv)
+
+    server, base = start_server(args.dir, args.port)
+    print(f"🧪 Fixtures {args.dir} servies sur {base} (Ctrl+C pour arrêter)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
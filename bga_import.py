@@ -7,14 +7,20 @@ Import de parties Connect4 scrapées sur BGA vers PostgreSQL
 ✅ Normalise les coups en colonnes 0-based (0..cols-1)
 ✅ Calcule distinct_cols
 ✅ Evite les doublons (même moves JSONB + rows/cols)
+✅ Import par lot: 1 connexion, 1 transaction, dédoublonnage ensembliste
+✅ Rejoue chaque partie (connect4_core): coups illégaux refusés,
+   gagnant / coup gagnant / hash final stockés avec la partie
 ============================================================
 """
 
 import json
 import hashlib
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import psycopg2
+from psycopg2.extras import execute_values
+
+from connect4_core import replay_game, to_bigint
 
 
 # =======================
@@ -32,11 +38,17 @@ DB_CONFIG = {
 # =======================
 # DB helpers
 # =======================
+INSERT_CHUNK = 500
+
+# Le DDL n'est exécuté qu'une fois par process (voir _ensure_schema_once)
+_SCHEMA_READY = False
+
+
 def db_connect():
     return psycopg2.connect(**DB_CONFIG)
 
 
-def ensure_saved_games_table():
+def ensure_saved_games_table(conn=None):
     """
     Table compatible avec game.py + database_viewer.py
     + Ajoute confidence / distinct_cols si manquants.
@@ -71,8 +83,25 @@ def ensure_saved_games_table():
     ALTER TABLE saved_games
         ADD COLUMN IF NOT EXISTS distinct_cols INTEGER NOT NULL DEFAULT 0
         CHECK (distinct_cols BETWEEN 0 AND 20);
+
+    ALTER TABLE saved_games
+        ADD COLUMN IF NOT EXISTS winner CHAR(1)
+        CHECK (winner IN ('R', 'Y', 'D'));
+
+    ALTER TABLE saved_games
+        ADD COLUMN IF NOT EXISTS win_ply INTEGER;
+
+    ALTER TABLE saved_games
+        ADD COLUMN IF NOT EXISTS final_hash BIGINT;
     """
 
+    if conn is not None:
+        with conn.cursor() as cur:
+            cur.execute(create_sql)
+            cur.execute(alter_sql)
+        conn.commit()
+        return
+
     with db_connect() as conn:
         with conn.cursor() as cur:
             cur.execute(create_sql)
@@ -80,6 +109,13 @@ def ensure_saved_games_table():
         conn.commit()
 
 
+def _ensure_schema_once(conn):
+    global _SCHEMA_READY
+    if not _SCHEMA_READY:
+        ensure_saved_games_table(conn)
+        _SCHEMA_READY = True
+
+
 # =======================
 # Normalisation moves
 # =======================
@@ -147,28 +183,19 @@ def _moves_signature(cols_0_based: List[int]) -> str:
 # =======================
 # API principale
 # =======================
-def import_bga_moves(
+def _prepare_game(
     moves: List[Dict[str, Any]],
     rows: int = 9,
     cols: int = 9,
     confiance: int = 3,
     save_name: Optional[str] = None,
     starting_color: str = "R",
-) -> int:
+) -> Tuple:
     """
-    Insère une partie BGA dans saved_games.
-
-    - mode=2 (humain vs humain)
-    - ai_mode="bga"
-    - ai_depth=4 (valeur neutre)
-    - view_index=0
-    - game_index=1 (ne sert pas trop dans le viewer)
-    - confidence (0..5) -> on passe confiance=3 pour BGA
-
-    Retourne l'id en base (existant si doublon, sinon nouvel id).
+    Normalise + rejoue une partie -> tuple prêt pour l'INSERT.
+    Lève ValueError si invalide (colonnes incohérentes, colonne pleine,
+    coups après la victoire). Une partie tronquée passe avec winner=NULL.
     """
-    ensure_saved_games_table()
-
     if starting_color not in ("R", "Y"):
         starting_color = "R"
 
@@ -177,6 +204,8 @@ def import_bga_moves(
     if not cols_0:
         raise ValueError("Aucun coup valide à importer.")
 
+    replay = replay_game(rows, cols, cols_0, starting_color)
+
     distinct_cols = len(set(cols_0))
     signature = _moves_signature(cols_0)
 
@@ -187,50 +216,170 @@ def import_bga_moves(
     if not save_name:
         save_name = f"BGA_{rows}x{cols}_{signature[:12]}"
 
-    # Anti doublon: même rows/cols + moves identiques
-    select_dup = """
-    SELECT id
-    FROM saved_games
-    WHERE rows = %s AND cols = %s AND moves = %s::jsonb
-    LIMIT 1;
+    return (
+        save_name,
+        int(rows),
+        int(cols),
+        starting_color,
+        2,  # mode=2 (H vs H)
+        1,  # game_index
+        moves_json,
+        0,  # view_index
+        "bga",
+        4,  # ai_depth (neutre)
+        int(confiance),
+        int(distinct_cols),
+        replay["winner"],
+        replay["win_ply"],
+        to_bigint(replay["final_hash"]),
+    )
+
+
+def import_bga_moves_many(
+    games: Iterable[Dict[str, Any]],
+    conn=None,
+    skip_invalid: bool = False,
+) -> List[Optional[int]]:
     """
+    Insère un lot de parties BGA dans saved_games.
 
-    insert_sql = """
-    INSERT INTO saved_games
-      (save_name, rows, cols, starting_color, mode, game_index,
-       moves, view_index, ai_mode, ai_depth, confidence, distinct_cols, save_date)
-    VALUES
-      (%s, %s, %s, %s, %s, %s,
-       %s::jsonb, %s, %s, %s, %s, %s, NOW())
-    RETURNING id;
+    Chaque élément de `games` prend les mêmes clés que les paramètres de
+    import_bga_moves: {"moves", "rows", "cols", "confiance", "save_name",
+    "starting_color"}.
+
+    - une seule connexion (celle passée en paramètre, sinon une nouvelle)
+    - schéma vérifié une fois par process
+    - doublons (base + lot) détectés par UNE requête ensembliste
+    - insertion par paquets de INSERT_CHUNK lignes, un seul commit
+
+    Retourne les ids dans l'ordre des parties (existant si doublon).
+    skip_invalid=True -> None pour une partie invalide au lieu de lever ValueError.
     """
+    prepared: List[Optional[Tuple]] = []
+    for g in games:
+        try:
+            prepared.append(_prepare_game(**g))
+        except ValueError:
+            if not skip_invalid:
+                raise
+            prepared.append(None)
+
+    ids: List[Optional[int]] = [None] * len(prepared)
+    valid = [i for i, p in enumerate(prepared) if p is not None]
+    if not valid:
+        return ids
+
+    own_conn = conn is None
+    if own_conn:
+        conn = db_connect()
+    try:
+        _ensure_schema_once(conn)
+
+        # Anti doublon: même rows/cols + moves identiques (1 requête pour tout le lot)
+        select_dup = """
+        SELECT k.idx, MIN(g.id)
+        FROM unnest(%s::int[], %s::int[], %s::jsonb[], %s::int[])
+             AS k(rows, cols, moves, idx)
+        JOIN saved_games g
+          ON g.rows = k.rows AND g.cols = k.cols AND g.moves = k.moves
+        GROUP BY k.idx;
+        """
+
+        insert_sql = """
+        INSERT INTO saved_games
+          (save_name, rows, cols, starting_color, mode, game_index,
+           moves, view_index, ai_mode, ai_depth, confidence, distinct_cols,
+           winner, win_ply, final_hash, save_date)
+        VALUES %s
+        RETURNING id;
+        """
+        template = (
+            "(%s, %s, %s, %s, %s, %s, %s::jsonb, %s, %s, %s, %s, %s, %s, %s, %s, NOW())"
+        )
 
-    with db_connect() as conn:
         with conn.cursor() as cur:
-            cur.execute(select_dup, (rows, cols, moves_json))
-            row = cur.fetchone()
-            if row:
-                # Déjà en base
-                return int(row[0])
-
             cur.execute(
-                insert_sql,
+                select_dup,
                 (
-                    save_name,
-                    int(rows),
-                    int(cols),
-                    starting_color,
-                    2,  # mode=2 (H vs H)
-                    1,  # game_index
-                    moves_json,
-                    0,  # view_index
-                    "bga",
-                    4,  # ai_depth (neutre)
-                    int(confiance),
-                    int(distinct_cols),
+                    [prepared[i][1] for i in valid],
+                    [prepared[i][2] for i in valid],
+                    [prepared[i][6] for i in valid],
+                    valid,
                 ),
             )
-            new_id = cur.fetchone()[0]
+            for idx, existing_id in cur.fetchall():
+                ids[idx] = int(existing_id)
+
+            # doublons à l'intérieur du lot: la 1re occurrence est insérée
+            first_of = {}
+            to_insert = []
+            for i in valid:
+                if ids[i] is not None:
+                    continue
+                key = (prepared[i][1], prepared[i][2], prepared[i][6])
+                if key in first_of:
+                    continue
+                first_of[key] = i
+                to_insert.append(i)
+
+            for k in range(0, len(to_insert), INSERT_CHUNK):
+                chunk = to_insert[k : k + INSERT_CHUNK]
+                new_ids = execute_values(
+                    cur,
+                    insert_sql,
+                    [prepared[i] for i in chunk],
+                    template=template,
+                    page_size=len(chunk),
+                    fetch=True,
+                )
+                for i, (new_id,) in zip(chunk, new_ids):
+                    ids[i] = int(new_id)
+
+            for i in valid:
+                if ids[i] is None:
+                    key = (prepared[i][1], prepared[i][2], prepared[i][6])
+                    ids[i] = ids[first_of[key]]
         conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+    return ids
+
+
+def import_bga_moves(
+    moves: List[Dict[str, Any]],
+    rows: int = 9,
+    cols: int = 9,
+    confiance: int = 3,
+    save_name: Optional[str] = None,
+    starting_color: str = "R",
+) -> int:
+    """
+    Insère une partie BGA dans saved_games.
 
-    return int(new_id)
+    - mode=2 (humain vs humain)
+    - ai_mode="bga"
+    - ai_depth=4 (valeur neutre)
+    - view_index=0
+    - game_index=1 (ne sert pas trop dans le viewer)
+    - confidence (0..5) -> on passe confiance=3 pour BGA
+
+    Retourne l'id en base (existant si doublon, sinon nouvel id).
+    (Wrapper de import_bga_moves_many pour une seule partie.)
+    """
+    return import_bga_moves_many(
+        [
+            {
+                "moves": moves,
+                "rows": rows,
+                "cols": cols,
+                "confiance": confiance,
+                "save_name": save_name,
+                "starting_color": starting_color,
+            }
+        ]
+    )[0]
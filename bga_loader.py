@@ -1,6 +1,7 @@
 # bga_loader.py
 """
 Interface pour charger une partie BGA spécifique dans la base
+(les pages /gamereview sont archivées dans raw_pages/ pour un re-parse hors-ligne)
 """
 
 import json
@@ -18,6 +19,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from bga_parse import detect_board_size_loose
+from raw_archive import KIND_GAMEREVIEW, RawArchive
+
 DB_CONFIG = {
     "host": "localhost",
     "database": "puissance4_db",
@@ -34,6 +38,7 @@ class BGALoaderApp(tk.Tk):
         self.geometry("800x600")
 
         self.driver = None
+        self.archive = RawArchive()
         self.setup_ui()
 
     def setup_ui(self):
@@ -117,6 +122,11 @@ class BGALoaderApp(tk.Tk):
         )
         time.sleep(2)
 
+        try:
+            self.archive.put(table_id, KIND_GAMEREVIEW, self.driver.page_source, url)
+        except Exception as e:
+            self.log(f"⚠️ Archive page brute: {e}")
+
         page_text = self.driver.find_element(By.TAG_NAME, "body").text
 
         # Extraction des coups
@@ -163,19 +173,8 @@ class BGALoaderApp(tk.Tk):
         return moves, name_to_pid
 
     def detect_board_size(self, page_text):
-        """Détecte la taille du plateau"""
-        lower = page_text.lower()
-        if "9x9" in lower or "9×9" in lower:
-            return (9, 9)
-
-        size_re = re.compile(r"(\d{1,2})\s*[x×]\s*(\d{1,2})", re.IGNORECASE)
-        m = size_re.search(page_text)
-        if m:
-            r = int(m.group(1))
-            c = int(m.group(2))
-            if 4 <= r <= 20 and 4 <= c <= 20:
-                return (r, c)
-        return None
+        """Détecte la taille du plateau (même règle que le re-parse d'archive)"""
+        return detect_board_size_loose(page_text)
 
     def save_to_database(self, table_id, moves, rows, cols, players):
         """Sauvegarde la partie dans la base de données"""
@@ -0,0 +1,244 @@
+"""
+bga_parse.py
+============================================================
+Parseurs purs des pages BGA (aucun navigateur, aucun réseau)
+✅ /table      : taille du plateau, joueurs, lien d'archive replay
+✅ /gamereview : coups "X place un pion dans la colonne N" (FR, 1-based)
+✅ replay      : tableau g_gamelogs (paquets playDisc, 0-based)
+Partagés par bga_to_db (scraping), bga_loader et raw_archive (re-parse)
+============================================================
+"""
+
+import html as html_lib
+import json
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+BASE = "https://boardgamearena.com"
+
+
+# ============================================================
+# /table
+# ============================================================
+
+
+TABLE_SIZE_RE = re.compile(
+    r'id="gameoption_100_displayed_value"[^>]*>\s*(?:<[^>]+>\s*)*(\d{1,2})\s*[x×]\s*(\d{1,2})'
+)
+REPLAY_LINK_RE = re.compile(r'(/archive/replay/[^"\'\s<>]+)')
+
+
+def parse_table_page(page_html: str, base: str = BASE) -> dict:
+    """
+    Tout ce qu'on exploite de /table?table=... en une passe sur le HTML:
+    {"size": (rows, cols) | None, "replay_url": str | None, "players": {pseudo: id}}
+    """
+    page_html = page_html or ""
+    size = None
+    m = TABLE_SIZE_RE.search(page_html)
+    if m:
+        size = (int(m.group(1)), int(m.group(2)))
+
+    replay_url = None
+    m = REPLAY_LINK_RE.search(page_html)
+    if m:
+        rel = html_lib.unescape(m.group(1))
+        replay_url = rel if rel.startswith("http") else urljoin(base, rel)
+
+    return {
+        "size": size,
+        "replay_url": replay_url,
+        "players": player_links_from_html(page_html),
+    }
+
+
+# ============================================================
+# Taille de plateau (texte)
+# ============================================================
+
+SIZE_RE = re.compile(r"(\d{1,2})\s*[x×]\s*(\d{1,2})", re.IGNORECASE)
+
+
+def detect_board_size_anchored(page_text: str):
+    if not page_text:
+        return None
+
+    lower = page_text.lower()
+    if "9x9" in lower or "9×9" in lower:
+        return (9, 9)
+
+    for line in page_text.splitlines():
+        l = line.strip()
+        if not l:
+            continue
+        ll = l.lower()
+
+        anchored = (
+            ("board" in ll and "size" in ll)
+            or ("taille" in ll and "plateau" in ll)
+            or ("grid" in ll and "size" in ll)
+        )
+        if not anchored:
+            continue
+
+        m = SIZE_RE.search(l)
+        if m:
+            r = int(m.group(1))
+            c = int(m.group(2))
+            if 4 <= r <= 20 and 4 <= c <= 20:
+                return (r, c)
+
+    return None
+
+
+def detect_board_size_loose(page_text: str):
+    """Règle de bga_loader: 9x9 si présent, sinon le premier "RxC" plausible."""
+    if not page_text:
+        return None
+    lower = page_text.lower()
+    if "9x9" in lower or "9×9" in lower:
+        return (9, 9)
+    m = SIZE_RE.search(page_text)
+    if m:
+        r = int(m.group(1))
+        c = int(m.group(2))
+        if 4 <= r <= 20 and 4 <= c <= 20:
+            return (r, c)
+    return None
+
+
+# ============================================================
+# /gamereview
+# ============================================================
+
+
+# FR: "... place un pion dans la colonne X"
+GAMEREVIEW_MOVE_RE = re.compile(
+    r"^(.+?)\s+place un pion dans la colonne\s+(\d+)\s*$", re.MULTILINE
+)
+PLAYER_LINK_RE = re.compile(r"/player\?id=(\d+)")
+
+
+def parse_gamereview_moves(page_text: str, name_to_pid: dict) -> list:
+    """Coups (colonnes telles qu'affichées, 1-based) depuis le texte de /gamereview."""
+    moves = []
+    move_id = 1
+    for player_name, col_str in GAMEREVIEW_MOVE_RE.findall(page_text or ""):
+        player_name = player_name.strip()
+        try:
+            col = int(col_str)
+        except Exception:
+            continue
+        pid = name_to_pid.get(player_name, "unknown")
+        moves.append(
+            {
+                "move_id": move_id,
+                "col": col,
+                "player_id": str(pid),
+                "player_name": player_name,
+            }
+        )
+        move_id += 1
+    return moves
+
+
+# ============================================================
+# Replay (g_gamelogs) + HTML -> texte
+# ============================================================
+
+
+def moves_from_gamelogs(gamelogs) -> list:
+    """Équivalent Python de EXTRACT_JS: args des paquets playDisc, triés par move_id."""
+    by_move = {}
+    for pkt in gamelogs or []:
+        if not isinstance(pkt, dict):
+            continue
+        try:
+            mid = int(pkt.get("move_id"))
+        except (TypeError, ValueError):
+            continue
+        disc = next(
+            (
+                d
+                for d in (pkt.get("data") or [])
+                if isinstance(d, dict) and d.get("type") == "playDisc"
+            ),
+            None,
+        )
+        if not disc or not disc.get("args"):
+            continue
+        try:
+            col = int(disc["args"].get("x"))
+        except (TypeError, ValueError):
+            continue
+        by_move[mid] = {"col": col, "pid": str(disc["args"].get("player_id"))}
+
+    return [
+        {"move_id": mid, "col": v["col"], "player_id": v["pid"]}
+        for mid, v in sorted(by_move.items())
+    ]
+
+
+def extract_gamelogs_from_html(page_html: str):
+    """Trouve le tableau JSON `g_gamelogs = [...]` dans le HTML d'un replay."""
+    m = re.search(r"g_gamelogs\s*=\s*", page_html or "")
+    if not m:
+        return None
+    try:
+        data, _end = json.JSONDecoder().raw_decode(page_html, m.end())
+    except ValueError:
+        return None
+    if isinstance(data, dict):
+        data = data.get("data") or data.get("logs")
+    return data if isinstance(data, list) else None
+
+
+class _TextExtractor(HTMLParser):
+    """Texte visible approximatif (un bloc = une ligne), comme body.text."""
+
+    BLOCKS = {"div", "p", "br", "li", "tr", "h1", "h2", "h3", "h4"}
+    CELLS = {"td", "th"}  # même ligne, séparées (comme innerText)
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+        elif tag in self.CELLS:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self._skip:
+            self._skip -= 1
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(page_html: str) -> str:
+    p = _TextExtractor()
+    p.feed(page_html or "")
+    lines = (re.sub(r"[ \t\xa0]+", " ", l).strip() for l in "".join(p.parts).splitlines())
+    return "\n".join(l for l in lines if l)
+
+
+def player_links_from_html(page_html: str) -> dict:
+    """pseudo -> player_id depuis les liens <a href="/player?id=...">pseudo</a>."""
+    out = {}
+    for m in re.finditer(
+        r'<a[^>]+href="[^"]*/player\?id=(\d+)[^"]*"[^>]*>(.*?)</a>', page_html or "", re.S
+    ):
+        name = html_lib.unescape(re.sub(r"<[^>]+>", "", m.group(2)))
+        name = re.sub(r"\s+", " ", name).strip()  # &nbsp; -> espace, comme le texte
+        if name and name not in out:
+            out[name] = m.group(1)
+    return out
@@ -3,25 +3,69 @@
 # ✅ Login BGA manuel (Chrome)
 # ✅ Récupère jusqu'à 40 joueurs depuis le classement Connect4 (scroll dynamique)
 # ✅ Pour chaque joueur -> récupère ses parties terminées (tables)
-# ✅ Pour chaque table -> /table?table=... (size) + /gamereview?table=... (moves)
+#    en s'arrêtant aux tables déjà couvertes (marque haute par joueur)
+# ✅ Pour chaque table -> /table?table=... (size + joueurs + lien replay, 1 seule
+#    visite) + /gamereview?table=... (moves)
 # ✅ Fallback archive replay via window.g_gamelogs
-# ✅ Skip tables déjà scrapées (cache JSON local)
-# ✅ Skip import DB si déjà importée (cache JSON local)
+# ✅ Skip tables déjà scrapées (état local SQLite WAL, scrape_state.py)
+# ✅ Skip import DB si déjà importée (même état local)
 # ✅ Import automatique via bga_import.import_bga_moves (si présent)
+# ✅ Mode pipeline: joueurs -> tables -> fetch -> parse -> persist, étages
+#    reliés par des files bornées, concurrence et compteurs par étage,
+#    limite de débit globale
+# ✅ Fetch HTTP sans navigateur (cookies de session) pour /gamereview et
+#    /archive/replay, Selenium seulement en fallback
+# ✅ Retry des tables en échec (timeout / aucun coup / taille inconnue / DB) avec
+#    backoff exponentiel, dans un stage à part qui ne bloque pas le crawl
+# ✅ Pages brutes archivées (raw_archive.py) -> re-parse hors-ligne sans re-scraper
+#
+# Test hors-ligne (pages enregistrées de fixtures/bga/, faux BGA local):
+#   python bga_fixture_server.py --port 8765
+#   python bga_to_db.py --base-url http://127.0.0.1:8765 --no-login --workers 2
+# (tests/test_bga_offline.py rejoue le chemin HTTP sur ces pages sans Chrome)
 # ============================================================
 
+import argparse
+import gzip
 import json
+import threading
 import time
 import re
+import urllib.error
+import urllib.request
 from pathlib import Path
 from urllib.parse import urlparse, urljoin
 
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from bga_parse import (
+    detect_board_size_anchored,
+    parse_gamereview_moves,
+    parse_table_page as _parse_table_page,
+)
+from raw_archive import (
+    KIND_GAMELOGS,
+    KIND_GAMEREVIEW,
+    KIND_REPLAY,
+    KIND_TABLE,
+    RawArchive,
+    moves_from_payload,
+)
+from pipeline import Channel, Stage, StatsReporter, format_stats
+from scrape_state import (
+    ERR_DB,
+    ERR_NO_MOVES,
+    ERR_OTHER,
+    ERR_SIZE_UNKNOWN,
+    ERR_TIMEOUT,
+    ScrapeState,
+)
+
 
 # ============================================================
 # CONFIG
@@ -49,68 +93,45 @@ NO_NEW_ROUNDS_TO_STOP = 4
 PAUSE_BETWEEN_PLAYERS = 0.6
 PAUSE_BETWEEN_TABLES = 1.0
 
+# mode pipeline
+DEFAULT_WORKERS = 4  # drivers de l'étage fetch
+DEFAULT_DISCOVERY_WORKERS = 1
+DEFAULT_PARSE_WORKERS = 2
+DEFAULT_PERSIST_WORKERS = 1
+DEFAULT_STATS_EVERY = 30.0  # s entre deux rapports de pipeline (0 = final seulement)
+DEFAULT_RATE = 1.0  # chargements de page / seconde, tous drivers confondus
+PLAYER_QUEUE_SIZE = 50
+TABLE_QUEUE_SIZE = 200
+FETCHED_QUEUE_SIZE = 50  # pages HTML en mémoire: file courte
+PERSIST_QUEUE_SIZE = 200
+
+# retry (politique de backoff: voir scrape_state.schedule_retry)
+RETRY_BATCH = 20
+RETRY_POLL_SECONDS = 30.0
+
+HTTP_TIMEOUT = 30
+
 BASE = "https://boardgamearena.com"
 
 PROJECT_DIR = Path(__file__).resolve().parent
 OUT_DIR = PROJECT_DIR / "scraped_moves"
 OUT_DIR.mkdir(exist_ok=True)
 
+# ancien cache JSON: importé automatiquement dans SCRAPE_STATE_PATH au 1er lancement
 SCRAPED_CACHE_PATH = PROJECT_DIR / "scraped_tables.json"
+SCRAPE_STATE_PATH = PROJECT_DIR / "scrape_state.sqlite3"
+
+# archive des pages brutes (None = désactivée, --no-archive)
+RAW_ARCHIVE: RawArchive | None = None
 
 
 # ============================================================
-# CACHE (skip duplicates)
+# ÉTAT (skip duplicates)
 # ============================================================
 
 
-def load_scraped_cache():
-    """
-    Cache format:
-    {
-      "scraped": ["123", "456", ...],
-      "imported": ["123", ...],
-      "failed": {"789": "error msg", ...}
-    }
-    """
-    if SCRAPED_CACHE_PATH.exists():
-        try:
-            data = json.loads(SCRAPED_CACHE_PATH.read_text(encoding="utf-8"))
-            if isinstance(data, dict):
-                data.setdefault("scraped", [])
-                data.setdefault("imported", [])
-                data.setdefault("failed", {})
-                # normalize to str
-                data["scraped"] = [str(x) for x in data["scraped"]]
-                data["imported"] = [str(x) for x in data["imported"]]
-                data["failed"] = {str(k): str(v) for k, v in data["failed"].items()}
-                return data
-        except Exception:
-            pass
-    return {"scraped": [], "imported": [], "failed": {}}
-
-
-def save_scraped_cache(cache: dict):
-    SCRAPED_CACHE_PATH.write_text(
-        json.dumps(cache, indent=2, ensure_ascii=False), encoding="utf-8"
-    )
-
-
-def mark_scraped(cache: dict, table_id: str):
-    table_id = str(table_id)
-    if table_id not in cache["scraped"]:
-        cache["scraped"].append(table_id)
-
-
-def mark_imported(cache: dict, table_id: str):
-    table_id = str(table_id)
-    if table_id not in cache["imported"]:
-        cache["imported"].append(table_id)
-    cache["failed"].pop(table_id, None)
-
-
-def mark_failed(cache: dict, table_id: str, err: Exception | str):
-    table_id = str(table_id)
-    cache["failed"][table_id] = str(err)[:800] if err is not None else "unknown error"
+def load_scrape_state() -> ScrapeState:
+    return ScrapeState(SCRAPE_STATE_PATH, legacy_json_path=SCRAPED_CACHE_PATH)
 
 
 # ============================================================
@@ -135,6 +156,70 @@ def make_driver(headless: bool = False):
     return driver
 
 
+# ============================================================
+# POLITESSE (limite de débit globale, partagée entre drivers)
+# ============================================================
+
+
+class RateLimiter:
+    """
+    Espace les chargements de page d'au moins 1/rate secondes, tous threads
+    confondus. rate=None ou 0 -> pas de limite.
+    """
+
+    def __init__(self, rate: float | None = None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            t = max(now, self._next)
+            self._next = t + self.interval
+        if t > now:
+            time.sleep(t - now)
+
+
+RATE_LIMITER = RateLimiter(None)
+
+
+def archive_page(table_id, kind: str, content: str, url: str | None = None):
+    """Archive une page brute; une erreur d'archive ne doit jamais casser le scraping."""
+    if RAW_ARCHIVE is None or not content:
+        return
+    try:
+        RAW_ARCHIVE.put(table_id, kind, content, url)
+    except Exception as e:
+        print(f"   [{table_id}] ⚠️ archive failed:", e)
+
+
+def is_timeout(exc) -> bool:
+    """Timeout réseau ou de chargement (urllib / socket / WebDriverWait / page load)."""
+    if isinstance(exc, urllib.error.URLError):
+        exc = exc.reason
+    return isinstance(exc, (TimeoutError, TimeoutException))
+
+
+def polite_get(driver, url: str):
+    RATE_LIMITER.wait()
+    driver.get(url)
+
+
+def copy_session(src_driver, dst_driver):
+    """Réutilise la session BGA (cookies) du driver connecté dans un autre driver."""
+    dst_driver.get(BASE)
+    for ck in src_driver.get_cookies():
+        ck = {k: v for k, v in ck.items() if k in ("name", "value", "path", "secure", "expiry")}
+        try:
+            dst_driver.add_cookie(ck)
+        except Exception:
+            pass
+    dst_driver.refresh()
+
+
 # ============================================================
 # LOGIN (manuel) + FIX DOMAINE
 # ============================================================
@@ -168,31 +253,60 @@ def scroll_to_bottom(driver):
 # ============================================================
 
 
-def get_board_size_from_table_page(driver, table_id: str):
-    try:
-        tid = str(int(str(table_id)))
-    except Exception:
-        return None
+def parse_table_page(page_html: str) -> dict:
+    return _parse_table_page(page_html, BASE)
 
-    url = f"{BASE}/table?table={tid}"
-    driver.get(url)
 
+def load_table_page(driver, table_id: str, fetcher=None) -> dict:
+    """
+    Une seule visite de /table (HTTP si possible, sinon Selenium) pour la taille,
+    les joueurs et le lien d'archive replay. Retourne parse_table_page + "html"
+    + "timeout" (dernier timeout rencontré, None sinon): sans taille, fetch_table
+    en fait une erreur timeout plutôt qu'une taille inconnue.
+    """
+    url = f"{BASE}/table?table={table_id}"
+    page_html = None
+    timeout = None
+
+    if fetcher is not None:
+        try:
+            page_html = fetcher.get(url)
+            archive_page(table_id, KIND_TABLE, page_html, url)
+            info = parse_table_page(page_html)
+            # la taille est rendue en JS: sans elle (même avec le lien replay),
+            # la table finirait en size_unknown -> on passe par Selenium
+            if info["size"] is not None:
+                info["html"] = page_html
+                info["timeout"] = None
+                return info
+        except Exception as e:
+            if is_timeout(e):
+                timeout = e
+            print(f"   [{table_id}] ⚠️ /table HTTP failed -> Selenium:", e)
+
+    polite_get(driver, url)
     try:
+        # la taille (et le lien replay) sont rendus en JS
         WebDriverWait(driver, 25).until(
             EC.presence_of_element_located((By.ID, "gameoption_100_displayed_value"))
         )
         time.sleep(0.6)
-        el = driver.find_element(By.ID, "gameoption_100_displayed_value")
-        val = (el.text or "").strip()
-        m = re.search(r"(\d{1,2})\s*[x×]\s*(\d{1,2})", val)
-        if m:
-            r = int(m.group(1))
-            c = int(m.group(2))
-            return (r, c)
-    except Exception:
-        pass
+    except TimeoutException as e:
+        timeout = e
+    page_html = driver.page_source or ""
+    archive_page(table_id, KIND_TABLE, page_html, url)
+    info = parse_table_page(page_html)
+    info["html"] = page_html
+    info["timeout"] = timeout
+    return info
 
-    return None
+
+def get_board_size_from_table_page(driver, table_id: str):
+    try:
+        tid = str(int(str(table_id)))
+    except Exception:
+        return None
+    return load_table_page(driver, tid)["size"]
 
 
 # ============================================================
@@ -207,7 +321,7 @@ def collect_players_from_ranking(driver, max_players: int):
     """
     url = f"{BASE}/gamepanel?game=connectfour"
     print("🏁 Ouverture page classement:", url)
-    driver.get(url)
+    polite_get(driver, url)
 
     WebDriverWait(driver, 30).until(
         EC.presence_of_element_located((By.TAG_NAME, "body"))
@@ -271,13 +385,22 @@ def collect_players_from_ranking(driver, max_players: int):
 
 
 def get_connect4_table_ids(
-    driver, player_id: str, game_id: int, finished: int, limit: int
+    driver,
+    player_id: str,
+    game_id: int,
+    finished: int,
+    limit: int,
+    newer_than: int | None = None,
 ):
     """
     Scroll dynamique sur /gamestats pour charger plus d'entrées.
+
+    newer_than: marque haute du joueur (ids de table croissants dans le temps,
+    liste du plus récent au plus ancien). Dès qu'une table <= newer_than
+    apparaît, on arrête de scroller et on ne renvoie que les plus récentes.
     """
     url = f"{BASE}/gamestats?player={player_id}&game_id={game_id}&finished={finished}"
-    driver.get(url)
+    polite_get(driver, url)
     time.sleep(2)
 
     t0 = time.time()
@@ -300,6 +423,12 @@ def get_connect4_table_ids(
             except ValueError:
                 pass
 
+        if newer_than is not None:
+            fresh = [t for t in uniq if int(t) > newer_than]
+            if len(fresh) < len(uniq):
+                return fresh[:limit]  # tables connues atteintes
+            uniq = fresh
+
         cur_len = len(uniq)
 
         # Stop conditions
@@ -321,45 +450,6 @@ def get_connect4_table_ids(
         time.sleep(0.7)
 
 
-# ============================================================
-# 2) Detect board size anchored
-# ============================================================
-
-SIZE_RE = re.compile(r"(\d{1,2})\s*[x×]\s*(\d{1,2})", re.IGNORECASE)
-
-
-def detect_board_size_anchored(page_text: str):
-    if not page_text:
-        return None
-
-    lower = page_text.lower()
-    if "9x9" in lower or "9×9" in lower:
-        return (9, 9)
-
-    for line in page_text.splitlines():
-        l = line.strip()
-        if not l:
-            continue
-        ll = l.lower()
-
-        anchored = (
-            ("board" in ll and "size" in ll)
-            or ("taille" in ll and "plateau" in ll)
-            or ("grid" in ll and "size" in ll)
-        )
-        if not anchored:
-            continue
-
-        m = SIZE_RE.search(l)
-        if m:
-            r = int(m.group(1))
-            c = int(m.group(2))
-            if 4 <= r <= 20 and 4 <= c <= 20:
-                return (r, c)
-
-    return None
-
-
 # ============================================================
 # 3) Extraction coups via /gamereview?table=...
 # ============================================================
@@ -367,12 +457,13 @@ def detect_board_size_anchored(page_text: str):
 
 def extract_size_and_moves_from_gamereview(driver, table_id: str):
     url = f"{BASE}/gamereview?table={table_id}"
-    driver.get(url)
+    polite_get(driver, url)
 
     WebDriverWait(driver, 25).until(
         EC.presence_of_element_located((By.TAG_NAME, "body"))
     )
     time.sleep(1.2)
+    archive_page(table_id, KIND_GAMEREVIEW, driver.page_source or "", url)
 
     body_el = driver.find_element(By.TAG_NAME, "body")
     page_text = body_el.text or ""
@@ -395,31 +486,7 @@ def extract_size_and_moves_from_gamereview(driver, table_id: str):
     except Exception:
         pass
 
-    # FR: "... place un pion dans la colonne X"
-    pattern = re.compile(
-        r"^(.+?)\s+place un pion dans la colonne\s+(\d+)\s*$", re.MULTILINE
-    )
-    rows = pattern.findall(page_text)
-
-    moves = []
-    move_id = 1
-    for player_name, col_str in rows:
-        player_name = player_name.strip()
-        try:
-            col = int(col_str)
-        except Exception:
-            continue
-        pid = name_to_pid.get(player_name, "unknown")
-        moves.append(
-            {
-                "move_id": move_id,
-                "col": col,
-                "player_id": str(pid),
-                "player_name": player_name,
-            }
-        )
-        move_id += 1
-
+    moves = parse_gamereview_moves(page_text, name_to_pid)
     return size, moves
 
 
@@ -468,7 +535,7 @@ def wait_gamelogs(driver, max_wait=30):
 
 def resolve_real_replay_url_from_table(driver, table_id: str):
     table_url = f"{BASE}/table?table={table_id}"
-    driver.get(table_url)
+    polite_get(driver, table_url)
 
     wait = WebDriverWait(driver, 20)
     wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
@@ -493,8 +560,8 @@ def resolve_real_replay_url_from_table(driver, table_id: str):
     return None
 
 
-def extract_moves_from_replay_url(driver, replay_url: str):
-    driver.get(replay_url)
+def extract_moves_from_replay_url(driver, replay_url: str, table_id: str | None = None):
+    polite_get(driver, replay_url)
     WebDriverWait(driver, 25).until(
         EC.presence_of_element_located((By.TAG_NAME, "body"))
     )
@@ -504,6 +571,15 @@ def extract_moves_from_replay_url(driver, replay_url: str):
     if not ok:
         return []
 
+    if table_id is not None:
+        try:
+            gamelogs_json = driver.execute_script(
+                "return JSON.stringify(window.g_gamelogs || []);"
+            )
+            archive_page(table_id, KIND_GAMELOGS, gamelogs_json, replay_url)
+        except Exception:
+            pass
+
     for _ in range(1, 6):
         payload = driver.execute_script(EXTRACT_JS)
         if payload and payload.get("count", 0) > 0:
@@ -512,6 +588,85 @@ def extract_moves_from_replay_url(driver, replay_url: str):
     return []
 
 
+# ============================================================
+# 4b) Fetch HTTP sans navigateur (session = cookies du driver)
+# ============================================================
+
+
+class HttpFetcher:
+    """
+    Client HTTP minimal (urllib) réutilisant la session BGA du driver connecté.
+    Un fetcher par thread worker.
+    """
+
+    def __init__(self, cookies: list, user_agent: str | None = None):
+        cookie_header = "; ".join(f"{c['name']}={c['value']}" for c in cookies)
+        self.opener = urllib.request.build_opener()
+        self.opener.addheaders = [
+            ("User-Agent", user_agent or "Mozilla/5.0"),
+            ("Accept", "text/html,application/xhtml+xml,*/*"),
+            ("Accept-Encoding", "gzip"),
+            ("Cookie", cookie_header),
+        ]
+
+    @classmethod
+    def from_driver(cls, driver):
+        try:
+            ua = driver.execute_script("return navigator.userAgent;")
+        except Exception:
+            ua = None
+        return cls(driver.get_cookies(), ua)
+
+    def get(self, url: str) -> str:
+        RATE_LIMITER.wait()
+        with self.opener.open(url, timeout=HTTP_TIMEOUT) as resp:
+            raw = resp.read()
+            if resp.headers.get("Content-Encoding") == "gzip":
+                raw = gzip.decompress(raw)
+            charset = resp.headers.get_content_charset() or "utf-8"
+        return raw.decode(charset, errors="replace")
+
+
+GAMEREVIEW_MARKER = "place un pion dans la colonne"
+
+
+def fetch_pages_http(fetcher: HttpFetcher, table_id: str, replay_url: str | None = None):
+    """
+    /gamereview puis, si la page ne contient aucun coup, /archive/replay (g_gamelogs)
+    en HTTP pur. Aucun parsing ici (test de présence seulement): le parsing des
+    coups est fait par parse_pages, dans son propre étage.
+    replay_url: lien déjà lu sur /table (évite une 2e visite de /table);
+    "" = /table déjà lue, sans lien replay; None = /table jamais chargée.
+    Retourne [(kind, contenu), ...] ; [] si rien d'exploitable.
+    """
+    url = f"{BASE}/gamereview?table={table_id}"
+    page_html = fetcher.get(url)
+    archive_page(table_id, KIND_GAMEREVIEW, page_html, url)
+    if GAMEREVIEW_MARKER in page_html:
+        return [(KIND_GAMEREVIEW, page_html)]
+
+    if replay_url is None:
+        replay_url = parse_table_page(fetcher.get(f"{BASE}/table?table={table_id}"))[
+            "replay_url"
+        ]
+    if not replay_url:
+        return []
+    replay_html = fetcher.get(replay_url)
+    archive_page(table_id, KIND_REPLAY, replay_html, replay_url)
+    if "g_gamelogs" in replay_html:
+        return [(KIND_REPLAY, replay_html)]
+    return []
+
+
+def parse_pages(pages) -> tuple:
+    """(moves, source) depuis les pages brutes de fetch_pages_http ; ([], None) sinon."""
+    for kind, content in pages:
+        moves = moves_from_payload(kind, content)
+        if moves:
+            return moves, f"{kind}_http"
+    return [], None
+
+
 # ============================================================
 # 5) Import DB (via bga_import)
 # ============================================================
@@ -531,169 +686,701 @@ def import_into_db(moves, save_name: str):
 
 
 # ============================================================
-# MAIN
+# 6) Une table: fetch puis parse (aucune écriture état / DB)
 # ============================================================
 
 
-def main():
-    driver = make_driver(headless=False)
-    cache = load_scraped_cache()
-    scraped_set = set(cache["scraped"])
-    imported_set = set(cache["imported"])
+def fetch_table(driver, tid: str, fetcher: HttpFetcher | None = None) -> dict:
+    """
+    Étage "fetch": chargements de pages seulement.
+    Retourne le même dict que scrape_table, plus "pages" = [(kind, html)] quand
+    les coups restent à extraire (chemin HTTP) ; le chemin Selenium extrait
+    directement les coups (le DOM n'existe que dans le driver).
+
+    /table n'est chargée qu'une fois (taille + joueurs + lien replay).
+    Avec un fetcher HTTP, les pages sont d'abord récupérées sans navigateur ;
+    le driver ne sert plus qu'en fallback.
+
+    Un timeout rencontré en route n'est pas confondu avec "pas de coups" /
+    "taille inconnue": si rien n'a abouti, status = "error" avec le message du
+    timeout (classify_failure -> ERR_TIMEOUT).
+    """
+    result = {
+        "table_id": tid,
+        "status": "ok",
+        "size": None,
+        "players": {},
+        "moves": [],
+        "source": None,
+        "pages": [],
+    }
+    timeouts = []
+
+    def timed_out(what: str) -> dict:
+        err = timeouts[-1]
+        print(f"   [{tid}] ⏱️ timeout ({what}) -> retry")
+        result["status"] = "error"
+        result["error"] = f"timeout ({what}): {type(err).__name__}: {err}"
+        return result
+
+    # --- size + joueurs + lien replay via /table (une seule visite) ---
+    table_info = load_table_page(driver, tid, fetcher)
+    if table_info.get("timeout") is not None:
+        timeouts.append(table_info["timeout"])
+    size = table_info["size"]
+    replay_url = table_info["replay_url"]
+    result["size"] = size
+    result["players"] = table_info["players"]
+
+    if ONLY_9X9:
+        if size is None:
+            if STRICT_SIZE_CHECK:
+                if timeouts:
+                    return timed_out("/table")
+                print(f"   [{tid}] SKIP (size unknown)")
+                result["status"] = "skip_size"
+                return result
+        else:
+            r, c = size
+            if (r, c) != (9, 9):
+                print(f"   [{tid}] SKIP (size {r}x{c} not 9x9)")
+                result["status"] = "skip_size"
+                return result
+
+    # --- HTTP (sans navigateur) ---
+    moves = []
+    if fetcher is not None:
+        try:
+            # /table déjà lue: "" (et non None) si elle n'avait pas de lien replay
+            pages = fetch_pages_http(fetcher, tid, replay_url=replay_url or "")
+            if pages:
+                result["pages"] = pages
+                return result
+        except Exception as e:
+            if is_timeout(e):
+                timeouts.append(e)
+            print(f"   [{tid}] ⚠️ HTTP fetch failed -> Selenium:", e)
+
+    # --- gamereview extraction ---
+    try:
+        _size_from_gamereview, moves = extract_size_and_moves_from_gamereview(
+            driver, tid
+        )
+    except Exception as e:
+        moves = []
+        if is_timeout(e):
+            timeouts.append(e)
+        print(f"   [{tid}] ⚠️ gamereview failed:", e)
+
+    if moves:
+        names = sorted({m.get("player_name", "") for m in moves if m.get("player_name")})
+        if names:
+            print(f"   [{tid}] Joueurs détectés:", " vs ".join(names))
+        print(f"   [{tid}] ✅ {len(moves)} coups (gamereview)")
+        result["source"] = "gamereview"
+
+    # --- fallback replay archive (lien déjà lu sur /table) ---
+    if not moves:
+        if not replay_url:
+            replay_url = resolve_real_replay_url_from_table(driver, tid)
+        if replay_url:
+            print(f"   [{tid}] Archive replay:", replay_url)
+            try:
+                moves = extract_moves_from_replay_url(driver, replay_url, tid)
+            except Exception as e:
+                moves = []
+                if is_timeout(e):
+                    timeouts.append(e)
+                print(f"   [{tid}] ⚠️ archive extraction failed:", e)
+
+            if moves:
+                print(f"   [{tid}] ✅ {len(moves)} coups (archive)")
+                result["source"] = "archive"
+
+    if not moves:
+        if timeouts:
+            return timed_out("coups")
+        print(f"   [{tid}] ❌ Aucun coup trouvé (skip)")
+        result["status"] = "no_moves"
+        return result
+
+    result["moves"] = moves
+    return result
+
+
+def parse_fetched(result: dict) -> dict:
+    """Étage "parse": extrait les coups des pages brutes (CPU seulement)."""
+    pages = result.pop("pages", None)
+    if result["status"] != "ok" or result["moves"] or not pages:
+        return result
+
+    tid = result["table_id"]
+    moves, source = parse_pages(pages)
+    if not moves:
+        print(f"   [{tid}] ❌ Aucun coup trouvé dans les pages (skip)")
+        result["status"] = "no_moves"
+        return result
+
+    print(f"   [{tid}] ✅ {len(moves)} coups ({source})")
+    result["moves"] = moves
+    result["source"] = source
+    return result
+
+
+def scrape_table(driver, tid: str, fetcher: HttpFetcher | None = None) -> dict:
+    """
+    fetch + parse d'une table (mode séquentiel / retries).
+    Retourne {"table_id", "status", "size", "players", "moves", "source"} avec
+    status = "ok" | "skip_size" | "no_moves" | "error" (timeout, + "error").
+    """
+    return parse_fetched(fetch_table(driver, tid, fetcher))
+
+
+# ============================================================
+# 7) Writer: état + JSON + DB (un seul thread écrit)
+# ============================================================
+
+
+def new_counters() -> dict:
+    return {
+        "seen": 0,
+        "skipped_cached": 0,
+        "scraped_new": 0,
+        "imported": 0,
+        "retry_scheduled": 0,
+        "gave_up": 0,
+    }
 
-    print(
-        f"🧠 Cache chargé: scraped={len(scraped_set)}, imported={len(imported_set)}, failed={len(cache['failed'])}"
-    )
-    print(f"📌 Cache file: {SCRAPED_CACHE_PATH}")
 
+def error_result(tid: str, exc) -> dict:
+    """Résultat "error" pour une table dont le traitement a levé (-> retry)."""
+    return {
+        "table_id": tid,
+        "status": "error",
+        "error": f"{type(exc).__name__}: {exc}",
+        "moves": [],
+    }
+
+
+def classify_failure(result: dict) -> str | None:
+    """Classe d'erreur d'un résultat de scrape_table (None = définitif, pas de retry)."""
+    status = result["status"]
+    if status == "no_moves":
+        return ERR_NO_MOVES
+    if status == "skip_size":
+        # taille connue mais pas 9x9: rien à réessayer
+        return ERR_SIZE_UNKNOWN if result.get("size") is None else None
+    if status == "error":
+        err = (result.get("error") or "").lower()
+        return ERR_TIMEOUT if ("timeout" in err or "timed out" in err) else ERR_OTHER
+    return None
+
+
+def schedule_retry(state: ScrapeState, tid: str, error_class: str, err, counters: dict):
+    status = state.schedule_retry(tid, error_class, err)
+    if status == "gave_up":
+        counters["gave_up"] += 1
+        print(f"   [{tid}] 🛑 abandon après trop d'échecs ({error_class})")
+    else:
+        counters["retry_scheduled"] += 1
+        print(f"   [{tid}] 🔁 retry programmé ({error_class})")
+
+
+def import_table(state: ScrapeState, tid: str, moves, save_name: str, counters: dict):
     try:
-        login_bga_manual(driver)
+        game_id_db = import_into_db(moves, save_name=save_name)
+        print(f"   [{tid}] 💾 Import DB OK id_partie =", game_id_db)
+        counters["imported"] += 1
+        state.mark_imported(tid)
+    except Exception as e:
+        print(f"   [{tid}] ❌ Import DB FAILED:", e)
+        schedule_retry(state, tid, ERR_DB, e, counters)
+
+
+def handle_result(
+    state: ScrapeState, result: dict, pseudo: str, player_id: str, counters: dict
+):
+    tid = result["table_id"]
+
+    if result["status"] != "ok":
+        error_class = classify_failure(result)
+        if error_class is None:
+            # taille connue != 9x9: on marque scrapée pour ne plus y revenir
+            state.mark_scraped(tid, status=result["status"])
+        else:
+            schedule_retry(
+                state, tid, error_class, result.get("error") or result["status"], counters
+            )
+        return
+
+    moves = result["moves"]
+
+    # --- save JSON ---
+    out_path = OUT_DIR / f"moves_{pseudo}_{player_id}_table_{tid}.json"
+    out_path.write_text(json.dumps(moves, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    # ✅ mark as scraped
+    state.mark_scraped(tid)
+    counters["scraped_new"] += 1
+
+    # --- import DB if not already imported ---
+    if state.is_imported(tid):
+        print(f"   [{tid}] ⏭️ Import DB déjà fait (état local) -> skip import")
+        return
+
+    import_table(state, tid, moves, f"BGA_table_{tid}_from_{pseudo}", counters)
+
+
+def handle_reimport(state: ScrapeState, tid: str, counters: dict):
+    """Retry d'un échec DB: les coups sont déjà sur disque, pas besoin de re-scraper."""
+    paths = sorted(OUT_DIR.glob(f"moves_*_table_{tid}.json"))
+    if not paths:
+        schedule_retry(state, tid, ERR_DB, "JSON des coups introuvable", counters)
+        return
+    m = re.match(rf"moves_(.+)_\d+_table_{tid}\.json$", paths[0].name)
+    pseudo = m.group(1) if m else "retry"
+    moves = json.loads(paths[0].read_text(encoding="utf-8"))
+    import_table(state, tid, moves, f"BGA_table_{tid}_from_{pseudo}", counters)
+
+
+def process_retry(driver, state: ScrapeState, tid: str, error_class: str, fetcher=None):
+    """
+    Une tentative de retry. Retourne un item pour le writer:
+    ("reimport", tid) ou ("result", result) (résultat de scrape_table).
+    """
+    if error_class == ERR_DB:
+        return ("reimport", tid)
+    print(f"   🔁 Retry table {tid} ({error_class})")
+    try:
+        result = scrape_table(driver, tid, fetcher)
+    except Exception as e:
+        result = error_result(tid, e)
+    return ("result", result)
+
+
+def apply_retry_item(state: ScrapeState, item, counters: dict):
+    kind, payload = item
+    if kind == "reimport":
+        handle_reimport(state, payload, counters)
+    else:
+        handle_result(state, payload, "retry", "0", counters)
+
+
+def run_due_retries(driver, state: ScrapeState, counters: dict, fetcher=None) -> int:
+    """Traite (séquentiellement) toutes les tables dont le retry est échu."""
+    n = 0
+    while True:
+        due = state.claim_due_retries(RETRY_BATCH)
+        if not due:
+            return n
+        for tid, error_class in due:
+            apply_retry_item(state, process_retry(driver, state, tid, error_class, fetcher), counters)
+            n += 1
+
+
+def print_summary(counters: dict):
+    print("\n==============================")
+    print(f"🎉 Terminé.")
+    print(f"   Tables vues             = {counters['seen']}")
+    print(f"   Tables déjà cache (skip)= {counters['skipped_cached']}")
+    print(f"   Tables scrapées nouvelles= {counters['scraped_new']}")
+    print(f"   Parties importées DB     = {counters['imported']}")
+    print(f"   Retries programmés       = {counters['retry_scheduled']}")
+    print(f"   Tables abandonnées       = {counters['gave_up']}")
+    print(f"📁 JSON moves enregistrés dans: {OUT_DIR}")
+    print(f"🧠 État: {SCRAPE_STATE_PATH}")
+
+
+def discover_tables(driver, state: ScrapeState, player_id: str, incremental: bool):
+    newer_than = state.get_watermark(player_id) if incremental else None
+    table_ids = get_connect4_table_ids(
+        driver, player_id, GAME_ID, FINISHED, MAX_TABLES_PER_PLAYER, newer_than
+    )
+    if newer_than is not None:
+        print(f"    Tables nouvelles (> {newer_than}) = {len(table_ids)}")
+    else:
+        print(f"    Tables trouvées (brut) = {len(table_ids)}")
+    return [str(t) for t in table_ids]
+
+
+def advance_watermark(state: ScrapeState, player_id: str, table_ids):
+    """
+    Avance la marque haute seulement si toutes les tables listées sont traitées:
+    une table en erreur de worker non encore enregistrée sera revue au prochain
+    passage (les tables en retry comptent comme traitées: le stage retry s'en charge).
+    """
+    if table_ids and all(state.is_scraped(t) for t in table_ids):
+        state.set_watermark(player_id, max(int(t) for t in table_ids))
+
+
+# ============================================================
+# MAIN séquentiel (1 driver)
+# ============================================================
+
+
+def run_sequential(
+    driver,
+    players,
+    state: ScrapeState,
+    use_http: bool = False,
+    incremental: bool = True,
+):
+    fetcher = HttpFetcher.from_driver(driver) if use_http else None
+    counters = new_counters()
+
+    for idx, (player_id, pseudo) in enumerate(players, start=1):
+        print("\n==============================")
+        print(f" Joueur {idx}/{len(players)}: {pseudo} ({player_id})")
+
+        table_ids = discover_tables(driver, state, player_id, incremental)
+
+        for tid in table_ids:
+            counters["seen"] += 1
+
+            # ✅ skip si déjà scrapée
+            if state.is_scraped(tid):
+                print(f"   ⏭️ Table {tid} déjà scrapée (état local) -> skip")
+                counters["skipped_cached"] += 1
+                continue
+
+            print(f"   🎲 Table: {tid}")
+            result = scrape_table(driver, tid, fetcher)
+            handle_result(state, result, pseudo, player_id, counters)
+            time.sleep(PAUSE_BETWEEN_TABLES)
+
+        advance_watermark(state, player_id, table_ids)
+        time.sleep(PAUSE_BETWEEN_PLAYERS)
+
+    n = run_due_retries(driver, state, counters, fetcher)
+    if n:
+        print(f"🔁 {n} retries traités")
+    return counters
 
-        players = collect_players_from_ranking(driver, max_players=MAX_PLAYERS)
+
+# ============================================================
+# MAIN pipeline (étages + files bornées)
+# ============================================================
+#
+#   joueurs -> tables -> fetch -> parse -> persist (état + JSON + DB)
+#                ^                            ^
+#              retry (tables échues) ---------+ (ré-import des échecs DB)
+
+
+def merge_counters(parts) -> dict:
+    total = new_counters()
+    for part in parts:
+        for k, v in part.items():
+            total[k] += v
+    return total
+
+
+def run_pipeline(
+    driver,
+    state: ScrapeState,
+    n_fetch: int,
+    headless: bool,
+    share_session: bool,
+    use_http: bool = False,
+    incremental: bool = True,
+    n_discovery: int = DEFAULT_DISCOVERY_WORKERS,
+    n_parse: int = DEFAULT_PARSE_WORKERS,
+    n_persist: int = DEFAULT_PERSIST_WORKERS,
+    retry: bool = True,
+    stats_every: float = DEFAULT_STATS_EVERY,
+):
+    """
+    Chaque étage a sa propre concurrence et ses compteurs (débit, temps occupé,
+    profondeur de file): le goulot d'étranglement se lit dans le rapport.
+    - joueurs : classement (driver principal), source unique
+    - tables  : /gamestats par joueur (n_discovery drivers, le 1er = driver principal,
+                libre dès que le classement est lu)
+    - fetch   : /table + /gamereview (+ replay) par table (n_fetch drivers)
+    - parse   : extraction des coups des pages brutes (n_parse threads, CPU)
+    - persist : état + JSON + import DB (n_persist threads)
+    - retry   : réinjecte les tables échues dans fetch (ou persist pour la DB)
+    """
+    players_ch = Channel("players", PLAYER_QUEUE_SIZE)
+    tables_ch = Channel("tables", TABLE_QUEUE_SIZE)
+    fetched_ch = Channel("fetched", FETCHED_QUEUE_SIZE)
+    persist_ch = Channel("persist", PERSIST_QUEUE_SIZE)
+
+    discovery_counters = new_counters()
+    discovery_lock = threading.Lock()
+    enqueued = set()
+    discovered = []  # (player_id, table_ids) -> marques hautes en fin de run
+    tables_done = threading.Event()
+
+    # --- fonctions d'étage: fn(ctx, item) -> sorties ---
+    def players_source(ctx, _):
+        players = collect_players_from_ranking(ctx, max_players=MAX_PLAYERS)
         if not players:
             print("❌ Aucun joueur trouvé depuis le classement.")
-            return
+        return players
+
+    def discover(ctx, item):
+        player_id, pseudo = item
+        print(f"\n Joueur: {pseudo} ({player_id})")
+        table_ids = discover_tables(ctx, state, player_id, incremental)
+        out = []
+        with discovery_lock:
+            discovered.append((player_id, table_ids))
+            for tid in table_ids:
+                discovery_counters["seen"] += 1
+                if tid in enqueued or state.is_scraped(tid):
+                    discovery_counters["skipped_cached"] += 1
+                    continue
+                enqueued.add(tid)
+                out.append((tid, pseudo, player_id))
+        return out
+
+    def retry_source(ctx, _):
+        try:
+            while not tables_done.is_set():
+                due = state.claim_due_retries(RETRY_BATCH)
+                if not due:
+                    tables_done.wait(RETRY_POLL_SECONDS)
+                    continue
+                for tid, error_class in due:
+                    if error_class == ERR_DB:
+                        persist_ch.put(("reimport", tid))
+                    else:
+                        print(f"   🔁 Retry table {tid} ({error_class})")
+                        yield (tid, "retry", "0")
+        finally:
+            persist_ch.producer_done()
 
-        total_seen = 0
-        total_scraped_new = 0
-        total_imported = 0
-        total_skipped_cached = 0
+    def fetch(ctx, item):
+        tid, pseudo, player_id = item
+        try:
+            result = fetch_table(ctx["driver"], tid, ctx["fetcher"])
+        except Exception as e:
+            print(f"   [{tid}] ⚠️ fetch error:", e)
+            result = error_result(tid, e)
+        return [(result, pseudo, player_id)]
+
+    def parse(ctx, item):
+        result, pseudo, player_id = item
+        return [("result", (parse_fetched(result), pseudo, player_id))]
+
+    def persist(ctx, item):
+        kind, payload = item
+        if kind == "reimport":
+            handle_reimport(state, payload, ctx)
+        else:
+            result, pseudo, player_id = payload
+            handle_result(state, result, pseudo, player_id, ctx)
+
+    # --- échec inattendu d'un étage: la table part en retry au lieu d'être perdue ---
+    def fetch_failed(ctx, item, exc):
+        tid, pseudo, player_id = item
+        return [(error_result(tid, exc), pseudo, player_id)]
+
+    def parse_failed(ctx, item, exc):
+        result, pseudo, player_id = item
+        return [("result", (error_result(result["table_id"], exc), pseudo, player_id))]
+
+    def persist_failed(ctx, item, exc):
+        kind, payload = item
+        if kind == "reimport":
+            schedule_retry(state, payload, ERR_DB, exc, ctx)
+        else:
+            result = error_result(payload[0]["table_id"], exc)
+            schedule_retry(state, result["table_id"], classify_failure(result), result["error"], ctx)
+
+    # --- drivers ---
+    drivers = []
 
-        for idx, (player_id, pseudo) in enumerate(players, start=1):
-            print("\n==============================")
-            print(f" Joueur {idx}/{len(players)}: {pseudo} ({player_id})")
+    def new_driver():
+        d = make_driver(headless=headless)
+        if share_session:
+            copy_session(driver, d)
+        drivers.append(d)
+        return d
 
-            table_ids = get_connect4_table_ids(
-                driver, player_id, GAME_ID, FINISHED, MAX_TABLES_PER_PLAYER
+    try:
+        discovery_drivers = [driver] + [new_driver() for _ in range(max(1, n_discovery) - 1)]
+        fetch_ctx = []
+        for _ in range(max(1, n_fetch)):
+            d = new_driver()
+            fetch_ctx.append(
+                {"driver": d, "fetcher": HttpFetcher.from_driver(driver) if use_http else None}
             )
-            print(f"    Tables trouvées (brut) = {len(table_ids)}")
+        persist_ctx = [new_counters() for _ in range(max(1, n_persist))]
+
+        stages = [
+            Stage("joueurs", players_source, None, players_ch, [driver]),
+            Stage("tables", discover, players_ch, tables_ch, discovery_drivers),
+            Stage("fetch", fetch, tables_ch, fetched_ch, fetch_ctx, on_error=fetch_failed),
+            Stage(
+                "parse",
+                parse,
+                fetched_ch,
+                persist_ch,
+                [None] * max(1, n_parse),
+                on_error=parse_failed,
+            ),
+            Stage("persist", persist, persist_ch, None, persist_ctx, on_error=persist_failed),
+        ]
+        if retry:
+            persist_ch.add_producer()
+            stages.append(Stage("retry", retry_source, None, tables_ch, [None]))
+
+        reporter = StatsReporter(stages, every=stats_every)
+        for st in stages:
+            st.start()
+        reporter.start()
+
+        stages[1].join()  # découverte terminée -> le stage retry s'arrête
+        tables_done.set()
+        for st in stages:
+            st.join()
+        reporter.stop()
+        print("📊 Pipeline (final):\n" + format_stats(reporter.snapshots()))
+
+        for player_id, table_ids in discovered:
+            advance_watermark(state, player_id, table_ids)
+    finally:
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
 
-            for tid in table_ids:
-                tid = str(tid)
-                total_seen += 1
+    return merge_counters([discovery_counters] + persist_ctx)
 
-                # ✅ skip si déjà scrapée
-                if tid in scraped_set:
-                    print(f"   ⏭️ Table {tid} déjà scrapée (cache) -> skip")
-                    total_skipped_cached += 1
-                    continue
 
-                print(f"   🎲 Table: {tid}")
-
-                # --- size check via /table ---
-                size = get_board_size_from_table_page(driver, tid)
-
-                if ONLY_9X9:
-                    if size is None:
-                        if STRICT_SIZE_CHECK:
-                            print("        SKIP (size unknown)")
-                            mark_scraped(
-                                cache, tid
-                            )  # on marque quand même pour éviter boucles infinies
-                            scraped_set.add(tid)
-                            save_scraped_cache(cache)
-                            time.sleep(PAUSE_BETWEEN_TABLES)
-                            continue
-                    else:
-                        r, c = size
-                        if (r, c) != (9, 9):
-                            print(f"        SKIP (size {r}x{c} not 9x9)")
-                            mark_scraped(cache, tid)
-                            scraped_set.add(tid)
-                            save_scraped_cache(cache)
-                            time.sleep(PAUSE_BETWEEN_TABLES)
-                            continue
-
-                # --- gamereview extraction ---
-                try:
-                    _size_from_gamereview, moves = (
-                        extract_size_and_moves_from_gamereview(driver, tid)
-                    )
-                except Exception as e:
-                    moves = []
-                    print("      ⚠️ gamereview failed:", e)
-
-                if moves:
-                    names = sorted(
-                        {
-                            m.get("player_name", "")
-                            for m in moves
-                            if m.get("player_name")
-                        }
-                    )
-                    if names:
-                        print("       Joueurs détectés:", " vs ".join(names))
-                    print(f"      ✅ {len(moves)} coups (gamereview)")
-
-                # --- fallback replay archive ---
-                if not moves:
-                    replay_url = resolve_real_replay_url_from_table(driver, tid)
-                    if replay_url:
-                        print("       Archive replay:", replay_url)
-                        try:
-                            moves = extract_moves_from_replay_url(driver, replay_url)
-                        except Exception as e:
-                            moves = []
-                            print("      ⚠️ archive extraction failed:", e)
-
-                        if moves:
-                            print(f"      ✅ {len(moves)} coups (archive)")
-
-                if not moves:
-                    print("      ❌ Aucun coup trouvé (skip)")
-                    # on marque scrapée pour ne plus y revenir (tu peux enlever si tu veux re-try plus tard)
-                    mark_scraped(cache, tid)
-                    scraped_set.add(tid)
-                    save_scraped_cache(cache)
-                    time.sleep(PAUSE_BETWEEN_TABLES)
-                    continue
+# ============================================================
+# MAIN
+# ============================================================
 
-                # --- save JSON ---
-                out_path = OUT_DIR / f"moves_{pseudo}_{player_id}_table_{tid}.json"
-                out_path.write_text(
-                    json.dumps(moves, indent=2, ensure_ascii=False), encoding="utf-8"
-                )
-
-                # ✅ mark as scraped
-                mark_scraped(cache, tid)
-                scraped_set.add(tid)
-                save_scraped_cache(cache)
-                total_scraped_new += 1
-
-                # --- import DB if not already imported ---
-                if tid in imported_set:
-                    print("      ⏭️ Import DB déjà fait (cache) -> skip import")
-                    time.sleep(PAUSE_BETWEEN_TABLES)
-                    continue
 
-                save_name = f"BGA_table_{tid}_from_{pseudo}"
-                try:
-                    game_id_db = import_into_db(moves, save_name=save_name)
-                    print("      💾 Import DB OK id_partie =", game_id_db)
-                    total_imported += 1
-                    mark_imported(cache, tid)
-                    imported_set.add(tid)
-                    save_scraped_cache(cache)
-                except Exception as e:
-                    print("      ❌ Import DB FAILED:", e)
-                    mark_failed(cache, tid, e)
-                    save_scraped_cache(cache)
+def main(argv=None):
+    global BASE, RATE_LIMITER, RAW_ARCHIVE
 
-                time.sleep(PAUSE_BETWEEN_TABLES)
+    ap = argparse.ArgumentParser(description="Scraping BGA Connect4 -> JSON + DB")
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help=f"drivers de l'étage fetch (0 = mode séquentiel historique, ex: {DEFAULT_WORKERS})",
+    )
+    ap.add_argument(
+        "--discovery-workers",
+        type=int,
+        default=DEFAULT_DISCOVERY_WORKERS,
+        help="drivers de l'étage tables (/gamestats), le 1er est le driver principal",
+    )
+    ap.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS)
+    ap.add_argument("--persist-workers", type=int, default=DEFAULT_PERSIST_WORKERS)
+    ap.add_argument(
+        "--stats-every",
+        type=float,
+        default=DEFAULT_STATS_EVERY,
+        help="secondes entre deux rapports par étage (0 = rapport final seulement)",
+    )
+    ap.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help=f"limite globale de chargements de page par seconde (défaut pipeline: {DEFAULT_RATE})",
+    )
+    ap.add_argument("--headless", action="store_true", help="drivers workers sans fenêtre")
+    ap.add_argument("--base-url", default=None, help="ex: http://127.0.0.1:8765 (bga_fixture_server.py)")
+    ap.add_argument("--no-login", action="store_true", help="pas de login manuel")
+    ap.add_argument(
+        "--selenium-only",
+        action="store_true",
+        help="désactive le fetch HTTP sans navigateur (tout passe par Chrome)",
+    )
+    ap.add_argument(
+        "--full",
+        action="store_true",
+        help="ignore les marques hautes par joueur et rescrolle tout l'historique",
+    )
+    ap.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="n'archive pas les pages brutes (raw_pages/, re-parse impossible)",
+    )
+    ap.add_argument(
+        "--no-retry",
+        action="store_true",
+        help="pas d'étage retry pendant le crawl (pipeline)",
+    )
+    ap.add_argument(
+        "--retry-only",
+        action="store_true",
+        help="ne crawle pas: traite seulement les retries échus puis quitte",
+    )
+    args = ap.parse_args(argv)
 
-            time.sleep(PAUSE_BETWEEN_PLAYERS)
+    if args.base_url:
+        BASE = args.base_url.rstrip("/")
+    rate = args.rate if args.rate is not None else (DEFAULT_RATE if args.workers > 0 else None)
+    RATE_LIMITER = RateLimiter(rate)
+    if not args.no_archive:
+        RAW_ARCHIVE = RawArchive()
 
-        print("\n==============================")
-        print(f"🎉 Terminé.")
-        print(f"   Tables vues             = {total_seen}")
-        print(f"   Tables déjà cache (skip)= {total_skipped_cached}")
-        print(f"   Tables scrapées nouvelles= {total_scraped_new}")
-        print(f"   Parties importées DB     = {total_imported}")
-        print(f"📁 JSON moves enregistrés dans: {OUT_DIR}")
-        print(f"🧠 Cache: {SCRAPED_CACHE_PATH}")
+    driver = make_driver(headless=False)
+    state = load_scrape_state()
+
+    c = state.counts()
+    print(
+        f"🧠 État chargé: scraped={c['scraped']}, imported={c['imported']}, "
+        f"retry={c['retry']}, gave_up={c['gave_up']}"
+    )
+    print(f"📌 État: {SCRAPE_STATE_PATH}")
+
+    try:
+        if not args.no_login:
+            login_bga_manual(driver)
+
+        if args.retry_only:
+            counters = new_counters()
+            fetcher = HttpFetcher.from_driver(driver) if not args.selenium_only else None
+            n = run_due_retries(driver, state, counters, fetcher)
+            print(f"🔁 {n} retries traités")
+            print_summary(counters)
+            return
+
+        if args.workers > 0:
+            print(
+                f"🚀 Mode pipeline: fetch x{args.workers}, tables x{args.discovery_workers}, "
+                f"parse x{args.parse_workers}, persist x{args.persist_workers}, "
+                f"limite={rate or '∞'} pages/s"
+            )
+            counters = run_pipeline(
+                driver,
+                state,
+                n_fetch=args.workers,
+                headless=args.headless,
+                share_session=not args.no_login,
+                use_http=not args.selenium_only,
+                incremental=not args.full,
+                n_discovery=args.discovery_workers,
+                n_parse=args.parse_workers,
+                n_persist=args.persist_workers,
+                retry=not args.no_retry,
+                stats_every=args.stats_every,
+            )
+        else:
+            players = collect_players_from_ranking(driver, max_players=MAX_PLAYERS)
+            if not players:
+                print("❌ Aucun joueur trouvé depuis le classement.")
+                return
+            counters = run_sequential(
+                driver,
+                players,
+                state,
+                use_http=not args.selenium_only,
+                incremental=not args.full,
+            )
+
+        print_summary(counters)
 
     finally:
         driver.quit()
+        state.close()
 
 
 if __name__ == "__main__":
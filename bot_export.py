@@ -0,0 +1,288 @@
+"""
+bot_export.py
+============================================================
+Export incrémental des parties du bot (SQLite connect4.db) vers saved_games
+✅ Lit les games_live FINISHED au-delà d'un watermark (id), par lots
+✅ SQLite ouvert en lecture seule, transactions de lecture courtes
+   (en WAL, le bot continue d'écrire pendant l'export)
+✅ Watermark gardé dans PostgreSQL, commité avec les parties du lot
+   -> un lot est exporté entièrement ou pas du tout, relance sans doublon
+✅ Une partie encore IN_PROGRESS bloque le watermark (plusieurs sessions
+   finissent dans le désordre), sauf si elle est trop vieille (bot tué)
+✅ Séquence reconstruite depuis les coups lus côté page (JS), passée en
+   0-based avec la base des colonnes enregistrée par le bot (games_live.col_offset)
+   et rejouée sur la taille réelle du plateau (games_live.board_rows / board_cols) (connect4_core): index non contigus (coup perdu),
+   coups illégaux refusés
+✅ Chargement via COPY + dédoublonnage (mêmes règles que bga_bulk_import)
+============================================================
+
+Usage:
+    python bot_export.py --sqlite connect4.db
+    python bot_export.py --watch 300     # relance toutes les 5 min
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+from bga_bulk_import import load_chunk
+from bga_import import _ensure_schema_once, db_connect
+from connect4_core import replay_game
+
+DEFAULT_SQLITE = "connect4.db"
+DEFAULT_BATCH = 500  # parties par transaction PostgreSQL
+STALE_HOURS = 6.0  # IN_PROGRESS plus vieux -> considéré comme abandonné
+
+# 3=BGA/humain (gamereview); ici coups lus côté page pendant la partie
+CONFIANCE_COMPLETE = 2  # partie rejouée jusqu'à victoire / nul
+CONFIANCE_PARTIAL = 1  # partie terminée côté BGA mais sans fin sur le plateau (abandon...)
+
+WATERMARK_SQL = """
+CREATE TABLE IF NOT EXISTS sync_watermarks (
+    source VARCHAR(200) PRIMARY KEY,
+    last_id BIGINT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# mode=1 (humain vs IA): le bot joue contre un humain BGA
+INSERT_SQL = """
+INSERT INTO saved_games
+  (save_name, rows, cols, starting_color, mode, game_index,
+   moves, view_index, ai_mode, ai_depth, confidence, distinct_cols,
+   winner, win_ply, final_hash, save_date)
+SELECT s.save_name, s.rows, s.cols, 'R', 1, 1,
+       s.moves, 0, 'bga_bot', 4, %s, s.distinct_cols,
+       s.winner, s.win_ply, s.final_hash, NOW()
+FROM bga_bulk_staging s
+WHERE NOT EXISTS (
+    SELECT 1 FROM saved_games g
+    WHERE g.rows = s.rows AND g.cols = s.cols AND g.moves = s.moves
+);
+"""
+
+
+# =======================
+# Lecture SQLite (courte, lecture seule)
+# =======================
+def open_sqlite_ro(path: str):
+    """Connexion lecture seule: ne prend jamais de verrou d'écriture."""
+    uri = f"file:{os.path.abspath(path)}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, timeout=10, isolation_level=None)
+    conn.execute("PRAGMA query_only = ON;")
+    return conn
+
+
+def read_batch(conn, after_id: int, limit: int, stale_before: str):
+    """
+    Un instantané (BEGIN ... COMMIT) -> (parties, coups par partie, borne).
+
+    borne = plus grand id qu'on peut dépasser sans sauter une partie encore
+    en cours; None si aucune partie en cours ne bloque.
+    """
+    conn.execute("BEGIN")
+    try:
+        row = conn.execute(
+            """
+            SELECT MIN(id) FROM games_live
+            WHERE id > ? AND status = 'IN_PROGRESS' AND started_at_utc >= ?
+            """,
+            (after_id, stale_before),
+        ).fetchone()
+        horizon = row[0]
+
+        # plateau enregistré par le bot (NULL pour les bases plus anciennes)
+        have = {r[1] for r in conn.execute("PRAGMA table_info(games_live)")}
+        board = ", ".join(
+            c if c in have else "NULL" for c in ("col_offset", "board_rows", "board_cols")
+        )
+        sql = f"SELECT id, bga_table_id, status, {board} FROM games_live WHERE id > ?"
+        params = [after_id]
+        if horizon is not None:
+            sql += " AND id < ?"
+            params.append(horizon)
+        sql += " ORDER BY id LIMIT ?"
+        params.append(limit)
+        games = conn.execute(sql, params).fetchall()
+
+        moves = {}
+        finished = [g[0] for g in games if g[2] == "FINISHED"]
+        if finished:
+            marks = ",".join("?" * len(finished))
+            for game_id, move_index, player, col in conn.execute(
+                f"""
+                SELECT game_id, move_index, player, col FROM moves_live
+                WHERE game_id IN ({marks})
+                ORDER BY game_id, move_index
+                """,
+                finished,
+            ):
+                moves.setdefault(game_id, []).append((move_index, player, col))
+    finally:
+        conn.execute("COMMIT")
+    return games, moves, horizon
+
+
+# =======================
+# Reconstruction
+# =======================
+def rebuild_columns(move_rows, col_offset) -> list:
+    """
+    Colonnes 0-based de la partie. Seuls les coups lus côté page (JS) donnent
+    la séquence des deux joueurs; nos coups de repli sont dans my_moves_live
+    (les lignes "ME" de moves_live, anciennes bases, sont ignorées).
+    Lève ValueError si la séquence est absente ou trouée: les index doivent
+    être exactement 0..n-1, sinon un coup manque et la partie serait fausse.
+    col_offset = base des colonnes du DOM enregistrée par le bot; sans elle
+    (anciennes parties) la partie est refusée plutôt que devinée.
+    """
+    js = [(mi, col) for mi, player, col in move_rows if player != "ME"]
+    if not js:
+        raise ValueError("aucun coup lu côté page (seulement nos coups)")
+    if [mi for mi, _ in js] != list(range(len(js))):
+        raise ValueError("index de coups non contigus (coup manquant)")
+    if any(col is None for _, col in js):
+        raise ValueError("colonne inconnue dans l'historique")
+    if col_offset is None:
+        raise ValueError("base des colonnes inconnue (col_offset non enregistré)")
+    return [int(col) - int(col_offset) for _, col in js]
+
+
+def build_row(game_id, table_id, move_rows, board):
+    """
+    board = (col_offset, rows, cols) enregistré par le bot.
+    -> (confiance, row au format bga_bulk_import.load_chunk).
+    """
+    col_offset, rows, cols = board
+    if rows is None or cols is None:
+        raise ValueError("taille du plateau inconnue (non enregistrée par le bot)")
+    cols_0 = rebuild_columns(move_rows, col_offset)
+    replay = replay_game(rows, cols, cols_0, "R")
+    confidence = CONFIANCE_COMPLETE if replay["winner"] else CONFIANCE_PARTIAL
+    save_name = f"BGA_bot_{table_id or 'local'}_{game_id}"
+    return confidence, (save_name[:100], rows, cols, cols_0, replay)
+
+
+# =======================
+# Watermark (PostgreSQL)
+# =======================
+def get_watermark(pg, source: str) -> int:
+    with pg.cursor() as cur:
+        cur.execute(WATERMARK_SQL)
+        cur.execute("SELECT last_id FROM sync_watermarks WHERE source = %s", (source,))
+        row = cur.fetchone()
+    pg.commit()
+    return int(row[0]) if row else 0
+
+
+def set_watermark(pg, source: str, last_id: int):
+    """Dans la transaction du lot (pas de commit ici)."""
+    with pg.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO sync_watermarks (source, last_id, updated_at)
+            VALUES (%s, %s, NOW())
+            ON CONFLICT (source) DO UPDATE SET
+                last_id = GREATEST(sync_watermarks.last_id, EXCLUDED.last_id),
+                updated_at = NOW()
+            """,
+            (source, int(last_id)),
+        )
+
+
+# =======================
+# Export
+# =======================
+def export_once(sqlite_path: str, batch: int = DEFAULT_BATCH, stale_hours: float = STALE_HOURS) -> dict:
+    source = f"bot_sqlite:{os.path.basename(os.path.abspath(sqlite_path))}"
+    stale_before = (
+        datetime.now(timezone.utc) - timedelta(hours=stale_hours)
+    ).isoformat()
+    stats = {"games": 0, "inserted": 0, "dups": 0, "skipped": 0, "rejected": 0}
+
+    lite = open_sqlite_ro(sqlite_path)
+    try:
+        with db_connect() as pg:
+            _ensure_schema_once(pg)
+            wm = get_watermark(pg, source)
+            print(f"🔖 {source}: watermark id={wm}")
+
+            while True:
+                games, moves, horizon = read_batch(lite, wm, batch, stale_before)
+                if not games:
+                    if horizon is not None:
+                        print(f"⏸️ partie {horizon} encore en cours -> arrêt au watermark {wm}")
+                    break
+
+                by_conf = {}
+                seen = set()
+                for game_id, table_id, status, *board in games:
+                    stats["games"] += 1
+                    if status != "FINISHED":
+                        stats["skipped"] += 1  # ABORTED / IN_PROGRESS abandonné
+                        continue
+                    try:
+                        conf, row = build_row(
+                            game_id, table_id, moves.get(game_id, []), board
+                        )
+                    except ValueError as e:
+                        stats["rejected"] += 1
+                        if stats["rejected"] <= 20:
+                            print(f"   ⚠️ partie {game_id} (table {table_id}): {e}")
+                        continue
+                    key = (row[1], row[2], tuple(row[3]))
+                    if key in seen:
+                        stats["dups"] += 1
+                        continue
+                    seen.add(key)
+                    by_conf.setdefault(conf, []).append(row)
+
+                n_rows = sum(len(rows) for rows in by_conf.values())
+                inserted = 0
+                for conf, rows in by_conf.items():
+                    inserted += load_chunk(pg, rows, conf, insert_sql=INSERT_SQL, commit=False)
+                wm = games[-1][0]
+                set_watermark(pg, source, wm)
+                pg.commit()
+
+                stats["inserted"] += inserted
+                stats["dups"] += n_rows - inserted
+                print(
+                    f"✅ lot jusqu'à id={wm}: {len(games)} parties, insérées={inserted}, "
+                    f"rejetées={stats['rejected']}"
+                )
+    finally:
+        lite.close()
+
+    stats["watermark"] = wm
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Export incrémental des parties du bot (SQLite) vers saved_games"
+    )
+    ap.add_argument("--sqlite", default=DEFAULT_SQLITE)
+    ap.add_argument("--batch", type=int, default=DEFAULT_BATCH)
+    ap.add_argument("--stale-hours", type=float, default=STALE_HOURS)
+    ap.add_argument(
+        "--watch",
+        type=float,
+        default=0.0,
+        help="relance l'export toutes les N secondes (0 = une seule passe)",
+    )
+    args = ap.parse_args(argv)
+
+    while True:
+        t0 = time.perf_counter()
+        stats = export_once(args.sqlite, max(1, args.batch), args.stale_hours)
+        print(f"🎉 Export en {time.perf_counter() - t0:.1f}s: {stats}")
+        if args.watch <= 0:
+            break
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+bot_runner.py
+============================================================
+Plusieurs sessions BGABot en parallèle (un Chrome par session)
+✅ Un thread coordinateur par session; chaque session pilote son propre
+   process Chrome (headless possible) -> le rendu se répartit sur les cœurs
+✅ Un seul DBWriter write-behind partagé (file thread-safe, un seul écrivain SQLite)
+✅ Profil Chrome propre à chaque session (profile_1, profile_2, ...)
+✅ Santé par session: phase, parties jouées, échecs, dernière erreur
+✅ Chien de garde: lobby / partie trop longs ou bot figé -> abandon + relance
+✅ Relance avec backoff exponentiel plafonné, remis à zéro après une partie finie
+============================================================
+
+Prérequis: se connecter une fois à BGA (sans --headless) dans chaque profil,
+chaque session devant utiliser un compte différent.
+
+Usage:
+    python bot_runner.py --sessions 3 --mode engine --headless
+"""
+
+import argparse
+import threading
+import time
+from pathlib import Path
+
+from main import ENGINE_TIME_BUDGET, BGABot, DBWriter
+
+PROJECT_DIR = Path(__file__).resolve().parent
+
+DEFAULT_SESSIONS = 2
+CHROME_VERSION = 144
+
+BACKOFF_BASE = 15.0  # s avant la 1re relance
+BACKOFF_MAX = 600.0  # plafond du backoff
+MAX_FAILURES = 8  # échecs consécutifs avant d'abandonner la session
+
+LOBBY_TIMEOUT = 15 * 60  # s sans trouver d'adversaire
+GAME_TIMEOUT = 40 * 60  # s pour une partie
+HANG_TIMEOUT = 120.0  # s sans signe de vie du bot (driver bloqué)
+WATCHDOG_EVERY = 10.0
+DEFAULT_STATS_EVERY = 60.0
+
+PHASE_LIMITS = {"lobby": LOBBY_TIMEOUT, "game": GAME_TIMEOUT}
+
+
+class Session:
+    """Une session = un profil Chrome + une boucle partie / relance."""
+
+    def __init__(self, idx: int, db: DBWriter, args, stop: threading.Event):
+        self.name = f"s{idx}"
+        self.profile_dir = str(PROJECT_DIR / f"profile_{idx}")
+        self.db = db
+        self.args = args
+        self.stop = stop
+        self.bot = None
+        self.thread = None
+
+        self.state = "starting"
+        self.games = 0
+        self.failures = 0  # consécutifs
+        self.restarts = 0
+        self.last_error = None
+        self.started_at = time.monotonic()
+
+    # ---------- boucle ----------
+    def _run_bot(self):
+        self.state = "launching"
+        self.bot = BGABot(
+            chrome_version=CHROME_VERSION,
+            move_mode=self.args.mode,
+            think_time=self.args.think_time,
+            db=self.db,
+            profile_dir=self.profile_dir,
+            headless=self.args.headless,
+        )
+        self.bot.login()
+        self.state = "running"
+        while not self.stop.is_set():
+            if self.bot.play_game("connectfour"):
+                self.games += 1
+                self.failures = 0
+                print(f"[{self.name}] ✅ partie {self.games} terminée")
+
+    def _shutdown_bot(self):
+        bot, self.bot = self.bot, None
+        if bot is None:
+            return
+        bot.abort_current_game()
+        bot.close(wait_for_enter=False)
+
+    def run(self):
+        while not self.stop.is_set():
+            try:
+                self._run_bot()
+            except Exception as e:
+                if not self.stop.is_set():
+                    self.failures += 1
+                    self.last_error = str(e)[:200]
+                    print(f"[{self.name}] ⚠️ session en échec ({self.failures}): {self.last_error}")
+            finally:
+                self._shutdown_bot()
+
+            if self.stop.is_set():
+                break
+            if self.failures >= MAX_FAILURES:
+                self.state = "dead"
+                print(f"[{self.name}] ❌ {self.failures} échecs consécutifs -> session arrêtée")
+                return
+
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(0, self.failures - 1))
+            self.state = "backoff"
+            print(f"[{self.name}] ⏳ relance dans {delay:.0f}s")
+            self.stop.wait(delay)
+            self.restarts += 1
+        self.state = "stopped"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+        self.thread.start()
+
+    # ---------- santé ----------
+    def check_health(self):
+        """Appelé par le chien de garde: demande l'abandon d'un bot bloqué."""
+        bot = self.bot
+        if bot is None or bot.abort.is_set():
+            return
+        now = time.monotonic()
+        limit = PHASE_LIMITS.get(bot.phase)
+        if limit is not None and now - bot.phase_since > limit:
+            print(f"[{self.name}] 🐕 phase '{bot.phase}' trop longue -> relance")
+            bot.abort.set()
+        elif bot.phase != "login" and now - bot.heartbeat > HANG_TIMEOUT:
+            # le thread est coincé dans un appel WebDriver: fermer Chrome le débloque
+            print(f"[{self.name}] 🐕 aucun signe de vie depuis {now - bot.heartbeat:.0f}s -> relance")
+            bot.abort.set()
+            try:
+                bot.driver.quit()
+            except Exception:
+                pass
+
+    def snapshot(self) -> dict:
+        bot = self.bot
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "session": self.name,
+            "state": self.state,
+            "phase": bot.phase if bot is not None else "-",
+            "games": self.games,
+            "games_per_hour": 3600.0 * self.games / elapsed if elapsed > 0 else 0.0,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+        }
+
+
+def format_health(snaps) -> str:
+    lines = []
+    for s in snaps:
+        line = (
+            f"   {s['session']:<4} {s['state']:<9} phase={s['phase']:<8} "
+            f"parties={s['games']:<4} ({s['games_per_hour']:.1f}/h) "
+            f"échecs={s['failures']} relances={s['restarts']}"
+        )
+        if s["last_error"]:
+            line += f" | {s['last_error'][:80]}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def run_sessions(args):
+    stop = threading.Event()
+    db = DBWriter(db_path=args.db, write_behind=True)
+    sessions = [Session(i + 1, db, args, stop) for i in range(max(1, args.sessions))]
+
+    print(f"🚀 {len(sessions)} sessions (mode={args.mode}, headless={args.headless})")
+    last_stats = time.monotonic()
+    try:
+        for s in sessions:
+            s.start()
+            time.sleep(2)  # évite de lancer tous les Chrome en même temps
+
+        while any(s.thread is not None and s.thread.is_alive() for s in sessions):
+            time.sleep(WATCHDOG_EVERY)
+            for s in sessions:
+                s.check_health()
+            if args.stats_every > 0 and time.monotonic() - last_stats >= args.stats_every:
+                last_stats = time.monotonic()
+                print("📊 Sessions:\n" + format_health(s.snapshot() for s in sessions))
+    except KeyboardInterrupt:
+        print("\n🛑 Arrêt demandé, fermeture des sessions...")
+    finally:
+        stop.set()
+        for s in sessions:
+            bot = s.bot
+            if bot is not None:
+                bot.abort.set()
+        for s in sessions:
+            if s.thread is not None:
+                s.thread.join(timeout=60)
+        db.close()
+        print("📊 Bilan:\n" + format_health(s.snapshot() for s in sessions))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Plusieurs bots BGA Puissance 4 en parallèle")
+    ap.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS)
+    ap.add_argument("--mode", choices=["random", "engine"], default="random")
+    ap.add_argument(
+        "--think-time",
+        type=float,
+        default=ENGINE_TIME_BUDGET,
+        help="secondes de réflexion par coup en mode engine",
+    )
+    ap.add_argument("--headless", action="store_true")
+    ap.add_argument("--db", default="connect4.db")
+    ap.add_argument(
+        "--stats-every",
+        type=float,
+        default=DEFAULT_STATS_EVERY,
+        help="secondes entre deux rapports de santé (0 = aucun)",
+    )
+    run_sessions(ap.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
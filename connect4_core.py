@@ -0,0 +1,282 @@
+"""
+connect4_core.py
+============================================================
+Noyau Puissance 4 partagé (viewer, import BGA, générateurs, API)
+✅ Plateau en bitboards (toutes tailles 4..20, alignement de 4)
+✅ Hash Zobrist 64 bits maintenu incrémentalement (O(1) par coup)
+✅ Tables Zobrist stables et versionnées par taille de plateau
+✅ Hash miroir maintenu en parallèle -> hash canonique (symétrie gauche/droite)
+============================================================
+
+Layout des bitboards (colonne par colonne, bas en haut):
+  bit = col * (rows + 1) + row     (row 0 = ligne du bas)
+La ligne "sentinelle" (row == rows) reste toujours à 0 et évite
+les faux alignements entre deux colonnes.
+
+Layout des tables Zobrist (version 1):
+  cell = col * rows + row          (row 0 = ligne du bas)
+  table[cell][0] -> pion Rouge, table[cell][1] -> pion Jaune
+  + une clé "trait aux Jaunes" XORée quand c'est à Jaune de jouer.
+Toute modification de ce layout ou de la graine => incrémenter ZOBRIST_VERSION
+(les hash déjà stockés en base ne seraient plus comparables).
+"""
+
+import random
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+EMPTY = "."
+RED = "R"
+YELLOW = "Y"
+CONNECT_N = 4
+
+ZOBRIST_VERSION = 1
+
+_COLOR_INDEX = {RED: 0, YELLOW: 1}
+_MASK64 = (1 << 64) - 1
+
+
+def other(token: str) -> str:
+    return YELLOW if token == RED else RED
+
+
+# =======================
+# Zobrist
+# =======================
+@lru_cache(maxsize=None)
+def zobrist_table(rows: int, cols: int) -> Tuple[Tuple[Tuple[int, int], ...], int]:
+    """
+    Tables Zobrist pour un plateau rows x cols.
+    Déterministes (graine texte -> sha512 dans random.Random), donc identiques
+    d'un process / d'une machine à l'autre pour une même ZOBRIST_VERSION.
+
+    Retourne (table, side_key) avec table[cell] = (clé_rouge, clé_jaune).
+    """
+    rng = random.Random(f"connect4-zobrist-v{ZOBRIST_VERSION}-{rows}x{cols}")
+    table = tuple(
+        (rng.getrandbits(64), rng.getrandbits(64)) for _ in range(rows * cols)
+    )
+    side_key = rng.getrandbits(64)
+    return table, side_key
+
+
+def to_bigint(h: int) -> int:
+    """Convertit un hash 64 bits non signé vers la plage d'un BIGINT PostgreSQL."""
+    h &= _MASK64
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+def from_bigint(v: int) -> int:
+    """Inverse de to_bigint (BIGINT signé -> hash 64 bits non signé)."""
+    return v & _MASK64
+
+
+# =======================
+# Position
+# =======================
+class Position:
+    """
+    Position de Puissance 4 jouable/annulable coup par coup.
+
+    - heights[c] : nombre de pions dans la colonne c
+    - bb[0] / bb[1] : bitboards Rouge / Jaune
+    - hash / mirror_hash : Zobrist de la position et de son miroir gauche/droite
+    """
+
+    __slots__ = (
+        "rows",
+        "cols",
+        "starting_color",
+        "to_move",
+        "ply",
+        "heights",
+        "bb",
+        "mask",
+        "hash",
+        "mirror_hash",
+        "moves",
+        "_stride",
+        "_ztable",
+        "_side_key",
+    )
+
+    def __init__(self, rows: int = 9, cols: int = 9, starting_color: str = RED):
+        if starting_color not in (RED, YELLOW):
+            starting_color = RED
+        self.rows = int(rows)
+        self.cols = int(cols)
+        self.starting_color = starting_color
+        self.to_move = starting_color
+        self.ply = 0
+        self.heights = [0] * self.cols
+        self.bb = [0, 0]
+        self.mask = 0
+        self.moves: List[int] = []
+        self._stride = self.rows + 1
+        self._ztable, self._side_key = zobrist_table(self.rows, self.cols)
+
+        self.hash = 0
+        self.mirror_hash = 0
+        if starting_color == YELLOW:
+            self.hash ^= self._side_key
+            self.mirror_hash ^= self._side_key
+
+    # ---------- coups ----------
+    def can_play(self, col: int) -> bool:
+        return 0 <= col < self.cols and self.heights[col] < self.rows
+
+    def legal_columns(self) -> List[int]:
+        return [c for c in range(self.cols) if self.heights[c] < self.rows]
+
+    def play(self, col: int) -> int:
+        """
+        Joue dans `col` pour self.to_move.
+        Retourne la ligne (0 = haut, comme board[r][c]) où le pion est tombé.
+        Lève ValueError si la colonne est hors plateau ou pleine.
+        """
+        if col < 0 or col >= self.cols:
+            raise ValueError("col out of range")
+        h = self.heights[col]
+        if h >= self.rows:
+            raise ValueError("column full")
+
+        ci = _COLOR_INDEX[self.to_move]
+        bit = 1 << (col * self._stride + h)
+        self.bb[ci] |= bit
+        self.mask |= bit
+        self.heights[col] = h + 1
+
+        self.hash ^= self._ztable[col * self.rows + h][ci] ^ self._side_key
+        self.mirror_hash ^= (
+            self._ztable[(self.cols - 1 - col) * self.rows + h][ci] ^ self._side_key
+        )
+
+        self.moves.append(col)
+        self.ply += 1
+        self.to_move = other(self.to_move)
+        return self.rows - 1 - h
+
+    def undo(self) -> int:
+        """Annule le dernier coup, retourne sa colonne."""
+        if not self.moves:
+            raise ValueError("nothing to undo")
+        col = self.moves.pop()
+        h = self.heights[col] - 1
+        self.to_move = other(self.to_move)
+        ci = _COLOR_INDEX[self.to_move]
+
+        bit = 1 << (col * self._stride + h)
+        self.bb[ci] &= ~bit
+        self.mask &= ~bit
+        self.heights[col] = h
+
+        self.hash ^= self._ztable[col * self.rows + h][ci] ^ self._side_key
+        self.mirror_hash ^= (
+            self._ztable[(self.cols - 1 - col) * self.rows + h][ci] ^ self._side_key
+        )
+        self.ply -= 1
+        return col
+
+    # ---------- état ----------
+    def has_won(self, token: str) -> bool:
+        return _has_four(self.bb[_COLOR_INDEX[token]], self._stride)
+
+    def last_mover_won(self) -> bool:
+        """Vrai si le joueur qui vient de jouer a aligné 4 pions."""
+        return self.ply > 0 and self.has_won(other(self.to_move))
+
+    def is_full(self) -> bool:
+        return self.ply >= self.rows * self.cols
+
+    def winner(self) -> Optional[str]:
+        """'R' / 'Y' / 'D' (nul) ou None si la partie continue."""
+        if self.has_won(RED):
+            return RED
+        if self.has_won(YELLOW):
+            return YELLOW
+        if self.is_full():
+            return "D"
+        return None
+
+    def canonical_hash(self) -> int:
+        """Hash identique pour une position et son miroir gauche/droite."""
+        return min(self.hash, self.mirror_hash)
+
+    def is_mirrored_canonical(self) -> bool:
+        """Vrai si le hash canonique est celui du miroir (colonnes à retourner)."""
+        return self.mirror_hash < self.hash
+
+    def cell(self, row: int, col: int) -> str:
+        """Contenu de board[row][col] (row 0 = haut)."""
+        bit = 1 << (col * self._stride + (self.rows - 1 - row))
+        if self.bb[0] & bit:
+            return RED
+        if self.bb[1] & bit:
+            return YELLOW
+        return EMPTY
+
+    def to_grid(self) -> List[List[str]]:
+        """Plateau au format liste de listes (row 0 = haut), comme le reste du projet."""
+        return [
+            [self.cell(r, c) for c in range(self.cols)] for r in range(self.rows)
+        ]
+
+    @classmethod
+    def from_moves(
+        cls, rows: int, cols: int, moves, starting_color: str = RED
+    ) -> "Position":
+        pos = cls(rows, cols, starting_color)
+        for col in moves:
+            pos.play(int(col))
+        return pos
+
+
+def _has_four(b: int, stride: int) -> bool:
+    # vertical, horizontal, diagonale /, diagonale \
+    for shift in (1, stride, stride + 1, stride - 1):
+        m = b & (b >> shift)
+        if m & (m >> (2 * shift)):
+            return True
+    return False
+
+
+def position_hash(rows: int, cols: int, moves, starting_color: str = RED) -> int:
+    """Hash Zobrist (non signé) de la position obtenue après `moves`."""
+    return Position.from_moves(rows, cols, moves, starting_color).hash
+
+
+def replay_game(rows: int, cols: int, moves, starting_color: str = RED) -> dict:
+    """
+    Rejoue une partie complète en validant chaque coup.
+
+    Lève ValueError si un coup est illégal (hors plateau, colonne pleine)
+    ou si des coups suivent la fin de la partie (victoire / plateau plein).
+
+    Retourne:
+      - winner     : "R" / "Y" / "D" (nul) ou None si la partie est incomplète
+      - win_ply    : numéro (1-based) du coup gagnant, None sinon
+      - final_hash : hash Zobrist (non signé) de la position finale
+      - length     : nombre de coups
+    """
+    pos = Position(rows, cols, starting_color)
+    winner = None
+    win_ply = None
+    for i, col in enumerate(moves):
+        if winner is not None:
+            raise ValueError(f"coup {i + 1} joué après la fin de la partie")
+        try:
+            pos.play(int(col))
+        except ValueError as e:
+            raise ValueError(f"coup {i + 1} illégal (colonne {col}): {e}")
+        if pos.last_mover_won():
+            winner = other(pos.to_move)
+            win_ply = pos.ply
+        elif pos.is_full():
+            winner = "D"
+
+    return {
+        "winner": winner,
+        "win_ply": win_ply,
+        "final_hash": pos.hash,
+        "length": pos.ply,
+    }
@@ -0,0 +1,224 @@
+"""
+connect4_engine.py
+============================================================
+Moteur de recherche Puissance 4 (sur connect4_core.Position)
+✅ Negamax alpha-beta + table de transposition (clé = hash Zobrist)
+✅ Approfondissement itératif avec deadline stricte (budget temps)
+✅ Évaluation bitboard: menaces (cases gagnantes) + contrôle du centre
+✅ Une instance = une TT (un moteur par worker / par bot)
+============================================================
+"""
+
+import random
+import time
+from functools import lru_cache
+
+from connect4_core import Position
+
+WIN_SCORE = 1_000_000
+THREAT_WEIGHT = 16
+CENTER_WEIGHT = 3
+
+# flags TT
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+_CHECK_EVERY = 1024
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _board_consts(rows: int, cols: int):
+    """Masques précalculés par taille: plateau jouable, zone centrale, ordre des colonnes."""
+    stride = rows + 1
+    col_mask = (1 << rows) - 1
+    board_mask = 0
+    for c in range(cols):
+        board_mask |= col_mask << (c * stride)
+
+    # colonnes centrales (tiers du milieu, au moins 1 colonne)
+    lo = cols // 3
+    hi = cols - 1 - cols // 3
+    center_mask = 0
+    for c in range(lo, hi + 1):
+        center_mask |= col_mask << (c * stride)
+
+    mid = (cols - 1) / 2
+    order = tuple(sorted(range(cols), key=lambda c: (abs(c - mid), c)))
+    return board_mask, center_mask, order
+
+
+def winning_cells(b: int, stride: int) -> int:
+    """Cases (pas forcément vides / jouables) qui compléteraient un alignement de 4."""
+    r = (b << 1) & (b << 2) & (b << 3)  # vertical (on ne pose qu'au-dessus)
+    for s in (stride, stride - 1, stride + 1):
+        p = (b << s) & (b << (2 * s))
+        r |= p & (b << (3 * s))
+        r |= p & (b >> s)
+        p = (b >> s) & (b >> (2 * s))
+        r |= p & (b << s)
+        r |= p & (b >> (3 * s))
+    return r
+
+
+class Engine:
+    """
+    Moteur negamax. La TT est propre à l'instance: créer un Engine par process
+    (ou par session de bot) pour éviter tout partage entre threads/process.
+    """
+
+    def __init__(self, max_tt_entries: int = 2_000_000, rng=None):
+        self.tt = {}
+        self.max_tt_entries = max_tt_entries
+        self.rng = rng or random.Random()
+        self.nodes = 0
+        self._deadline = None
+
+    # ---------- évaluation ----------
+    def evaluate(self, pos: Position) -> int:
+        """Score heuristique du point de vue du joueur au trait."""
+        board_mask, center_mask, _ = _board_consts(pos.rows, pos.cols)
+        free = board_mask & ~pos.mask
+        me = 0 if pos.to_move == "R" else 1
+        mine, theirs = pos.bb[me], pos.bb[1 - me]
+
+        my_threats = (winning_cells(mine, pos._stride) & free).bit_count()
+        op_threats = (winning_cells(theirs, pos._stride) & free).bit_count()
+        center = (mine & center_mask).bit_count() - (theirs & center_mask).bit_count()
+        return THREAT_WEIGHT * (my_threats - op_threats) + CENTER_WEIGHT * center
+
+    # ---------- recherche ----------
+    def _negamax(self, pos: Position, depth: int, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if self._deadline is not None and self.nodes % _CHECK_EVERY == 0:
+            if time.perf_counter() >= self._deadline:
+                raise SearchTimeout()
+
+        if pos.is_full():
+            return 0
+        if depth == 0:
+            return self.evaluate(pos)
+
+        alpha0 = alpha
+        key = pos.hash
+        entry = self.tt.get(key)
+        tt_move = None
+        if entry is not None:
+            e_depth, e_flag, e_score, tt_move = entry
+            if e_depth >= depth:
+                if e_flag == EXACT:
+                    return e_score
+                if e_flag == LOWER and e_score > alpha:
+                    alpha = e_score
+                elif e_flag == UPPER and e_score < beta:
+                    beta = e_score
+                if alpha >= beta:
+                    return e_score
+
+        _, _, order = _board_consts(pos.rows, pos.cols)
+        moves = [c for c in order if pos.heights[c] < pos.rows]
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+        best = -WIN_SCORE - 1
+        best_move = moves[0]
+        for col in moves:
+            pos.play(col)
+            if pos.last_mover_won():
+                score = WIN_SCORE - pos.ply
+            else:
+                score = -self._negamax(pos, depth - 1, -beta, -alpha)
+            pos.undo()
+
+            if score > best:
+                best = score
+                best_move = col
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best <= alpha0:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if len(self.tt) >= self.max_tt_entries:
+            self.tt.clear()
+        self.tt[key] = (depth, flag, best, best_move)
+        return best
+
+    def _root(self, pos: Position, depth: int, root_moves):
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_col, best = root_moves[0], -WIN_SCORE - 1
+        for col in root_moves:
+            pos.play(col)
+            if pos.last_mover_won():
+                score = WIN_SCORE - pos.ply
+            else:
+                score = -self._negamax(pos, depth - 1, -beta, -alpha)
+            pos.undo()
+            if score > best:
+                best, best_col = score, col
+            if score > alpha:
+                alpha = score
+        return best_col, best
+
+    def search(
+        self,
+        pos: Position,
+        max_depth: int,
+        time_limit: float | None = None,
+        randomize: bool = False,
+    ) -> dict:
+        """
+        Approfondissement itératif jusqu'à max_depth (ou jusqu'à la deadline).
+
+        randomize=True mélange l'ordre des coups à la racine: à score égal, le
+        coup choisi varie d'une partie à l'autre (utile pour l'auto-jeu).
+
+        Retourne {"col", "score", "depth", "nodes", "time"} pour la dernière
+        profondeur terminée (depth=0 si aucune ne l'a été dans le budget).
+        """
+        t0 = time.perf_counter()
+        root_ply = pos.ply
+        self.nodes = 0
+        self._deadline = t0 + time_limit if time_limit else None
+
+        _, _, order = _board_consts(pos.rows, pos.cols)
+        root_moves = [c for c in order if pos.heights[c] < pos.rows]
+        if not root_moves:
+            raise ValueError("no legal move")
+        if randomize:
+            self.rng.shuffle(root_moves)
+
+        # fallback si la toute première itération n'aboutit pas
+        result = {"col": root_moves[0], "score": 0, "depth": 0}
+        try:
+            for depth in range(1, max(1, int(max_depth)) + 1):
+                col, score = self._root(pos, depth, root_moves)
+                result = {"col": col, "score": score, "depth": depth}
+                # meilleur coup de l'itération précédente exploré en premier
+                root_moves.remove(col)
+                root_moves.insert(0, col)
+                if abs(score) >= WIN_SCORE - pos.rows * pos.cols:
+                    break  # victoire / défaite forcée trouvée
+        except SearchTimeout:
+            # la recherche a été coupée en pleine variante: on restaure le plateau
+            while pos.ply > root_ply:
+                pos.undo()
+        finally:
+            self._deadline = None
+
+        result["nodes"] = self.nodes
+        result["time"] = time.perf_counter() - t0
+        return result
+
+    def best_move(self, pos: Position, depth: int, randomize: bool = False) -> int:
+        return self.search(pos, depth, randomize=randomize)["col"]
@@ -50,9 +50,13 @@ CREATE TABLE IF NOT EXISTS moves (
 );
 
 -- Table des positions (centralisée)
+-- zobrist_hash : hash Zobrist 64 bits (connect4_core.Position.hash, via to_bigint)
+-- calculé incrémentalement côté Python ; board_hash (SHA-256 texte) = legacy
 CREATE TABLE IF NOT EXISTS positions (
     position_id SERIAL PRIMARY KEY,
-    board_hash VARCHAR(64) UNIQUE NOT NULL,
+    zobrist_hash BIGINT NOT NULL,
+    zobrist_version SMALLINT NOT NULL DEFAULT 1,
+    board_hash VARCHAR(64) UNIQUE,
     board_state TEXT NOT NULL,
     rows_count INTEGER NOT NULL,
     cols_count INTEGER NOT NULL,
@@ -63,6 +67,8 @@ CREATE TABLE IF NOT EXISTS positions (
 );
 
 -- Index pour performances
+CREATE UNIQUE INDEX IF NOT EXISTS idx_positions_zobrist
+    ON positions(rows_count, cols_count, zobrist_version, zobrist_hash);
 CREATE INDEX IF NOT EXISTS idx_board_hash ON positions(board_hash);
 CREATE INDEX IF NOT EXISTS idx_terminal ON positions(terminal);
 CREATE INDEX IF NOT EXISTS idx_games_moves_hash ON games(moves_hash);
@@ -145,7 +151,8 @@ FROM symmetries s
 JOIN positions p1 ON s.original_hash = p1.board_hash
 JOIN positions p2 ON s.symmetric_hash = p2.board_hash;
 
--- Fonction de hachage du plateau
+-- Fonction de hachage du plateau (legacy SHA-256 sur TEXT)
+-- Le hash de référence est le Zobrist BIGINT de connect4_core (positions.zobrist_hash)
 CREATE OR REPLACE FUNCTION calculate_board_hash(board_state TEXT)
 RETURNS VARCHAR(64) AS $$
 BEGIN
@@ -313,3 +320,21 @@ SET confidence = COALESCE(confidence, confiance);
 -- Supprimer la colonne en trop
 ALTER TABLE saved_games
 DROP COLUMN confiance;
+
+-- Migration Zobrist : positions indexées par hash BIGINT (8 octets)
+ALTER TABLE positions
+ADD COLUMN IF NOT EXISTS zobrist_hash BIGINT;
+ALTER TABLE positions
+ADD COLUMN IF NOT EXISTS zobrist_version SMALLINT NOT NULL DEFAULT 1;
+ALTER TABLE positions
+ALTER COLUMN board_hash DROP NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_positions_zobrist
+    ON positions(rows_count, cols_count, zobrist_version, zobrist_hash);
+
+-- Résultat rejoué à l'import (bga_import / bga_bulk_import via connect4_core)
+ALTER TABLE saved_games
+ADD COLUMN IF NOT EXISTS winner CHAR(1) CHECK (winner IN ('R', 'Y', 'D'));
+ALTER TABLE saved_games
+ADD COLUMN IF NOT EXISTS win_ply INTEGER;
+ALTER TABLE saved_games
+ADD COLUMN IF NOT EXISTS final_hash BIGINT;
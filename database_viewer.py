@@ -10,14 +10,25 @@ Version compatible avec l'application game.py (table saved_games uniquement)
 - Informations de la partie dynamiques (position, prochain joueur)
 - Détails de la position dynamiques (dernier coup, cases occupées, colonnes jouables, hash)
 - Navigation fonctionnelle (ne réécrase plus view_index)
+
+✅ PERF :
+- Partie rejouée une seule fois au chargement; naviguer pose / retire seulement
+  les pions d'écart (hash de chaque position lu dans une table)
+- Plateau dessiné une fois par taille, puis seules les cases modifiées
+  sont recolorées
+- Lectures (liste, détails, stats) dans un thread avec sa propre connexion;
+  une requête remplacée par une plus récente (sélection rapide) est annulée
 """
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import psycopg2
 import json
-import hashlib
 import os
+import queue
+import threading
+
+from connect4_core import Position
 
 DB_CONFIG = {
     "host": "localhost",
@@ -27,6 +38,130 @@ DB_CONFIG = {
     "port": 5432,
 }
 
+POLL_MS = 30  # relève des résultats du worker dans la boucle Tk
+
+STATS_SQL = """
+SELECT
+    COUNT(*) as total_games,
+    COUNT(DISTINCT moves) as unique_games,
+    AVG(jsonb_array_length(moves))::INTEGER as avg_moves,
+    MIN(jsonb_array_length(moves)) as min_moves,
+    MAX(jsonb_array_length(moves)) as max_moves,
+    COUNT(DISTINCT rows || 'x' || cols) as different_sizes,
+    MODE() WITHIN GROUP (ORDER BY ai_mode) as most_common_ai
+FROM saved_games
+"""
+
+
+def fetch_all(conn, query, params=None):
+    with conn.cursor() as cursor:
+        cursor.execute(query, params or ())
+        return cursor.fetchall()
+
+
+def saved_games_columns(conn) -> set:
+    """Colonnes de saved_games (une seule requête au lieu d'un test par colonne)."""
+    rows = fetch_all(
+        conn,
+        """
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_schema='public' AND table_name='saved_games'
+        """,
+    )
+    return {r[0] for r in rows}
+
+
+class QueryWorker:
+    """
+    Thread de lecture avec sa propre connexion (lecture seule, autocommit).
+    submit(clé, fn(conn), on_done) : fn tourne hors du thread Tk, on_done(résultat)
+    est rappelé dans la boucle Tk (relève via after()).
+    Une nouvelle demande pour la même clé remplace l'ancienne: non commencée,
+    elle est sautée; en cours, elle est annulée côté serveur; son résultat est ignoré.
+    """
+
+    def __init__(self, root, db_config=DB_CONFIG):
+        self.root = root
+        self.db_config = db_config
+        self.conn = None
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._latest = {}  # clé -> numéro de la dernière demande
+        self._running = None  # (clé, numéro) en cours d'exécution
+        self._thread = threading.Thread(target=self._loop, name="QueryWorker", daemon=True)
+        self._thread.start()
+        self._poll_job = self.root.after(POLL_MS, self._poll)
+
+    def submit(self, key, fn, on_done, on_error=None):
+        seq = self.cancel(key)
+        self._jobs.put((key, seq, fn, on_done, on_error))
+
+    def cancel(self, key) -> int:
+        """Rend obsolète toute demande en attente / en cours pour `key`."""
+        with self._lock:
+            self._seq += 1
+            self._latest[key] = self._seq
+            # verrou tenu: le worker ne peut pas passer à une autre requête entre-temps
+            if self._running is not None and self._running[0] == key and self.conn is not None:
+                try:
+                    self.conn.cancel()
+                except Exception:
+                    pass
+            return self._seq
+
+    def _is_current(self, key, seq) -> bool:
+        with self._lock:
+            return self._latest.get(key) == seq
+
+    def _connect(self):
+        if self.conn is None or self.conn.closed:
+            conn = psycopg2.connect(**self.db_config)
+            conn.set_session(readonly=True, autocommit=True)
+            self.conn = conn
+        return self.conn
+
+    def _loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            key, seq, fn, on_done, on_error = job
+            with self._lock:
+                if self._latest.get(key) != seq:
+                    continue  # déjà remplacée
+                self._running = (key, seq)
+            try:
+                out = (on_done, fn(self._connect()))
+            except Exception as e:
+                out = (on_error, e)
+            finally:
+                with self._lock:
+                    self._running = None
+            self._results.put((key, seq) + out)
+
+        if self.conn is not None:
+            self.conn.close()
+
+    def _poll(self):
+        while True:
+            try:
+                key, seq, callback, arg = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if callback is not None and self._is_current(key, seq):
+                callback(arg)
+        self._poll_job = self.root.after(POLL_MS, self._poll)
+
+    def close(self):
+        try:
+            self.root.after_cancel(self._poll_job)
+        except Exception:
+            pass
+        self._jobs.put(None)
+
 
 class DatabaseViewer(tk.Tk):
     def __init__(self):
@@ -36,6 +171,7 @@ class DatabaseViewer(tk.Tk):
 
         self.conn = None
         self.connect_to_db()
+        self.worker = QueryWorker(self)
 
         self.current_game_id = None
         self.moves = []
@@ -44,9 +180,29 @@ class DatabaseViewer(tk.Tk):
         self.board_cols = 9
         self.starting_color = "R"
 
+        # Partie rejouée une seule fois au chargement (voir build_timeline):
+        # timeline[i] = (row, col, pion) posé au coup i+1, hashes[i] = hash après i coups.
+        # self.grid suit la position affichée, avancée / reculée un pion à la fois.
+        self.timeline = []
+        self.hashes = [0]
+        self.grid = []
+        self.grid_index = 0
+
+        # Canvas en mode "retenu": items créés une fois par taille de plateau /
+        # de canvas, puis seules les cases modifiées sont recolorées.
+        self.board_layout = None
+        self.cell_items = {}  # (row, col) -> id de l'ovale
+        self.cell_colors = {}  # (row, col) -> couleur affichée
+        self._resize_job = None
+
         # ✅ NEW: meta statique de la partie (pour mise à jour dynamique sans SQL)
         self.game_meta = {}
 
+        self.EMPTY = "."
+        self.RED = "R"
+        self.YELLOW = "Y"
+        self.build_timeline()
+
         self.search_var = tk.StringVar()
 
         self.COLORS = {
@@ -58,10 +214,6 @@ class DatabaseViewer(tk.Tk):
             "grid": "#1e88e5",
         }
 
-        self.EMPTY = "."
-        self.RED = "R"
-        self.YELLOW = "Y"
-
         self.build_ui()
         self.load_games_list()
 
@@ -86,22 +238,12 @@ class DatabaseViewer(tk.Tk):
                 self.conn.commit()
                 return cursor.rowcount
         except Exception as e:
-            print(f"❌ Erreur requête: {e}")
-            messagebox.showerror("Erreur SQL", str(e))
+            self.show_query_error(e)
             return None
 
-    def column_exists(self, table_name: str, column_name: str) -> bool:
-        q = """
-        SELECT EXISTS (
-            SELECT 1
-            FROM information_schema.columns
-            WHERE table_schema='public'
-              AND table_name=%s
-              AND column_name=%s
-        )
-        """
-        r = self.execute_query(q, (table_name, column_name))
-        return bool(r and r[0] and r[0][0])
+    def show_query_error(self, e):
+        print(f"❌ Erreur requête: {e}")
+        messagebox.showerror("Erreur SQL", str(e))
 
     def build_ui(self):
         top_frame = ttk.Frame(self, padding=10)
@@ -202,6 +344,7 @@ class DatabaseViewer(tk.Tk):
 
         self.canvas = tk.Canvas(canvas_frame, bg="white", highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
 
         nav_frame = ttk.Frame(right_panel)
         nav_frame.pack(fill=tk.X, pady=10)
@@ -248,11 +391,20 @@ class DatabaseViewer(tk.Tk):
     # LIST + DETAILS
     # =======================
     def load_games_list(self):
-        self.games_tree.delete(*self.games_tree.get_children())
+        search_text = self.search_var.get().strip()
+        self.worker.submit(
+            "games_list",
+            lambda conn: self.query_games_list(conn, search_text),
+            self.show_games_list,
+            self.show_query_error,
+        )
 
-        has_confidence = self.column_exists("saved_games", "confidence")
-        has_confiance = self.column_exists("saved_games", "confiance")
-        has_distinct = self.column_exists("saved_games", "distinct_cols")
+    def query_games_list(self, conn, search_text):
+        """(thread worker) 100 dernières parties, filtrées par nom / id."""
+        columns = saved_games_columns(conn)
+        has_confidence = "confidence" in columns
+        has_confiance = "confiance" in columns
+        has_distinct = "distinct_cols" in columns
 
         conf_expr = "1"
         if has_confidence:
@@ -290,14 +442,15 @@ class DatabaseViewer(tk.Tk):
         """
 
         params = []
-        search_text = self.search_var.get().strip()
         if search_text:
             query += " AND (save_name ILIKE %s OR id::TEXT LIKE %s)"
             params.extend([f"%{search_text}%", f"%{search_text}%"])
 
         query += " ORDER BY save_date DESC LIMIT 100"
+        return fetch_all(conn, query, params)
 
-        games = self.execute_query(query, params)
+    def show_games_list(self, games):
+        self.games_tree.delete(*self.games_tree.get_children())
         if games:
             for game in games:
                 self.games_tree.insert("", "end", values=game)
@@ -311,9 +464,19 @@ class DatabaseViewer(tk.Tk):
         self.load_game_details(self.current_game_id)
 
     def load_game_details(self, game_id):
-        has_confidence = self.column_exists("saved_games", "confidence")
-        has_confiance = self.column_exists("saved_games", "confiance")
-        has_distinct = self.column_exists("saved_games", "distinct_cols")
+        self.worker.submit(
+            "game_details",
+            lambda conn: self.query_game_details(conn, game_id),
+            self.show_game_details,
+            self.show_query_error,
+        )
+
+    def query_game_details(self, conn, game_id):
+        """(thread worker) -> (ligne saved_games | None, has_distinct)."""
+        columns = saved_games_columns(conn)
+        has_confidence = "confidence" in columns
+        has_confiance = "confiance" in columns
+        has_distinct = "distinct_cols" in columns
 
         conf_expr = "1"
         if has_confidence:
@@ -336,11 +499,13 @@ class DatabaseViewer(tk.Tk):
         WHERE id = %s
         """
 
-        result = self.execute_query(query, (game_id,))
-        if not result or not result[0]:
-            return
+        result = fetch_all(conn, query, (game_id,))
+        return (result[0] if result else None), has_distinct
 
-        game_data = result[0]
+    def show_game_details(self, details):
+        game_data, has_distinct = details
+        if not game_data:
+            return
 
         moves_json = game_data[9]
         if moves_json:
@@ -359,6 +524,7 @@ class DatabaseViewer(tk.Tk):
 
         # clamp au cas où
         self.view_index = max(0, min(self.view_index, len(self.moves)))
+        self.build_timeline()
 
         confiance = int(game_data[12]) if game_data[12] is not None else 1
         distinct_cols = (
@@ -421,8 +587,12 @@ class DatabaseViewer(tk.Tk):
     # BOARD VIEW
     # =======================
     def display_current_position(self):
-        board = self.reconstruct_board(self.view_index)
-        self.draw_board(board)
+        changed = self.seek_grid(self.view_index)
+        if self.grid_dirty:
+            changed = None  # nouvelle partie: comparer toutes les cases
+            self.grid_dirty = False
+        board = self.grid
+        self.draw_board(board, changed)
 
         # Joueur "à jouer" sur la position courante
         to_play = self.get_player_at_index(self.view_index)
@@ -435,24 +605,65 @@ class DatabaseViewer(tk.Tk):
             "last_col": last_col,
             "to_play": to_play,
             "board": board,
+            "hash": self.hashes[self.grid_index],
         }
         self.display_position_info(move_info)
 
-    def reconstruct_board(self, up_to_index):
-        board = [
+    def build_timeline(self):
+        """
+        Rejoue la partie une seule fois (un pion par coup) et garde, pour chaque
+        coup, la case posée et le hash Zobrist obtenu. S'arrête au premier coup
+        illégal, comme l'ancienne reconstruction.
+        """
+        position = Position(self.board_rows, self.board_cols, self.starting_color)
+        self.timeline = []
+        self.hashes = [position.hash]
+        for col in self.moves:
+            if not position.can_play(col):
+                break
+            token = position.to_move
+            row = position.play(col)
+            self.timeline.append((row, col, token))
+            self.hashes.append(position.hash)
+
+        self.grid = [
             [self.EMPTY for _ in range(self.board_cols)] for _ in range(self.board_rows)
         ]
-        current_color = self.starting_color
+        self.grid_index = 0
+        self.grid_dirty = True  # le canvas montre peut-être une autre partie
 
+    def seek_grid(self, index):
+        """
+        Amène self.grid à la position après `index` coups en posant / retirant
+        seulement les pions d'écart (1 pour précédent/suivant).
+        Retourne la liste des cases (row, col) modifiées.
+        """
+        index = max(0, min(index, len(self.timeline)))
+        changed = []
+        while self.grid_index < index:
+            row, col, token = self.timeline[self.grid_index]
+            self.grid[row][col] = token
+            changed.append((row, col))
+            self.grid_index += 1
+        while self.grid_index > index:
+            self.grid_index -= 1
+            row, col, _ = self.timeline[self.grid_index]
+            self.grid[row][col] = self.EMPTY
+            changed.append((row, col))
+        return changed
+
+    def reconstruct_position(self, up_to_index):
+        """Rejoue les coups dans le noyau (Position complète, hors navigation)."""
+        position = Position(self.board_rows, self.board_cols, self.starting_color)
         for i in range(min(up_to_index, len(self.moves))):
-            col = self.moves[i]
-            for row in range(self.board_rows - 1, -1, -1):
-                if board[row][col] == self.EMPTY:
-                    board[row][col] = current_color
-                    break
-            current_color = self.YELLOW if current_color == self.RED else self.RED
+            if not position.can_play(self.moves[i]):
+                break
+            position.play(self.moves[i])
+        return position
 
-        return board
+    def reconstruct_board(self, up_to_index):
+        self.seek_grid(up_to_index)
+        return [row[:] for row in self.grid]
 
     def get_player_at_index(self, move_index):
         # joueur qui DOIT jouer au coup move_index
@@ -467,9 +678,27 @@ class DatabaseViewer(tk.Tk):
         )
         return self.YELLOW if last_player == self.RED else self.RED
 
-    def draw_board(self, board):
+    def cell_color(self, token):
+        if token == self.RED:
+            return self.COLORS["red"]
+        if token == self.YELLOW:
+            return self.COLORS["yellow"]
+        return self.COLORS["hole"]
+
+    def clear_board(self):
         self.canvas.delete("all")
+        self.board_layout = None
+        self.cell_items = {}
+        self.cell_colors = {}
+
+    def draw_board(self, board, changed=None):
+        """
+        Crée les items (fond, trous, numéros) seulement si la taille du plateau
+        ou du canvas a changé; sinon recolore les cases de `changed`
+        (toutes les cases si None, en ne touchant que celles qui diffèrent).
+        """
         if not board:
+            self.clear_board()
             return
 
         rows = len(board)
@@ -481,6 +710,23 @@ class DatabaseViewer(tk.Tk):
             canvas_width = 500
             canvas_height = 500
 
+        layout = (rows, cols, canvas_width, canvas_height)
+        if layout != self.board_layout:
+            self.build_board_items(board, layout)
+            return
+
+        cells = changed if changed is not None else self.cell_items.keys()
+        for r, c in cells:
+            color = self.cell_color(board[r][c])
+            if self.cell_colors.get((r, c)) != color:
+                self.canvas.itemconfigure(self.cell_items[(r, c)], fill=color)
+                self.cell_colors[(r, c)] = color
+
+    def build_board_items(self, board, layout):
+        rows, cols, canvas_width, canvas_height = layout
+        self.clear_board()
+        self.board_layout = layout
+
         cell_size = min(canvas_width / cols, canvas_height / rows) * 0.8
         margin_x = (canvas_width - cols * cell_size) / 2
         margin_y = (canvas_height - rows * cell_size) / 2
@@ -499,15 +745,9 @@ class DatabaseViewer(tk.Tk):
             for c in range(cols):
                 center_x = margin_x + c * cell_size + cell_size / 2
                 center_y = margin_y + r * cell_size + cell_size / 2
+                color = self.cell_color(board[r][c])
 
-                if board[r][c] == self.RED:
-                    color = self.COLORS["red"]
-                elif board[r][c] == self.YELLOW:
-                    color = self.COLORS["yellow"]
-                else:
-                    color = self.COLORS["hole"]
-
-                self.canvas.create_oval(
+                self.cell_items[(r, c)] = self.canvas.create_oval(
                     center_x - hole_radius,
                     center_y - hole_radius,
                     center_x + hole_radius,
@@ -516,6 +756,7 @@ class DatabaseViewer(tk.Tk):
                     outline=self.COLORS["grid"],
                     width=2,
                 )
+                self.cell_colors[(r, c)] = color
 
         for c in range(cols):
             x = margin_x + c * cell_size + cell_size / 2
@@ -524,6 +765,17 @@ class DatabaseViewer(tk.Tk):
                 x, y, text=str(c + 1), fill="white", font=("Arial", 12, "bold")
             )
 
+    def on_canvas_resize(self, event):
+        # une seule reconstruction à la fin d'un redimensionnement
+        if self._resize_job is not None:
+            self.after_cancel(self._resize_job)
+        self._resize_job = self.after(50, self._redraw_after_resize)
+
+    def _redraw_after_resize(self):
+        self._resize_job = None
+        if self.game_meta:
+            self.draw_board(self.grid)
+
     # =======================
     # POSITION DETAILS (DYNAMIQUE)
     # =======================
@@ -557,7 +809,7 @@ class DatabaseViewer(tk.Tk):
 
         filled_cells = sum(row.count("R") + row.count("Y") for row in board)
         legal_cols = self.count_legal_columns(board)
-        board_hash = self.calculate_board_hash(board)[:16]
+        board_hash = self.calculate_board_hash(move.get("hash") if move else None)
 
         title = (
             "POSITION INITIALE - Coup 0"
@@ -573,7 +825,7 @@ class DatabaseViewer(tk.Tk):
 ║ • Joueur actuel (à jouer): {player_name}
 ║ • Cases occupées: {filled_cells}
 ║ • Colonnes jouables: {legal_cols}
-║ • Hash position: {board_hash}...
+║ • Hash position: {board_hash}
 ╚══════════════════════════════════════════════════════════════╝
 """
 
@@ -615,7 +867,8 @@ class DatabaseViewer(tk.Tk):
     def on_scale_move(self, value):
         try:
             index = int(float(value))
-            self.navigate_to(index)
+            if index != self.view_index:  # nav_scale.set() rappelle cette méthode
+                self.navigate_to(index)
         except Exception:
             pass
 
@@ -683,18 +936,14 @@ class DatabaseViewer(tk.Tk):
             messagebox.showerror("Erreur", f"Erreur lors de l'import: {str(e)}")
 
     def show_stats(self):
-        query = """
-        SELECT 
-            COUNT(*) as total_games,
-            COUNT(DISTINCT moves) as unique_games,
-            AVG(jsonb_array_length(moves))::INTEGER as avg_moves,
-            MIN(jsonb_array_length(moves)) as min_moves,
-            MAX(jsonb_array_length(moves)) as max_moves,
-            COUNT(DISTINCT rows || 'x' || cols) as different_sizes,
-            MODE() WITHIN GROUP (ORDER BY ai_mode) as most_common_ai
-        FROM saved_games
-        """
-        stats = self.execute_query(query)
+        self.worker.submit(
+            "stats",
+            lambda conn: fetch_all(conn, STATS_SQL),
+            self.show_stats_result,
+            self.show_query_error,
+        )
+
+    def show_stats_result(self, stats):
         if stats and stats[0]:
             s = stats[0]
             stats_text = f"""
@@ -736,13 +985,15 @@ class DatabaseViewer(tk.Tk):
                 query = "DELETE FROM saved_games WHERE id = %s"
                 result = self.execute_query(query, (game_id,), fetch=False)
                 if result:
+                    self.worker.cancel("game_details")
                     messagebox.showinfo("Succès", "Partie supprimée avec succès")
                     self.load_games_list()
                     self.current_game_id = None
                     self.moves = []
                     self.view_index = 0
                     self.game_meta = {}
-                    self.canvas.delete("all")
+                    self.build_timeline()
+                    self.clear_board()
                     self.info_text.delete(1.0, tk.END)
                     self.pos_info_text.delete(1.0, tk.END)
                     self.update_navigation()
@@ -753,11 +1004,11 @@ class DatabaseViewer(tk.Tk):
                     "Erreur", f"Erreur lors de la suppression: {str(e)}"
                 )
 
-    def calculate_board_hash(self, board):
-        if not board:
+    def calculate_board_hash(self, zobrist_hash):
+        """Affichage du hash Zobrist 64 bits (calculé incrémentalement par connect4_core)."""
+        if zobrist_hash is None:
             return "N/A"
-        board_str = json.dumps(board)
-        return hashlib.sha256(board_str.encode()).hexdigest()
+        return format(zobrist_hash, "016x")
 
     def get_mode_name(self, mode_code):
         modes = {0: "IA vs IA", 1: "Humain vs IA", 2: "Humain vs Humain"}
@@ -769,6 +1020,9 @@ class DatabaseViewer(tk.Tk):
             self.load_game_details(self.current_game_id)
 
     def __del__(self):
+        worker = self.__dict__.get("worker")
+        if worker is not None:
+            worker.close()
         if self.conn:
             self.conn.close()
 
@@ -1,8 +1,20 @@
-import random
+import argparse
+import csv
+import io
 import json
-import psycopg2
+import multiprocessing
+import os
+import random
+import time
 from datetime import datetime
 
+import numpy as np
+import psycopg2
+
+from connect4_core import Position
+from connect4_engine import Engine
+from random_games_np import generate_random_games, iter_games
+
 DB_CONFIG = {
     "host": "localhost",
     "database": "puissance4_db",
@@ -201,46 +213,348 @@ def insert_game(
     conn.commit()
 
 
-def main(n_games=200):
-    with psycopg2.connect(**DB_CONFIG) as conn:
-        ensure_columns(conn)
+# =======================
+# Ingestion en masse (workers + COPY)
+# =======================
+AI_MODES = ("random", "minimax")
+AI_DEPTHS = (2, 4, 6, 8)
+
+COPY_SQL = """
+COPY saved_games
+  (save_name, rows, cols, starting_color, mode, game_index,
+   moves, view_index, ai_mode, ai_depth, confidence, distinct_cols, save_date)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+
+def compute_confidence_bulk(ai_mode_idx, ai_depth, mode):
+    """
+    Version vectorisée de compute_confidence.
+    ai_mode_idx: indices dans AI_MODES (0=random, 1=minimax).
+    """
+    ai_depth = np.clip(ai_depth, 1, 8)
+    minimax_conf = np.select(
+        [ai_depth <= 2, ai_depth <= 4, ai_depth <= 6], [2, 3, 4], default=5
+    )
+    conf = np.where(ai_mode_idx == AI_MODES.index("minimax"), minimax_conf, 1)
+    return np.where(mode == 2, 5, conf).astype(np.int8)
+
 
-        for i in range(1, n_games + 1):
-            # Ici tu peux varier les “algos” :
-            # - random => confidence=1
-            # - minimax => confidence dépend depth (même si on simule en random ici)
-            ai_mode = random.choice(["random", "minimax"])
-            ai_depth = random.choice([2, 4, 6, 8])
-            mode = random.choice([0, 1])  # on simule des parties avec IA impliquée
-            starting_color = random.choice([RED, YELLOW])
-
-            moves, winner = play_random_game(starting_color=starting_color)
-            distinct_cols = len(set(moves)) if moves else 0
-            confidence = compute_confidence(ai_mode, ai_depth, mode)
-
-            save_name = f"auto_{ROWS}x{COLS}_{ai_mode}_d{ai_depth}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{i}"
-
-            insert_game(
-                conn=conn,
-                save_name=save_name,
-                rows=ROWS,
-                cols=COLS,
-                starting_color=starting_color,
-                mode=mode,
-                game_index=i,
-                moves=moves,
-                view_index=len(moves),
-                ai_mode=ai_mode,
-                ai_depth=ai_depth,
-                confidence=confidence,
-                distinct_cols=distinct_cols,
+def distinct_cols_bulk(moves, cols):
+    """Nombre de colonnes distinctes par partie (moves paddé avec -1)."""
+    used = (moves[:, :, None] == np.arange(cols, dtype=moves.dtype)).any(axis=1)
+    return used.sum(axis=1).astype(np.int16)
+
+
+def generate_shard(task):
+    """
+    Worker: génère un lot de parties et le sérialise directement en CSV
+    prêt pour COPY (le writer ne fait plus que streamer).
+    """
+    shard_index, first_index, n, rows, cols, seed_seq, stamp, save_date = task
+    t0 = time.perf_counter()
+    game_seed, meta_seed = seed_seq.spawn(2)
+    rng = np.random.default_rng(meta_seed)
+
+    # Ici tu peux varier les “algos” :
+    # - random => confidence=1
+    # - minimax => confidence dépend depth (même si on simule en random ici)
+    ai_mode_idx = rng.integers(0, len(AI_MODES), size=n)
+    ai_depth = rng.choice(AI_DEPTHS, size=n)
+    mode = rng.integers(0, 2, size=n)  # on simule des parties avec IA impliquée
+
+    confidence = compute_confidence_bulk(ai_mode_idx, ai_depth, mode)
+
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    j = 0
+    # lots de parties consommés au fil de l'eau (un seul lot NumPy en mémoire)
+    for batch in generate_random_games(
+        n, rows=rows, cols=cols, starting_color="random", seed=game_seed
+    ):
+        distinct = distinct_cols_bulk(batch["moves"], cols).tolist()
+        for d, (moves, _winner, starting_color) in zip(distinct, iter_games(batch)):
+            i = first_index + j
+            ai_mode = AI_MODES[ai_mode_idx[j]]
+            w.writerow(
+                csv_row(
+                    f"auto_{rows}x{cols}_{ai_mode}_d{ai_depth[j]}_{stamp}_{i}",
+                    rows,
+                    cols,
+                    starting_color,
+                    int(mode[j]),
+                    i,
+                    moves,
+                    ai_mode,
+                    int(ai_depth[j]),
+                    int(confidence[j]),
+                    d,
+                    save_date,
+                )
             )
+            j += 1
+    return shard_index, n, buf.getvalue(), "random", time.perf_counter() - t0
 
-            if i % 25 == 0:
-                print(f"✅ {i}/{n_games} parties insérées...")
 
-    print("✅ Remplissage terminé.")
+def csv_row(
+    save_name,
+    rows,
+    cols,
+    starting_color,
+    mode,
+    game_index,
+    moves,
+    ai_mode,
+    ai_depth,
+    confidence,
+    distinct_cols,
+    save_date,
+):
+    """Une ligne CSV dans l'ordre des colonnes de COPY_SQL."""
+    return (
+        save_name,
+        rows,
+        cols,
+        starting_color,
+        mode,
+        game_index,
+        json.dumps(moves, separators=(",", ":")),
+        len(moves),  # view_index = fin de partie
+        ai_mode,
+        ai_depth,
+        confidence,
+        distinct_cols,
+        save_date,
+    )
+
+
+# =======================
+# Auto-jeu moteur (parties "minimax" réelles)
+# =======================
+_WORKER_ENGINES = {}
+
+
+def _worker_engine(depth: int):
+    """
+    Un Engine (donc une TT) par profondeur et par process worker, conservé entre
+    les parties. Une TT commune servirait aux recherches à d2 des entrées
+    calculées à d6 (e_depth >= depth) -> parties plus fortes que leur étiquette.
+    """
+    engine = _WORKER_ENGINES.get(depth)
+    if engine is None:
+        engine = _WORKER_ENGINES[depth] = Engine()
+    return engine
+
+
+def play_engine_game(engine, rows, cols, depth, starting_color, rng):
+    """
+    Les deux camps jouent le meilleur coup trouvé à `depth` (ordre racine mélangé
+    pour varier les parties à score égal). Retourne (moves, winner|None).
+    """
+    engine.rng = rng
+    pos = Position(rows, cols, starting_color)
+    while True:
+        pos.play(engine.best_move(pos, depth, randomize=True))
+        w = pos.winner()
+        if w is not None:
+            return pos.moves, (None if w == "D" else w)
+
+
+def selfplay_shard(task):
+    """Worker: joue `n` parties moteur contre moteur à la profondeur annoncée."""
+    shard_index, first_index, n, rows, cols, depth, seed, stamp, save_date = task
+    t0 = time.perf_counter()
+    engine = _worker_engine(depth)
+    rng = random.Random(seed)
+
+    mode = 0  # IA vs IA
+    confidence = compute_confidence("minimax", depth, mode)
+
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    for j in range(n):
+        i = first_index + j
+        starting_color = rng.choice([RED, YELLOW])
+        moves, _winner = play_engine_game(
+            engine, rows, cols, depth, starting_color, rng
+        )
+        w.writerow(
+            csv_row(
+                f"selfplay_{rows}x{cols}_minimax_d{depth}_{stamp}_{i}",
+                rows,
+                cols,
+                starting_color,
+                mode,
+                i,
+                moves,
+                "minimax",
+                depth,
+                confidence,
+                len(set(moves)),
+                save_date,
+            )
+        )
+    return shard_index, n, buf.getvalue(), f"d{depth}", time.perf_counter() - t0
+
+
+def build_selfplay_tasks(n_games, shard_size, rows, cols, depths, seed, now):
+    """Parties réparties équitablement entre les profondeurs demandées."""
+    stamp = now.strftime("%Y%m%d_%H%M%S")
+    save_date = now.isoformat(sep=" ", timespec="seconds")
+    master = random.Random(seed)
+
+    per_depth = [n_games // len(depths)] * len(depths)
+    for k in range(n_games % len(depths)):
+        per_depth[k] += 1
+
+    tasks = []
+    first = 1
+    for depth, count in zip(depths, per_depth):
+        done = 0
+        while done < count:
+            n = min(shard_size, count - done)
+            tasks.append(
+                (
+                    len(tasks),
+                    first,
+                    n,
+                    rows,
+                    cols,
+                    depth,
+                    master.getrandbits(64),
+                    stamp,
+                    save_date,
+                )
+            )
+            first += n
+            done += n
+    # profondeurs mélangées: les workers restent occupés jusqu'au bout
+    master.shuffle(tasks)
+    return tasks
+
+
+def build_tasks(n_games, shard_size, rows, cols, seed, now):
+    stamp = now.strftime("%Y%m%d_%H%M%S")
+    save_date = now.isoformat(sep=" ", timespec="seconds")
+    root = np.random.SeedSequence(seed)
+    n_shards = (n_games + shard_size - 1) // shard_size
+    tasks = []
+    for k, seed_seq in enumerate(root.spawn(n_shards)):
+        first = k * shard_size + 1
+        n = min(shard_size, n_games - k * shard_size)
+        tasks.append((k, first, n, rows, cols, seed_seq, stamp, save_date))
+    return tasks
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Remplit saved_games avec des parties générées (COPY en masse)"
+    )
+    ap.add_argument("--games", type=int, default=300, help="nombre de parties")
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="process générateurs (0 = dans le process courant)",
+    )
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--rows", type=int, default=ROWS)
+    ap.add_argument("--cols", type=int, default=COLS)
+    ap.add_argument(
+        "--shard-size",
+        type=int,
+        default=None,
+        help="parties par shard (défaut: 20000 aléatoire, 10 auto-jeu)",
+    )
+    ap.add_argument(
+        "--selfplay",
+        action="store_true",
+        help="parties moteur contre moteur à la profondeur ai_depth annoncée",
+    )
+    ap.add_argument(
+        "--depths",
+        default=",".join(str(d) for d in AI_DEPTHS),
+        help="profondeurs pour --selfplay (ex: 2,4,6,8)",
+    )
+    ap.add_argument(
+        "--commit-every",
+        type=int,
+        default=200_000,
+        help="parties par transaction",
+    )
+    args = ap.parse_args(argv)
+
+    if args.selfplay:
+        depths = [max(1, min(8, int(d))) for d in args.depths.split(",") if d.strip()]
+        worker_fn = selfplay_shard
+        tasks = build_selfplay_tasks(
+            args.games,
+            args.shard_size or 10,
+            args.rows,
+            args.cols,
+            depths,
+            args.seed,
+            datetime.now(),
+        )
+    else:
+        worker_fn = generate_shard
+        tasks = build_tasks(
+            args.games,
+            args.shard_size or 20_000,
+            args.rows,
+            args.cols,
+            args.seed,
+            datetime.now(),
+        )
+
+    t0 = time.perf_counter()
+    inserted = 0
+    pending = 0
+    # label -> [parties, secondes cumulées côté worker]
+    per_label = {}
+
+    with psycopg2.connect(**DB_CONFIG) as conn:
+        ensure_columns(conn)
+
+        if args.workers > 0:
+            pool = multiprocessing.Pool(args.workers)
+            shards = pool.imap_unordered(worker_fn, tasks)
+        else:
+            pool = None
+            shards = map(worker_fn, tasks)
+
+        try:
+            with conn.cursor() as cur:
+                for _shard_index, n, csv_text, label, seconds in shards:
+                    cur.copy_expert(COPY_SQL, io.StringIO(csv_text))
+                    stat = per_label.setdefault(label, [0, 0.0])
+                    stat[0] += n
+                    stat[1] += seconds
+                    inserted += n
+                    pending += n
+                    if pending >= args.commit_every:
+                        conn.commit()
+                        pending = 0
+                    rate = inserted / (time.perf_counter() - t0)
+                    print(
+                        f"✅ {inserted}/{args.games} parties insérées ({rate:,.0f} parties/s)"
+                    )
+            conn.commit()
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    dt = time.perf_counter() - t0
+    print(
+        f"✅ Remplissage terminé: {inserted} parties en {dt:.1f}s "
+        f"({inserted / dt if dt else 0:,.0f} parties/s)."
+    )
+    for label, (n, seconds) in sorted(per_label.items()):
+        print(
+            f"   {label}: {n} parties, {n / seconds if seconds else 0:,.2f} parties/s par worker"
+        )
 
 
 if __name__ == "__main__":
-    main(n_games=300)
+    main()
@@ -1,8 +1,11 @@
+import argparse
 import os
+import queue
 import re
 import time
 import random
 import sqlite3
+import threading
 from datetime import datetime, timezone
 
 import undetected_chromedriver as uc
@@ -11,6 +14,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from connect4_core import Position
+from connect4_engine import Engine
+
 
 # =========================
 # DB LAYER (SQLite simple)
@@ -19,16 +25,129 @@ class DBWriter:
     """
     DB minimaliste pour enregistrer des parties + coups.
     Tu peux remplacer cette classe par ton code (bga_to_db.py) plus tard.
+
+    write_behind=True: SQLite en WAL, toutes les écritures passent par un
+    thread writer (file bornée) qui commite par lots -> le bot n'attend
+    jamais le disque. flush() est appelé en fin de partie et à la fermeture.
     """
 
-    def __init__(self, db_path="connect4.db"):
+    QUEUE_SIZE = 10_000
+    BATCH_SIZE = 200  # commit au plus tard tous les N ordres...
+    COMMIT_INTERVAL = 1.0  # ...ou toutes les N secondes
+    CALL_POLL = 1.0  # s entre deux vérifications du thread writer (_call)
+
+    def __init__(self, db_path="connect4.db", write_behind: bool = False):
         self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.execute("PRAGMA foreign_keys = ON;")
-        self._ensure_schema()
+        self.write_behind = write_behind
+        self._thread = None
+        self._start_error = None
+
+        if not write_behind:
+            self.conn = self._connect()
+            return
 
-    def _ensure_schema(self):
-        self.conn.execute(
+        self.conn = None  # la connexion appartient au thread writer
+        self._q: queue.Queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._writer_loop, args=(ready,), name="DBWriter", daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+        if self._start_error is not None:
+            # base illisible / schéma impossible: on échoue ici au lieu de bloquer
+            raise self._start_error
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        if self.write_behind:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
+        self._ensure_schema(conn)
+        return conn
+
+    # ---------- thread writer ----------
+    def _writer_loop(self, ready: threading.Event):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            self._start_error = e
+            return
+        finally:
+            ready.set()
+        pending = 0
+        last_commit = time.monotonic()
+        while True:
+            try:
+                item = self._q.get(timeout=self.COMMIT_INTERVAL)
+            except queue.Empty:
+                item = None
+
+            if item is not None:
+                fn, reply = item
+                if fn is None:  # stop
+                    break
+                if reply is None:
+                    try:
+                        fn(conn)
+                        pending += 1
+                    except Exception as e:
+                        print(f"⚠️ DBWriter: écriture ignorée ({e})")
+                else:
+                    # appel synchrone (start_game / flush): commit + réponse
+                    try:
+                        reply["result"] = fn(conn)
+                    except Exception as e:
+                        reply["error"] = e
+                    pending += 1
+
+            now = time.monotonic()
+            must_commit = (
+                (item is not None and item[1] is not None)
+                or pending >= self.BATCH_SIZE
+                or (pending and now - last_commit >= self.COMMIT_INTERVAL)
+            )
+            if must_commit:
+                try:
+                    conn.commit()
+                except Exception as e:
+                    print(f"⚠️ DBWriter: commit échoué ({e})")
+                pending = 0
+                last_commit = now
+                if item is not None and item[1] is not None:
+                    item[1]["done"].set()
+
+        conn.commit()
+        conn.close()
+
+    def _submit(self, fn):
+        """Écriture asynchrone (bloque seulement si la file est pleine)."""
+        self._q.put((fn, None))
+
+    def _call(self, fn):
+        """Exécute fn(conn) dans le writer après tout ce qui est en file, commit inclus."""
+        reply = {"done": threading.Event()}
+        if not self._thread.is_alive():
+            raise RuntimeError("DBWriter: le thread writer est arrêté")
+        self._q.put((fn, reply))
+        while not reply["done"].wait(self.CALL_POLL):
+            if not self._thread.is_alive():
+                raise RuntimeError("DBWriter: le thread writer s'est arrêté avant de répondre")
+        if "error" in reply:
+            raise reply["error"]
+        return reply.get("result")
+
+    def _write(self, fn):
+        if self.write_behind:
+            self._submit(fn)
+        else:
+            fn(self.conn)
+            self.conn.commit()
+
+    # ---------- schéma ----------
+    def _ensure_schema(self, conn):
+        conn.execute(
             """
             CREATE TABLE IF NOT EXISTS games_live (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -36,17 +155,25 @@ class DBWriter:
                 game_name TEXT NOT NULL,
                 started_at_utc TEXT NOT NULL,
                 ended_at_utc TEXT,
-                status TEXT NOT NULL DEFAULT 'IN_PROGRESS'
+                status TEXT NOT NULL DEFAULT 'IN_PROGRESS',
+                col_offset INTEGER,       -- base des colonnes du DOM (0 ou 1)
+                board_rows INTEGER,       -- taille réelle du plateau de la table
+                board_cols INTEGER
             );
             """
         )
-        self.conn.execute(
+        # bases créées avant la lecture du plateau
+        have = {r[1] for r in conn.execute("PRAGMA table_info(games_live)")}
+        for column in ("col_offset", "board_rows", "board_cols"):
+            if column not in have:
+                conn.execute(f"ALTER TABLE games_live ADD COLUMN {column} INTEGER")
+        conn.execute(
             """
             CREATE TABLE IF NOT EXISTS moves_live (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 game_id INTEGER NOT NULL,
                 move_index INTEGER NOT NULL,
-                player TEXT,              -- "ME" / "OPP" / "UNKNOWN"
+                player TEXT,              -- joueur BGA lu côté page / "UNKNOWN"
                 col INTEGER,              -- 0..6 si détecté
                 raw TEXT,                 -- dump brut (fallback)
                 created_at_utc TEXT NOT NULL,
@@ -55,25 +182,63 @@ class DBWriter:
             );
             """
         )
-        self.conn.commit()
+        # nos coups (repli quand le JS ne donne rien): index local 0, 1, 2...
+        # à part, pour ne jamais prendre la place d'un coup JS de même index
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS my_moves_live (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                game_id INTEGER NOT NULL,
+                move_index INTEGER NOT NULL,
+                col INTEGER,
+                raw TEXT,
+                created_at_utc TEXT NOT NULL,
+                UNIQUE(game_id, move_index),
+                FOREIGN KEY(game_id) REFERENCES games_live(id) ON DELETE CASCADE
+            );
+            """
+        )
+        conn.commit()
 
+    # ---------- API ----------
     def start_game(self, game_name: str, bga_table_id: str | None):
         started = datetime.now(timezone.utc).isoformat()
-        cur = self.conn.cursor()
-        cur.execute(
-            "INSERT INTO games_live (bga_table_id, game_name, started_at_utc) VALUES (?, ?, ?)",
-            (bga_table_id, game_name, started),
-        )
+
+        def op(conn):
+            cur = conn.cursor()
+            cur.execute(
+                "INSERT INTO games_live (bga_table_id, game_name, started_at_utc) VALUES (?, ?, ?)",
+                (bga_table_id, game_name, started),
+            )
+            return cur.lastrowid
+
+        if self.write_behind:
+            return self._call(op)  # id nécessaire tout de suite
+        game_id = op(self.conn)
         self.conn.commit()
-        return cur.lastrowid
+        return game_id
 
     def end_game(self, game_id: int, status: str = "FINISHED"):
         ended = datetime.now(timezone.utc).isoformat()
-        self.conn.execute(
-            "UPDATE games_live SET ended_at_utc=?, status=? WHERE id=?",
-            (ended, status, game_id),
+        self._write(
+            lambda conn: conn.execute(
+                "UPDATE games_live SET ended_at_utc=?, status=? WHERE id=?",
+                (ended, status, game_id),
+            )
+        )
+        self.flush()
+
+    def set_board(self, game_id: int, rows: int, cols: int, col_offset: int):
+        """Taille et base des colonnes du plateau (lues une fois par partie), pour l'export."""
+        self._write(
+            lambda conn: conn.execute(
+                """
+                UPDATE games_live SET board_rows=?, board_cols=?, col_offset=?
+                WHERE id=? AND col_offset IS NULL
+                """,
+                (rows, cols, col_offset, game_id),
+            )
         )
-        self.conn.commit()
 
     def insert_move(
         self,
@@ -84,18 +249,42 @@ class DBWriter:
         raw: str | None,
     ):
         created = datetime.now(timezone.utc).isoformat()
-        self.conn.execute(
-            """
-            INSERT OR IGNORE INTO moves_live (game_id, move_index, player, col, raw, created_at_utc)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (game_id, move_index, player, col, raw, created),
+        self._write(
+            lambda conn: conn.execute(
+                """
+                INSERT OR IGNORE INTO moves_live (game_id, move_index, player, col, raw, created_at_utc)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (game_id, move_index, player, col, raw, created),
+            )
         )
-        self.conn.commit()
+
+    def insert_my_move(self, game_id: int, move_index: int, col: int | None, raw: str | None):
+        """Un de nos coups (index local, indépendant des move_index JS)."""
+        created = datetime.now(timezone.utc).isoformat()
+        self._write(
+            lambda conn: conn.execute(
+                """
+                INSERT OR IGNORE INTO my_moves_live (game_id, move_index, col, raw, created_at_utc)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (game_id, move_index, col, raw, created),
+            )
+        )
+
+    def flush(self):
+        """Attend que tout ce qui est en file soit écrit et commité."""
+        if self.write_behind and self._thread is not None and self._thread.is_alive():
+            self._call(lambda conn: None)
 
     def close(self):
         try:
-            self.conn.close()
+            if self.write_behind and self._thread is not None:
+                self.flush()
+                self._q.put((None, None))
+                self._thread.join()
+            else:
+                self.conn.close()
         except Exception:
             pass
 
@@ -140,74 +329,83 @@ def infer_col_from_square_element(el) -> int | None:
     return None
 
 
-def try_get_moves_from_bga_js(driver) -> list[dict] | None:
-    """
-    BGA stocke souvent des infos dans `gameui` (dojo) mais ça dépend du jeu.
-    On tente plusieurs chemins possibles.
-    Retour attendu: liste de dicts (au minimum {move_index, col, player})
-    """
-    js = r"""
-    try {
-        // 1) parfois les coups sont gardés dans une structure interne
-        // (ceci dépend complètement de l'implémentation du jeu)
-        const cand = [];
-
-        function safePushMove(mi, col, player, raw) {
-            if (mi == null) return;
-            cand.push({move_index: mi, col: col ?? null, player: player ?? "UNKNOWN", raw: raw ?? null});
-        }
+# Curseur côté page: chaque source (notifqueue / gamedatas.moves / gamedatas.log)
+# n'est parcourue qu'une fois par entrée (window.__c4cursor garde la position
+# déjà scannée); seuls les coups d'index > ack (dernier index enregistré côté
+# Python) sont renvoyés, et le cache JS est purgé de ce qui est acquitté.
+MOVES_CURSOR_JS = r"""
+try {
+    const ack = arguments[0];
+    const key = arguments[1];
+    let c = window.__c4cursor;
+    if (!c || c.key !== key) {
+        c = window.__c4cursor = {key: key, sources: {}};
+    }
 
-        // ---- Tentative A: notifications buffered (rare mais possible)
-        if (window.gameui && window.gameui.notifqueue && window.gameui.notifqueue.queue) {
-            const q = window.gameui.notifqueue.queue;
-            let idx = 0;
-            for (const it of q) {
-                // it: {type, args, ...} varie beaucoup
-                if (it && it.args) {
-                    // connectfour: on tente des clés fréquentes
-                    const col = (it.args.col ?? it.args.column ?? it.args.x);
-                    if (col !== undefined) safePushMove(idx, Number(col), it.args.player ?? "UNKNOWN", JSON.stringify(it.args));
-                }
-                idx++;
-            }
-            if (cand.length > 0) return cand;
+    function rowToMove(name, it, i) {
+        if (name === "queue") {
+            // it: {type, args, ...} varie beaucoup
+            if (!it || !it.args) return null;
+            // connectfour: on tente des clés fréquentes
+            const col = (it.args.col ?? it.args.column ?? it.args.x);
+            if (col === undefined) return null;
+            return {move_index: i, col: Number(col), player: it.args.player ?? "UNKNOWN", raw: JSON.stringify(it.args)};
         }
+        if (name === "moves") {
+            return {move_index: i, col: Number(it.col ?? it.column ?? it.x), player: it.player ?? it.player_id ?? "UNKNOWN", raw: JSON.stringify(it)};
+        }
+        // log: on tente d'extraire "col" d'un texte
+        const s = JSON.stringify(it);
+        const m = s.match(/col[^0-9]*([0-9]+)/i) || s.match(/column[^0-9]*([0-9]+)/i);
+        return {move_index: i, col: m ? Number(m[1]) : null, player: "UNKNOWN", raw: s};
+    }
 
-        // ---- Tentative B: gamedatas (rarement "moves", mais parfois)
-        if (window.gameui && window.gameui.gamedatas) {
-            const gd = window.gameui.gamedatas;
-
-            if (gd.moves && Array.isArray(gd.moves)) {
-                let i = 0;
-                for (const mv of gd.moves) {
-                    safePushMove(i, Number(mv.col ?? mv.column ?? mv.x), mv.player ?? mv.player_id ?? "UNKNOWN", JSON.stringify(mv));
-                    i++;
-                }
-                if (cand.length > 0) return cand;
-            }
-
-            // ---- Tentative C: history/log (encore plus rare)
-            if (gd.log && Array.isArray(gd.log)) {
-                let i = 0;
-                for (const row of gd.log) {
-                    // on tente d'extraire "col" d'un texte
-                    const s = JSON.stringify(row);
-                    const m = s.match(/col[^0-9]*([0-9]+)/i) || s.match(/column[^0-9]*([0-9]+)/i);
-                    const col = m ? Number(m[1]) : null;
-                    safePushMove(i, col, "UNKNOWN", s);
-                    i++;
-                }
-                if (cand.length > 0) return cand;
-            }
+    function scan(name, arr) {
+        let st = c.sources[name];
+        if (!st || arr.length < st.scanned) {
+            // nouvelle source ou tableau réinitialisé (rechargement): on repart de 0
+            st = c.sources[name] = {scanned: 0, total: 0, pending: []};
         }
+        for (let i = st.scanned; i < arr.length; i++) {
+            const mv = rowToMove(name, arr[i], i);
+            if (mv) { st.pending.push(mv); st.total++; }
+        }
+        st.scanned = arr.length;
+        st.pending = st.pending.filter(mv => mv.move_index > ack);
+        return st;
+    }
 
-        return null;
-    } catch(e) {
-        return null;
+    const gu = window.gameui;
+    const sources = [];
+    // ---- Tentative A: notifications buffered (rare mais possible)
+    if (gu && gu.notifqueue && gu.notifqueue.queue) sources.push(["queue", gu.notifqueue.queue]);
+    // ---- Tentative B / C: gamedatas.moves puis history/log
+    if (gu && gu.gamedatas) {
+        if (Array.isArray(gu.gamedatas.moves)) sources.push(["moves", gu.gamedatas.moves]);
+        if (Array.isArray(gu.gamedatas.log)) sources.push(["log", gu.gamedatas.log]);
     }
+
+    for (const [name, arr] of sources) {
+        const st = scan(name, arr);
+        if (st.total > 0) return st.pending;
+    }
+    return null;
+} catch(e) {
+    return null;
+}
+"""
+
+
+def try_get_moves_from_bga_js(driver, after_index: int = -1, cursor_key=None) -> list[dict] | None:
+    """
+    BGA stocke souvent des infos dans `gameui` (dojo) mais ça dépend du jeu.
+    On tente plusieurs chemins possibles.
+    Ne renvoie que les coups d'index > after_index (curseur incrémental côté page,
+    remis à zéro quand cursor_key change, ex: à chaque nouvelle partie).
+    Retour attendu: liste de dicts (au minimum {move_index, col, player})
     """
     try:
-        res = driver.execute_script(js)
+        res = driver.execute_script(MOVES_CURSOR_JS, int(after_index), cursor_key)
         if isinstance(res, list) and len(res) > 0:
             # normalise
             out = []
@@ -231,13 +429,127 @@ def try_get_moves_from_bga_js(driver) -> list[dict] | None:
     return None
 
 
+# Pions posés sur #board (premier sélecteur qui trouve quelque chose, 0 sinon);
+# null si le plateau n'est pas dans la page.
+DISC_COUNT_JS = r"""
+const board = document.getElementById("board");
+if (!board) return null;
+for (const sel of [".disc", ".piece", ".token", "[id^='disc_']"]) {
+    const n = board.querySelectorAll(sel).length;
+    if (n > 0) return n;
+}
+return 0;
+"""
+
+
+def count_board_discs(driver) -> int | None:
+    """Nombre de pions visibles sur le plateau (None si illisible)."""
+    try:
+        n = driver.execute_script(DISC_COUNT_JS)
+        return None if n is None else int(n)
+    except Exception:
+        return None
+
+
+# =========================
+# TURN HOOK (événements côté page)
+# =========================
+# MutationObserver sur la classe du <body> (current_player_is_active) et sur le
+# titre (#pagemaintitletext: "Fin de la partie" / "Victoire"). L'état est tenu
+# dans window.__c4bot; le bot attend dessus via execute_async_script au lieu de
+# poller le DOM toutes les 3 s.
+TURN_HOOK_JS = r"""
+if (window.__c4bot && window.__c4bot.installed) return true;
+const s = window.__c4bot = {installed: true, active: false, over: false, seq: 0, waiters: []};
+
+function titleText() {
+    const t = document.getElementById("pagemaintitletext");
+    return t ? (t.textContent || "") : "";
+}
+
+function check() {
+    const active = document.body.classList.contains("current_player_is_active");
+    const over = /Fin de la partie|Victoire/.test(titleText());
+    if (active === s.active && over === s.over) return;
+    s.active = active;
+    s.over = over;
+    s.seq++;
+    const ws = s.waiters;
+    s.waiters = [];
+    for (const w of ws) w();
+}
+
+new MutationObserver(check).observe(document.body, {attributes: true, attributeFilter: ["class"]});
+const title = document.getElementById("pagemaintitletext");
+const titleRoot = title ? (title.parentNode || title) : document.body;
+new MutationObserver(check).observe(titleRoot, {childList: true, subtree: true, characterData: true});
+check();
+return true;
+"""
+
+# arguments[0] = "turn" (attend notre tour ou la fin) / "idle" (attend la fin de notre tour)
+# arguments[1] = timeout ms ; résultat: MY_TURN / GAME_OVER / WAITING / NO_HOOK,
+# ou TIMEOUT si "idle" n'a rien vu ("turn" sans verdict -> WAITING)
+WAIT_TURN_JS = r"""
+const done = arguments[arguments.length - 1];
+const mode = arguments[0];
+const timeoutMs = arguments[1];
+const s = window.__c4bot;
+if (!s || !s.installed) { done("NO_HOOK"); return; }
+
+function verdict() {
+    if (s.over) return "GAME_OVER";
+    if (mode === "turn") return s.active ? "MY_TURN" : null;
+    return s.active ? null : "WAITING";
+}
+
+let finished = false;
+function finish(v) { if (!finished) { finished = true; done(v); } }
+function onChange() {
+    if (finished) return;  // appel déjà terminé (timeout): on ne se réinscrit pas
+    const v = verdict();
+    if (v) finish(v); else s.waiters.push(onChange);
+}
+
+const v = verdict();
+if (v) { finish(v); return; }
+s.waiters.push(onChange);
+setTimeout(() => {
+    const i = s.waiters.indexOf(onChange);
+    if (i >= 0) s.waiters.splice(i, 1);
+    finish(mode === "turn" ? "WAITING" : "TIMEOUT");
+}, timeoutMs);
+"""
+
+# moteur (mode "engine"); taille du plateau lue sur la page (#board .square)
+ENGINE_MAX_DEPTH = 20
+ENGINE_TIME_BUDGET = 1.0  # s de réflexion par coup (deadline stricte)
+
+TURN_WAIT_SECONDS = 5.0  # attente max côté page par appel (le bot reboucle)
+MOVE_ACK_SECONDS = 5.0  # attente max de la fin de notre tour après un clic
+LOGIN_TIMEOUT = 600  # s pour se connecter à la main
+
+
+class SessionAborted(RuntimeError):
+    """Levée dans le thread du bot quand on lui demande d'abandonner (runner)."""
+
+
 # =========================
 # BOT
 # =========================
 class BGABot:
-    def __init__(self, chrome_version=144, db_path="connect4.db"):
+    def __init__(
+        self,
+        chrome_version=144,
+        db_path="connect4.db",
+        move_mode="random",
+        think_time=ENGINE_TIME_BUDGET,
+        db=None,
+        profile_dir=None,
+        headless=False,
+    ):
         script_dir = os.path.dirname(os.path.abspath(__file__))
-        user_data_path = os.path.join(script_dir, "profile")
+        user_data_path = profile_dir or os.path.join(script_dir, "profile")
 
         options = uc.ChromeOptions()
         options.add_argument(f"--user-data-dir={user_data_path}")
@@ -245,11 +557,15 @@ class BGABot:
         options.add_argument("--start-maximized")
 
         print(f"Launching Chrome v{chrome_version}...")
-        self.driver = uc.Chrome(options=options, version_main=chrome_version)
+        self.driver = uc.Chrome(
+            options=options, version_main=chrome_version, headless=headless
+        )
         self.driver.set_page_load_timeout(30)
         self.wait = WebDriverWait(self.driver, 20)
 
-        self.db = DBWriter(db_path=db_path)
+        # db partagé (runner multi-sessions) ou propre à ce bot
+        self.owns_db = db is None
+        self.db = db if db is not None else DBWriter(db_path=db_path, write_behind=True)
         self.current_game_id = None
         self.current_table_id = None
         self.local_move_index = (
@@ -259,10 +575,41 @@ class BGABot:
         # anti-dup insertion quand on lit via JS
         self.last_js_move_index_saved = -1
 
-    def login(self):
+        # détection de tour par événements (False => polling historique)
+        self.turn_hook = False
+
+        # choix du coup: "random" (historique) ou "engine" (recherche alpha-beta)
+        self.move_mode = move_mode
+        self.think_time = think_time
+        self.engine = Engine() if move_mode == "engine" else None
+        self.js_cols = {}  # move_index -> colonne brute (coups synchronisés via JS)
+        # plateau lu une fois par partie (BGA propose d'autres tailles que 9x9)
+        self.col_offset = None  # base des colonnes du DOM (0 ou 1)
+        self.board_rows = None
+        self.board_cols = None
+
+        # santé (lue par bot_runner): phase courante + dernier signe de vie
+        self.abort = threading.Event()
+        self.phase = "init"
+        self.phase_since = time.monotonic()
+        self.heartbeat = self.phase_since
+
+    def _set_phase(self, phase: str):
+        self.phase = phase
+        self.phase_since = time.monotonic()
+        self._tick()
+
+    def _tick(self):
+        """Signe de vie; lève SessionAborted si le runner a demandé l'abandon."""
+        self.heartbeat = time.monotonic()
+        if self.abort.is_set():
+            raise SessionAborted(f"abandon demandé (phase {self.phase})")
+
+    def login(self, timeout=LOGIN_TIMEOUT):
+        self._set_phase("login")
         print("Opening BGA... Please log in manually if prompted.")
         self.driver.get("https://en.boardgamearena.com/account")
-        login_wait = WebDriverWait(self.driver, 600)
+        login_wait = WebDriverWait(self.driver, timeout)
         login_wait.until(lambda d: "account" not in d.current_url)
         print("\n--- LOGIN DETECTED ---")
         time.sleep(2)
@@ -289,6 +636,7 @@ class BGABot:
     def select_realtime_mode(self):
         print("🔄 Entrée dans la boucle de sélection du mode...")
         while True:
+            self._tick()
             try:
                 dropdown_button = self.wait.until(
                     EC.element_to_be_clickable(
@@ -332,6 +680,7 @@ class BGABot:
         board_id = "board"
 
         while True:
+            self._tick()
             self.clear_popups()
 
             try:
@@ -369,11 +718,38 @@ class BGABot:
             except Exception:
                 time.sleep(2)
 
+    def install_turn_hook(self) -> bool:
+        """Installe le MutationObserver de tour sur la page de jeu courante."""
+        try:
+            self.turn_hook = bool(self.driver.execute_script(TURN_HOOK_JS))
+        except Exception as e:
+            print(f"⚠️ Turn hook indisponible, polling classique ({e})")
+            self.turn_hook = False
+        return self.turn_hook
+
+    def wait_turn_event(self, mode: str = "turn", timeout: float = TURN_WAIT_SECONDS) -> str:
+        """
+        Bloque côté page jusqu'à un changement d'état (ou timeout):
+        MY_TURN / GAME_OVER / WAITING (+ TIMEOUT en mode "idle": coup pas
+        encore pris par BGA). Réinstalle le hook si la page a été rechargée.
+        """
+        self.driver.set_script_timeout(timeout + 5)
+        res = self.driver.execute_async_script(WAIT_TURN_JS, mode, int(timeout * 1000))
+        if res == "NO_HOOK":
+            if not self.install_turn_hook():
+                return "WAITING"
+            res = self.driver.execute_async_script(WAIT_TURN_JS, mode, int(timeout * 1000))
+        return res if res in ("MY_TURN", "GAME_OVER", "WAITING", "TIMEOUT") else "WAITING"
+
     def _ensure_game_started_in_db(self):
         # table id depuis l'url courante (si dispo)
         self.current_table_id = extract_table_id_from_url(self.driver.current_url)
         self.local_move_index = 0
         self.last_js_move_index_saved = -1
+        self.js_cols = {}
+        self.col_offset = None
+        self.board_rows = None
+        self.board_cols = None
         self.current_game_id = self.db.start_game(
             game_name="connectfour", bga_table_id=self.current_table_id
         )
@@ -389,11 +765,15 @@ class BGABot:
         if self.current_game_id is None:
             return
 
-        moves = try_get_moves_from_bga_js(self.driver)
+        moves = try_get_moves_from_bga_js(
+            self.driver,
+            after_index=self.last_js_move_index_saved,
+            cursor_key=self.current_game_id,
+        )
         if not moves:
             return
 
-        # On enregistre tout ce qui est nouveau
+        # On enregistre tout ce qui est nouveau (le filtre reste une sécurité)
         for mv in moves:
             mi = mv["move_index"]
             if mi <= self.last_js_move_index_saved:
@@ -405,28 +785,130 @@ class BGABot:
                 col=mv["col"],
                 raw=mv.get("raw"),
             )
+            self.js_cols[mi] = mv["col"]
             self.last_js_move_index_saved = mi
 
         # ⚠️ On ne force pas local_move_index ici, car le fallback sert surtout pour TES coups
         # si JS n’est pas dispo.
 
-    def play_random_move(self):
-        try:
-            # 0) sync JS (si possible) pour récupérer aussi les coups adverses
-            self._sync_moves_from_js_if_possible()
+    def _turn_state_polling(self) -> str:
+        """Ancienne détection (plusieurs allers-retours WebDriver)."""
+        title_text = self.driver.find_element(By.ID, "pagemaintitletext").text
+        if "Fin de la partie" in title_text or "Victoire" in title_text:
+            print(f"🏁 Game Over Detected: {title_text}")
+            return "GAME_OVER"
+        is_active = self.driver.find_elements(
+            By.CSS_SELECTOR, "body.current_player_is_active"
+        )
+        return "MY_TURN" if is_active else "WAITING"
 
-            # 1) Check end game
-            title_text = self.driver.find_element(By.ID, "pagemaintitletext").text
-            if "Fin de la partie" in title_text or "Victoire" in title_text:
-                print(f"🏁 Game Over Detected: {title_text}")
-                return "GAME_OVER"
+    def current_position(self) -> Position | None:
+        """
+        Position reconstruite depuis les coups synchronisés via JS, sur le
+        plateau lu par read_board (taille réelle de la table).
+        None si l'historique est incomplet (colonne inconnue) ou incohérent.
 
-            # 2) Turn detection
-            is_active = self.driver.find_elements(
-                By.CSS_SELECTOR, "body.current_player_is_active"
+        Les move_index viennent de la file / du log BGA, pas forcément des
+        numéros de coup: on exige exactement 0..n-1 et autant de pions sur
+        #board, sinon un coup manquant décalerait toute la position.
+        """
+        if self.col_offset is None:
+            return None
+        n = len(self.js_cols)
+        if sorted(self.js_cols) != list(range(n)):
+            return None
+        cols = [self.js_cols[i] for i in range(n)]
+        if any(c is None for c in cols):
+            return None
+        discs = count_board_discs(self.driver)
+        if discs is None or discs != n:
+            return None
+        try:
+            return Position.from_moves(
+                self.board_rows, self.board_cols, [c - self.col_offset for c in cols]
             )
-            if not is_active:
-                return "WAITING"
+        except ValueError:
+            return None
+
+    def read_board(self) -> bool:
+        """
+        Géométrie du plateau depuis #board .square, lue une fois par partie:
+        base des colonnes du DOM (0 ou 1) = plus petite colonne, colonnes =
+        colonnes distinctes, lignes = cases / colonnes.
+        Enregistrée avec la partie (bot_export en a besoin pour passer les
+        colonnes JS en 0-based sans deviner).
+        False si le plateau est illisible (on réessaiera au prochain coup).
+        """
+        if self.col_offset is not None:
+            return True
+        all_cols = [
+            infer_col_from_square_element(sq)
+            for sq in self.driver.find_elements(By.CSS_SELECTOR, "#board .square")
+        ]
+        if not all_cols or any(c is None for c in all_cols):
+            return False
+        distinct = sorted(set(all_cols))
+        n_cols = len(distinct)
+        if distinct != list(range(distinct[0], distinct[0] + n_cols)) or len(all_cols) % n_cols:
+            return False  # colonnes trouées / plateau non rectangulaire
+
+        self.col_offset = distinct[0]
+        self.board_cols = n_cols
+        self.board_rows = len(all_cols) // n_cols
+        print(f"📐 Plateau {self.board_rows}x{self.board_cols} (colonnes DOM à partir de {self.col_offset})")
+        if self.current_game_id is not None:
+            self.db.set_board(
+                self.current_game_id, self.board_rows, self.board_cols, self.col_offset
+            )
+        return True
+
+    def choose_target(self, clickable_squares):
+        """
+        Retourne (case, colonne brute, info) où info décrit la décision.
+        Mode engine: recherche dans le temps imparti, sinon (ou en cas
+        d'historique inutilisable) coup aléatoire comme avant.
+        """
+        by_col = {}
+        for sq in clickable_squares:
+            col = infer_col_from_square_element(sq)
+            if col is not None:
+                by_col.setdefault(col, sq)
+
+        if self.engine is not None and by_col:
+            pos = self.current_position() if self.read_board() else None
+            if pos is not None:
+                res = self.engine.search(pos, ENGINE_MAX_DEPTH, time_limit=self.think_time)
+                raw_col = res["col"] + self.col_offset
+                if raw_col in by_col:
+                    info = (
+                        f"engine col={res['col']} depth={res['depth']} "
+                        f"nodes={res['nodes']} time={res['time']:.3f}s score={res['score']}"
+                    )
+                    print(f"🧠 {info} (budget {self.think_time:.2f}s)")
+                    return by_col[raw_col], raw_col, info
+                print(f"⚠️ Colonne moteur {raw_col} non cliquable -> coup aléatoire")
+            else:
+                print("⚠️ Historique JS incomplet ou incohérent avec le plateau -> coup aléatoire")
+
+        target = random.choice(clickable_squares)
+        col = infer_col_from_square_element(target)
+        return target, col, f"clicked_square col={col}"
+
+    def play_move(self):
+        try:
+            # 1) Turn / end detection (événement côté page si possible)
+            if self.turn_hook:
+                state = self.wait_turn_event("turn")
+                if state == "GAME_OVER":
+                    print("🏁 Game Over Detected")
+            else:
+                state = self._turn_state_polling()
+
+            # 0) sync JS (si possible) pour récupérer aussi les coups adverses
+            if state != "WAITING":
+                self._sync_moves_from_js_if_possible()
+            if state != "MY_TURN":
+                return state
 
             print("🎲 My turn! Playing...")
             clickable_squares = self.driver.find_elements(
@@ -434,22 +916,25 @@ class BGABot:
             )
 
             if clickable_squares:
-                target = random.choice(clickable_squares)
-
-                # essayer de déduire la colonne AVANT le clic
-                col = infer_col_from_square_element(target)
+                self.read_board()  # enregistré pour l'export, quel que soit le mode
+                # colonne déduite AVANT le clic (aléatoire ou moteur)
+                target, col, info = self.choose_target(clickable_squares)
 
                 self.driver.execute_script("arguments[0].click();", target)
-                time.sleep(2.5)
+                if self.turn_hook:
+                    # on attend que BGA prenne le coup (fin de notre tour)
+                    if self.wait_turn_event("idle", timeout=MOVE_ACK_SECONDS) == "TIMEOUT":
+                        print(f"⌛ Coup pas encore pris par BGA après {MOVE_ACK_SECONDS:.0f}s")
+                else:
+                    time.sleep(2.5)
 
                 # fallback: on log au moins ton coup même si JS ne donne rien
                 if self.current_game_id is not None:
-                    self.db.insert_move(
+                    self.db.insert_my_move(
                         game_id=self.current_game_id,
                         move_index=self.local_move_index,
-                        player="ME",
                         col=col,
-                        raw=f"clicked_square col={col}",
+                        raw=info,
                     )
                     self.local_move_index += 1
 
@@ -459,15 +944,60 @@ class BGABot:
 
         except Exception:
             print(f"⌛ Polling game state...")
+            if self.turn_hook:
+                time.sleep(0.5)  # évite une boucle serrée si le driver est en erreur
             return "WAITING"
 
-    def close(self):
+    def play_game(self, game_name="connectfour") -> bool:
+        """
+        Une partie complète: lobby -> table -> boucle de jeu -> fin en base.
+        Retourne True si une partie a été jouée jusqu'au bout.
+        """
+        self._set_phase("lobby")
+        self.navigate_to_game(game_name)
+        self.select_realtime_mode()
+        if not self.start_table():
+            return False
+
+        self._set_phase("game")
+        self._ensure_game_started_in_db()
+        self.install_turn_hook()
+
+        while True:
+            self._tick()
+            status = self.play_move()
+
+            if status == "GAME_OVER":
+                if self.current_game_id is not None:
+                    self.db.end_game(self.current_game_id, status="FINISHED")
+                    print(f"🗄️ DB: game ended (game_id={self.current_game_id})")
+                    self.current_game_id = None
+                self._set_phase("cooldown")
+                print("♻️ Game ended. Preparing to start a new one in 10 seconds...")
+                self.abort.wait(10)
+                return True
+
+            if not self.turn_hook:
+                time.sleep(3)  # polling historique (le hook bloque déjà côté page)
+
+    def abort_current_game(self):
+        """Marque la partie en cours comme ABORTED (crash / relance)."""
         try:
-            self.db.close()
+            if self.current_game_id is not None:
+                self.db.end_game(self.current_game_id, status="ABORTED")
+                self.current_game_id = None
         except Exception:
             pass
-        print("\nBot terminé. Appuyez sur Entrée pour fermer.")
-        input()
+
+    def close(self, wait_for_enter=True):
+        if self.owns_db:
+            try:
+                self.db.close()
+            except Exception:
+                pass
+        if wait_for_enter:
+            print("\nBot terminé. Appuyez sur Entrée pour fermer.")
+            input()
         try:
             self.driver.quit()
         except Exception:
@@ -478,7 +1008,22 @@ class BGABot:
 # MAIN
 # =========================
 if __name__ == "__main__":
-    bot = BGABot(chrome_version=144, db_path="connect4.db")
+    ap = argparse.ArgumentParser(description="Bot BGA Puissance 4")
+    ap.add_argument("--mode", choices=["random", "engine"], default="random")
+    ap.add_argument(
+        "--think-time",
+        type=float,
+        default=ENGINE_TIME_BUDGET,
+        help="secondes de réflexion par coup en mode engine",
+    )
+    args = ap.parse_args()
+
+    bot = BGABot(
+        chrome_version=144,
+        db_path="connect4.db",
+        move_mode=args.mode,
+        think_time=args.think_time,
+    )
     counter = 0
 
     try:
@@ -486,41 +1031,15 @@ if __name__ == "__main__":
 
         while True:
             print("\n🚀 Starting a new session...")
-            bot.navigate_to_game("connectfour")
-            bot.select_realtime_mode()
-
-            if bot.start_table():
+            if bot.play_game("connectfour"):
                 counter += 1
                 print(
-                    f"------------------------ we are playing game number {counter} -----------------------------\n"
+                    f"------------------------ we have played game number {counter} -----------------------------\n"
                 )
 
-                bot._ensure_game_started_in_db()
-
-                game_in_progress = True
-                while game_in_progress:
-                    status = bot.play_random_move()
-
-                    if status == "GAME_OVER":
-                        if bot.current_game_id is not None:
-                            bot.db.end_game(bot.current_game_id, status="FINISHED")
-                            print(f"🗄️ DB: game ended (game_id={bot.current_game_id})")
-                            bot.current_game_id = None
-                        print(
-                            "♻️ Game ended. Preparing to start a new one in 10 seconds..."
-                        )
-                        time.sleep(10)
-                        game_in_progress = False
-
-                    time.sleep(3)
-
     except Exception as main_error:
         print(f"Fatal Error: {main_error}")
         # si crash en plein match, on marque le game comme ABORTED
-        try:
-            if bot.current_game_id is not None:
-                bot.db.end_game(bot.current_game_id, status="ABORTED")
-        except Exception:
-            pass
+        bot.abort_current_game()
     finally:
         bot.close()
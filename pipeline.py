@@ -0,0 +1,203 @@
+"""
+pipeline.py
+============================================================
+Petit pipeline producteur/consommateur à étages (threads)
+✅ Étages reliés par des files bornées (Channel) -> back-pressure naturelle
+✅ Concurrence propre à chaque étage (un contexte par worker: driver, etc.)
+✅ Fermeture propre: un canal se ferme quand tous ses producteurs ont fini
+✅ Un item qui fait lever fn n'est pas perdu: on_error(ctx, item, exc) produit
+   ses sorties de remplacement (ex: résultat "error" -> persist / retry)
+✅ Compteurs par étage: entrées, sorties, erreurs, débit, temps occupé,
+   profondeur de la file d'entrée (rapport périodique + résumé final)
+============================================================
+"""
+
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class Channel:
+    """File bornée entre deux étages, fermée quand le dernier producteur a fini."""
+
+    def __init__(self, name: str, maxsize: int = 0):
+        self.name = name
+        self.maxsize = maxsize
+        self.q: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._producers = 0
+        self._consumers = 0
+        self._lock = threading.Lock()
+
+    def add_producer(self, n: int = 1):
+        with self._lock:
+            self._producers += n
+
+    def add_consumer(self, n: int = 1):
+        with self._lock:
+            self._consumers += n
+
+    def put(self, item):
+        self.q.put(item)  # bloque si la file est pleine
+
+    def get(self):
+        return self.q.get()
+
+    def depth(self) -> int:
+        return self.q.qsize()
+
+    def producer_done(self):
+        with self._lock:
+            self._producers -= 1
+            last = self._producers == 0
+            consumers = self._consumers
+        if last:
+            for _ in range(consumers):
+                self.q.put(_STOP)
+
+
+class Stage:
+    """
+    Un étage = `len(contexts)` threads qui appliquent fn(ctx, item) -> iterable
+    de sorties (ou None). Sans canal d'entrée, l'étage est une source:
+    fn(ctx, None) est appelé une fois par worker.
+    Si fn lève, l'item compte comme une erreur et on_error(ctx, item, exc)
+    (si fourni) donne les sorties à émettre à la place.
+    """
+
+    def __init__(
+        self, name: str, fn, in_ch=None, out_ch=None, contexts=(None,), on_error=None
+    ):
+        self.name = name
+        self.fn = fn
+        self.on_error = on_error
+        self.in_ch = in_ch
+        self.out_ch = out_ch
+        self.contexts = list(contexts)
+        self.n_in = 0
+        self.n_out = 0
+        self.n_errors = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+        self._threads = []
+        if in_ch is not None:
+            in_ch.add_consumer(len(self.contexts))
+        if out_ch is not None:
+            out_ch.add_producer(len(self.contexts))
+
+    @property
+    def workers(self) -> int:
+        return len(self.contexts)
+
+    def _emit(self, outputs):
+        if outputs is None or self.out_ch is None:
+            return 0
+        n = 0
+        for out in outputs:
+            self.out_ch.put(out)
+            n += 1
+        return n
+
+    def _run_one(self, ctx, item):
+        t0 = time.perf_counter()
+        try:
+            outputs = self.fn(ctx, item)
+            emitted = self._emit(outputs)
+            err = 0
+        except Exception as e:
+            print(f"   ⚠️ [{self.name}] erreur:", e)
+            emitted, err = 0, 1
+            if self.on_error is not None:
+                try:
+                    emitted = self._emit(self.on_error(ctx, item, e))
+                except Exception as e2:
+                    print(f"   ❌ [{self.name}] item perdu (on_error a échoué):", e2)
+        dt = time.perf_counter() - t0
+        with self._lock:
+            self.n_in += 1
+            self.n_out += emitted
+            self.n_errors += err
+            self.busy += dt
+
+    def _worker(self, ctx):
+        try:
+            if self.in_ch is None:
+                self._run_one(ctx, None)
+                return
+            while True:
+                item = self.in_ch.get()
+                if item is _STOP:
+                    break
+                self._run_one(ctx, item)
+        finally:
+            if self.out_ch is not None:
+                self.out_ch.producer_done()
+
+    def start(self):
+        for i, ctx in enumerate(self.contexts):
+            t = threading.Thread(
+                target=self._worker, args=(ctx,), name=f"{self.name}-{i}", daemon=True
+            )
+            t.start()
+            self._threads.append(t)
+
+    def join(self):
+        for t in self._threads:
+            t.join()
+
+    def snapshot(self, elapsed: float) -> dict:
+        with self._lock:
+            return {
+                "stage": self.name,
+                "workers": self.workers,
+                "in": self.n_in,
+                "out": self.n_out,
+                "errors": self.n_errors,
+                "rate": self.n_in / elapsed if elapsed > 0 else 0.0,
+                "busy_pct": 100.0 * self.busy / (elapsed * self.workers)
+                if elapsed > 0
+                else 0.0,
+                "queue": self.in_ch.depth() if self.in_ch is not None else None,
+                "queue_max": self.in_ch.maxsize if self.in_ch is not None else None,
+            }
+
+
+def format_stats(snaps) -> str:
+    lines = []
+    for s in snaps:
+        q = "-" if s["queue"] is None else f"{s['queue']}/{s['queue_max'] or '∞'}"
+        lines.append(
+            f"   {s['stage']:<10} x{s['workers']:<2} in={s['in']:<6} out={s['out']:<6} "
+            f"err={s['errors']:<4} {s['rate']:6.2f}/s occupé={s['busy_pct']:5.1f}% file={q}"
+        )
+    return "\n".join(lines)
+
+
+class StatsReporter:
+    """Affiche périodiquement les compteurs de tous les étages."""
+
+    def __init__(self, stages, every: float = 30.0):
+        self.stages = stages
+        self.every = every
+        self.t0 = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def snapshots(self):
+        elapsed = time.perf_counter() - self.t0
+        return [st.snapshot(elapsed) for st in self.stages]
+
+    def _loop(self):
+        while not self._stop.wait(self.every):
+            print("📊 Pipeline:\n" + format_stats(self.snapshots()))
+
+    def start(self):
+        if self.every and self.every > 0:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,186 @@
+"""
+random_games_np.py
+============================================================
+Générateur de parties aléatoires vectorisé (NumPy) pour fill_db_random
+✅ Avance des milliers de parties en même temps (tableaux heights / boards)
+✅ Détection de victoire par fenêtres de 4 vectorisées autour du dernier pion
+✅ N'importe quelle taille rows x cols et couleur de départ (R / Y / random)
+✅ Sortie par lots (générateur) : séquences de coups, gagnants, longueurs
+   -> mémoire d'un seul lot, même pour des dizaines de millions de parties
+✅ Benchmark parties/s
+============================================================
+
+Usage benchmark:
+    python random_games_np.py --games 1000000 --rows 9 --cols 9
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+RED = "R"
+YELLOW = "Y"
+CONNECT_N = 4
+
+# codes dans les tableaux
+EMPTY_CODE = 0
+RED_CODE = 1
+YELLOW_CODE = 2
+DRAW_CODE = 0  # winners == 0 => match nul
+
+CODE_TO_TOKEN = {RED_CODE: RED, YELLOW_CODE: YELLOW}
+
+_PAD = CONNECT_N - 1
+# 4 directions (horizontal, vertical, diag \, diag /) x 7 offsets (-3..+3)
+_K = np.arange(-_PAD, _PAD + 1)
+_DIRS = np.array([(0, 1), (1, 0), (1, 1), (1, -1)])
+_DR = _DIRS[:, 0:1] * _K  # (4, 7)
+_DC = _DIRS[:, 1:2] * _K  # (4, 7)
+
+
+def _starting_codes(n, starting_color, rng):
+    if starting_color == YELLOW:
+        return np.full(n, YELLOW_CODE, dtype=np.int8)
+    if starting_color == "random":
+        return rng.integers(RED_CODE, YELLOW_CODE + 1, size=n, dtype=np.int8)
+    return np.full(n, RED_CODE, dtype=np.int8)
+
+
+def _play_chunk(n, rows, cols, starting_color, rng):
+    max_moves = rows * cols
+    moves = np.full((n, max_moves), -1, dtype=np.int8)
+    lengths = np.zeros(n, dtype=np.int16)
+    winners = np.zeros(n, dtype=np.int8)
+    starting = _starting_codes(n, starting_color, rng)
+
+    # plateau "paddé" de 3 cases de chaque côté: les fenêtres ne sortent jamais
+    boards = np.zeros((n, rows + 2 * _PAD, cols + 2 * _PAD), dtype=np.int8)
+    heights = np.zeros((n, cols), dtype=np.int16)
+    current = starting.copy()
+
+    active = np.arange(n)
+    for ply in range(max_moves):
+        if active.size == 0:
+            break
+
+        # coup aléatoire uniforme parmi les colonnes non pleines
+        legal = heights[active] < rows
+        scores = rng.random((active.size, cols))
+        scores[~legal] = -1.0
+        col = scores.argmax(axis=1)
+
+        player = current[active]
+        h = heights[active, col]
+        r = (rows - 1 - h) + _PAD
+        c = col + _PAD
+        boards[active, r, c] = player
+        heights[active, col] = h + 1
+        moves[active, ply] = col
+
+        # fenêtres de 4 contenant le pion joué, dans les 4 directions
+        vals = boards[active[:, None, None], r[:, None, None] + _DR, c[:, None, None] + _DC]
+        eq = vals == player[:, None, None]
+        run = eq[:, :, 0:4].all(-1)
+        for s in range(1, CONNECT_N):
+            run |= eq[:, :, s : s + 4].all(-1)
+        won = run.any(-1)
+
+        done = won | (ply + 1 >= max_moves)
+        if done.any():
+            finished = active[done]
+            lengths[finished] = ply + 1
+            winners[active[won]] = player[won]
+            active = active[~done]
+
+        current[active] = np.where(
+            current[active] == RED_CODE, YELLOW_CODE, RED_CODE
+        ).astype(np.int8)
+
+    return {
+        "moves": moves,
+        "lengths": lengths,
+        "winners": winners,
+        "starting": starting,
+    }
+
+
+def generate_random_games(
+    n_games,
+    rows=9,
+    cols=9,
+    starting_color=RED,
+    seed=None,
+    batch_size=8192,
+):
+    """
+    Joue `n_games` parties aléatoires (coups uniformes parmi les colonnes jouables),
+    par lots de `batch_size`: générateur, rien n'est concaténé.
+
+    starting_color: "R", "Y" ou "random" (tirée par partie).
+    Produit, pour chaque lot de n parties, un dict de tableaux NumPy:
+      - moves    (n, rows*cols) int8, colonnes 0-based, -1 après la fin
+      - lengths  (n,) int16, nombre de coups joués
+      - winners  (n,) int8, 1=R, 2=Y, 0=nul
+      - starting (n,) int8, 1=R, 2=Y
+    """
+    rng = np.random.default_rng(seed)
+    remaining = int(n_games)
+    while remaining > 0:
+        k = min(batch_size, remaining)
+        yield _play_chunk(k, int(rows), int(cols), starting_color, rng)
+        remaining -= k
+
+
+def iter_games(batch):
+    """
+    Itère un lot de generate_random_games au format de play_random_game:
+    (moves: list[int], winner: "R"/"Y"/None, starting_color: "R"/"Y")
+    """
+    moves = batch["moves"]
+    for i, n in enumerate(batch["lengths"].tolist()):
+        yield (
+            moves[i, :n].tolist(),
+            CODE_TO_TOKEN.get(int(batch["winners"][i])),
+            CODE_TO_TOKEN[int(batch["starting"][i])],
+        )
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark générateur NumPy")
+    ap.add_argument("--games", type=int, default=100_000)
+    ap.add_argument("--rows", type=int, default=9)
+    ap.add_argument("--cols", type=int, default=9)
+    ap.add_argument("--starting", default=RED, choices=[RED, YELLOW, "random"])
+    ap.add_argument("--batch", type=int, default=8192)
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    total_len = 0
+    counts = {RED_CODE: 0, YELLOW_CODE: 0, DRAW_CODE: 0}
+    for batch in generate_random_games(
+        args.games,
+        rows=args.rows,
+        cols=args.cols,
+        starting_color=args.starting,
+        seed=args.seed,
+        batch_size=args.batch,
+    ):
+        total_len += int(batch["lengths"].sum())
+        for code in counts:
+            counts[code] += int((batch["winners"] == code).sum())
+    dt = time.perf_counter() - t0
+
+    print(f"✅ {args.games} parties {args.rows}x{args.cols} en {dt:.2f}s")
+    print(f"   {args.games / dt:,.0f} parties/s")
+    print(f"   longueur moyenne = {total_len / max(1, args.games):.1f} coups")
+    print(
+        f"   R={counts[RED_CODE]} "
+        f"Y={counts[YELLOW_CODE]} "
+        f"nuls={counts[DRAW_CODE]}"
+    )
+
+
+if __name__ == "__main__":
+    main()
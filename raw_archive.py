@@ -0,0 +1,222 @@
+"""
+raw_archive.py
+============================================================
+Archive locale des pages BGA brutes (adressée par contenu)
+✅ Chaque page /table, /gamereview, replay (ou g_gamelogs JSON) est stockée
+   une seule fois, compressée gzip, sous raw_pages/objects/<sha[:2]>/<sha>.gz
+✅ Index append-only raw_pages/index.jsonl: table_id, type, url, sha256, date
+✅ Re-parse hors-ligne en parallèle (aucun navigateur, aucun réseau):
+   reconstruit les fichiers moves_*.json à partir de l'archive, au format
+   dict de bga_loader (coups 0-based + "size" lue sur /table ou /gamereview)
+============================================================
+
+Usage re-parse (puis import avec bga_bulk_import):
+    python raw_archive.py --out scraped_moves_reparsed --workers 8
+    python bga_bulk_import.py --dir scraped_moves_reparsed
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from multiprocessing import Pool
+from pathlib import Path
+
+from bga_parse import (
+    detect_board_size_anchored,
+    detect_board_size_loose,
+    extract_gamelogs_from_html,
+    html_to_text,
+    moves_from_gamelogs,
+    parse_gamereview_moves,
+    parse_table_page,
+    player_links_from_html,
+)
+
+PROJECT_DIR = Path(__file__).resolve().parent
+DEFAULT_ARCHIVE_DIR = PROJECT_DIR / "raw_pages"
+DEFAULT_OUT_DIR = PROJECT_DIR / "scraped_moves_reparsed"
+
+# types de payload
+KIND_TABLE = "table"  # HTML /table
+KIND_GAMEREVIEW = "gamereview"  # HTML /gamereview
+KIND_REPLAY = "replay"  # HTML /archive/replay (g_gamelogs inline)
+KIND_GAMELOGS = "gamelogs"  # JSON window.g_gamelogs (extrait via Selenium)
+
+
+class RawArchive:
+    """Écriture thread-safe (un verrou pour l'index, objets écrits atomiquement)."""
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.index_path = self.root / "index.jsonl"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def object_path(self, sha: str) -> Path:
+        return self.objects_dir / sha[:2] / f"{sha}.gz"
+
+    def put(self, table_id, kind: str, content: str, url: str | None = None) -> str:
+        """Stocke `content` (si absent) et l'indexe pour (table_id, kind). Retourne le sha256."""
+        raw = (content or "").encode("utf-8")
+        sha = hashlib.sha256(raw).hexdigest()
+        path = self.object_path(sha)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(raw))
+            os.replace(tmp, path)
+
+        entry = {
+            "table_id": str(table_id),
+            "kind": kind,
+            "url": url,
+            "sha256": sha,
+            "fetched_utc": datetime.now(timezone.utc).isoformat(),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return sha
+
+    def get(self, sha: str) -> str:
+        return gzip.decompress(self.object_path(sha).read_bytes()).decode("utf-8")
+
+    def latest_by_table(self) -> dict:
+        """table_id -> {kind: sha256} (dernière version archivée de chaque page)."""
+        out = {}
+        if not self.index_path.exists():
+            return out
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    e = json.loads(line)
+                except ValueError:
+                    continue  # ligne tronquée (crash pendant l'écriture)
+                out.setdefault(e["table_id"], {})[e["kind"]] = e["sha256"]
+        return out
+
+
+# =======================
+# Re-parse (workers)
+# =======================
+def moves_from_payload(kind: str, content: str) -> list:
+    """Mêmes règles que le scraper, appliquées à une page archivée."""
+    if kind == KIND_GAMEREVIEW:
+        return parse_gamereview_moves(
+            html_to_text(content), player_links_from_html(content)
+        )
+    if kind == KIND_REPLAY:
+        return moves_from_gamelogs(extract_gamelogs_from_html(content))
+    if kind == KIND_GAMELOGS:
+        return moves_from_gamelogs(json.loads(content))
+    return []
+
+
+def board_size_from_archive(archive, kinds: dict):
+    """
+    (rows, cols) de la table: option lue sur /table (source fiable), sinon
+    texte de /gamereview (règle ancrée puis règle de bga_loader). None si inconnue.
+    """
+    if kinds.get(KIND_TABLE):
+        size = parse_table_page(archive.get(kinds[KIND_TABLE]))["size"]
+        if size is not None:
+            return size
+    if kinds.get(KIND_GAMEREVIEW):
+        text = html_to_text(archive.get(kinds[KIND_GAMEREVIEW]))
+        return detect_board_size_anchored(text) or detect_board_size_loose(text)
+    return None
+
+
+def reparse_table(task):
+    """
+    task = (archive_root, table_id, {kind: sha}, out_dir)
+    Écrit moves_archive_0_table_{id}.json = {"table_id", "moves" (0-based),
+    "size": [rows, cols], "source"} (format dict lu par bga_bulk_import).
+    Retourne (table_id, source | None, erreur | None).
+    """
+    root, table_id, kinds, out_dir = task
+    archive = RawArchive(root)
+    try:
+        for kind in (KIND_GAMEREVIEW, KIND_REPLAY, KIND_GAMELOGS):
+            sha = kinds.get(kind)
+            if not sha:
+                continue
+            moves = moves_from_payload(kind, archive.get(sha))
+            if not moves:
+                continue
+
+            size = board_size_from_archive(archive, kinds)
+            if size is None:
+                return table_id, None, "taille du plateau inconnue (ni /table ni /gamereview)"
+            if kind == KIND_GAMEREVIEW:
+                # gamereview affiche les colonnes 1-based
+                moves = [dict(m, col=m["col"] - 1) for m in moves]
+
+            out_path = Path(out_dir) / f"moves_archive_0_table_{table_id}.json"
+            payload = {
+                "table_id": str(table_id),
+                "moves": moves,
+                "size": list(size),
+                "source": kind,
+            }
+            out_path.write_text(
+                json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8"
+            )
+            return table_id, kind, None
+        return table_id, None, None
+    except Exception as e:
+        return table_id, None, str(e)[:300]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Re-parse hors-ligne des pages BGA archivées -> moves_*.json"
+    )
+    ap.add_argument("--archive", default=str(DEFAULT_ARCHIVE_DIR))
+    ap.add_argument("--out", default=str(DEFAULT_OUT_DIR))
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args(argv)
+
+    archive = RawArchive(args.archive)
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    latest = archive.latest_by_table()
+    tasks = [(args.archive, tid, kinds, str(out_dir)) for tid, kinds in latest.items()]
+    print(f"📦 {len(tasks)} tables archivées dans {archive.root}")
+    if not tasks:
+        return
+
+    t0 = time.perf_counter()
+    by_source = {}
+    n_empty = n_errors = 0
+    with Pool(max(1, args.workers)) as pool:
+        for tid, source, err in pool.imap_unordered(reparse_table, tasks, chunksize=32):
+            if err:
+                n_errors += 1
+                if n_errors <= 20:
+                    print(f"   ⚠️ table {tid}: {err}")
+            elif source is None:
+                n_empty += 1
+            else:
+                by_source[source] = by_source.get(source, 0) + 1
+
+    dt = time.perf_counter() - t0
+    print(
+        f"🎉 {len(tasks)} tables re-parsées en {dt:.1f}s: {by_source}, "
+        f"sans coups={n_empty}, erreurs={n_errors}"
+    )
+    print(f"📁 Fichiers écrits dans {out_dir} (import: bga_bulk_import.py --dir)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+scrape_state.py
+============================================================
+État du scraping BGA (remplace scraped_tables.json)
+✅ SQLite en mode WAL: une ligne par table, clé primaire = table_id
+✅ Appartenance en O(1) (index) au lieu d'un `in` sur une liste
+✅ Écritures incrémentales: un UPSERT par événement, plus de réécriture du fichier
+✅ Statut, erreur, nombre de tentatives et horodatages par table
+✅ Import automatique (une seule fois) de l'ancien scraped_tables.json
+   (ses tables "failed" = import DB en échec -> file de retry, échues tout de suite)
+✅ File de retry persistante: classe d'erreur, backoff exponentiel,
+   nombre max de tentatives (puis abandon "gave_up")
+✅ Marque haute par joueur (table la plus récente déjà couverte) pour le crawl
+   incrémental de /gamestats
+============================================================
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS scrape_state (
+    table_id    TEXT PRIMARY KEY,
+    status      TEXT NOT NULL,             -- ok / skip_size / imported / retry / gave_up
+    scraped     INTEGER NOT NULL DEFAULT 0,
+    imported    INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    first_seen_utc TEXT NOT NULL,
+    scraped_utc    TEXT,
+    imported_utc   TEXT,
+    updated_utc    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scrape_state_status ON scrape_state(status);
+CREATE TABLE IF NOT EXISTS player_watermark (
+    player_id      TEXT PRIMARY KEY,
+    newest_table_id INTEGER NOT NULL,
+    updated_utc    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scrape_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+INSERT_SQL = """
+INSERT INTO scrape_state
+  (table_id, status, scraped, imported, error, attempts,
+   first_seen_utc, scraped_utc, imported_utc, updated_utc)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPSERT_SQL = INSERT_SQL + "ON CONFLICT(table_id) DO UPDATE SET"
+
+# colonnes ajoutées après coup (bases créées par une version précédente)
+MIGRATIONS = (
+    ("error_class", "ALTER TABLE scrape_state ADD COLUMN error_class TEXT"),
+    ("retries", "ALTER TABLE scrape_state ADD COLUMN retries INTEGER NOT NULL DEFAULT 0"),
+    ("next_retry_at", "ALTER TABLE scrape_state ADD COLUMN next_retry_at REAL"),
+)
+
+# classes d'erreur
+ERR_TIMEOUT = "timeout"
+ERR_NO_MOVES = "no_moves"
+ERR_SIZE_UNKNOWN = "size_unknown"
+ERR_DB = "db_error"
+ERR_OTHER = "other"
+
+# politique de retry
+# délais 5 min, 10, 20, 40, 80, 160, 320 min, puis 6 h (plafond):
+# ~17 h entre le 1er échec et l'abandon -> couvre une panne BGA de plusieurs heures
+RETRY_MAX_ATTEMPTS = 9
+RETRY_BASE_DELAY = 300.0  # s, doublé à chaque tentative
+RETRY_MAX_DELAY = 6 * 3600.0
+RETRY_LEASE = 15 * 60.0  # une table réservée par le stage retry n'est pas redistribuée avant
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ScrapeState:
+    """
+    Store partagé par les threads du scraper (une connexion + un verrou).
+    Chaque mark_* est une transaction courte: un crash ne perd au pire
+    que l'événement en cours.
+    """
+
+    def __init__(self, db_path, legacy_json_path=None):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA synchronous=NORMAL;")
+        self.conn.executescript(SCHEMA_SQL)
+        self._migrate()
+        if legacy_json_path is not None:
+            self.import_legacy_json(legacy_json_path)
+
+    def _migrate(self):
+        have = {r[1] for r in self.conn.execute("PRAGMA table_info(scrape_state)")}
+        for column, ddl in MIGRATIONS:
+            if column not in have:
+                self.conn.execute(ddl)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_scrape_state_retry "
+            "ON scrape_state(next_retry_at) WHERE status = 'retry'"
+        )
+        self._failed_to_retry()
+
+    def _failed_to_retry(self):
+        """
+        Ancien statut "failed" (import DB en échec, jamais repris) -> file de
+        retry en ERR_DB, échue tout de suite: le stage retry ré-importe le JSON.
+        """
+        self.conn.execute(
+            """
+            UPDATE scrape_state
+            SET status = 'retry', scraped = 1, error_class = ?, retries = 0,
+                next_retry_at = ?
+            WHERE status = 'failed'
+            """,
+            (ERR_DB, time.time()),
+        )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ---------- lecture ----------
+    def _flag(self, table_id, column: str) -> bool:
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {column} FROM scrape_state WHERE table_id = ?",
+                (str(table_id),),
+            ).fetchone()
+        return bool(row and row[0])
+
+    def is_scraped(self, table_id) -> bool:
+        return self._flag(table_id, "scraped")
+
+    def is_imported(self, table_id) -> bool:
+        return self._flag(table_id, "imported")
+
+    def counts(self) -> dict:
+        with self._lock:
+            scraped, imported, retry, gave_up = self.conn.execute(
+                """
+                SELECT COALESCE(SUM(scraped), 0),
+                       COALESCE(SUM(imported), 0),
+                       COALESCE(SUM(status = 'retry'), 0),
+                       COALESCE(SUM(status = 'gave_up'), 0)
+                FROM scrape_state
+                """
+            ).fetchone()
+        return {
+            "scraped": scraped,
+            "imported": imported,
+            "retry": retry,
+            "gave_up": gave_up,
+        }
+
+    # ---------- écriture ----------
+    def mark_scraped(self, table_id, status: str = "ok"):
+        now = utc_now_iso()
+        with self._lock:
+            self.conn.execute(
+                UPSERT_SQL
+                + """
+                    status = CASE WHEN scrape_state.imported THEN scrape_state.status
+                                  ELSE excluded.status END,
+                    scraped = 1,
+                    scraped_utc = excluded.scraped_utc,
+                    attempts = scrape_state.attempts + 1,
+                    error = NULL,
+                    error_class = NULL,
+                    retries = 0,
+                    next_retry_at = NULL,
+                    updated_utc = excluded.updated_utc
+                """,
+                (str(table_id), status, 1, 0, None, 1, now, now, None, now),
+            )
+
+    def mark_imported(self, table_id):
+        now = utc_now_iso()
+        with self._lock:
+            self.conn.execute(
+                UPSERT_SQL
+                + """
+                    status = 'imported',
+                    imported = 1,
+                    error = NULL,
+                    error_class = NULL,
+                    retries = 0,
+                    next_retry_at = NULL,
+                    imported_utc = excluded.imported_utc,
+                    updated_utc = excluded.updated_utc
+                """,
+                (str(table_id), "imported", 1, 1, None, 1, now, now, now, now),
+            )
+
+    # ---------- retry ----------
+    def schedule_retry(
+        self,
+        table_id,
+        error_class: str,
+        err,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+    ) -> str:
+        """
+        Programme une nouvelle tentative (backoff base_delay * 2^(n-1), plafonné).
+        Après max_attempts échecs la table passe en "gave_up".
+        La table est marquée scrapée: la découverte ne la renvoie plus, seul le
+        stage retry s'en occupe. Retourne le nouveau statut ("retry" / "gave_up").
+        """
+        tid = str(table_id)
+        msg = str(err)[:800] if err is not None else "unknown error"
+        now = utc_now_iso()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT retries FROM scrape_state WHERE table_id = ?", (tid,)
+                ).fetchone()
+                retries = (row[0] if row else 0) + 1
+                if retries >= max_attempts:
+                    status, next_at = "gave_up", None
+                else:
+                    delay = min(max_delay, base_delay * 2 ** (retries - 1))
+                    status, next_at = "retry", time.time() + delay
+                self.conn.execute(
+                    UPSERT_SQL
+                    + """
+                        status = excluded.status,
+                        scraped = 1,
+                        error = excluded.error,
+                        attempts = scrape_state.attempts + 1,
+                        updated_utc = excluded.updated_utc
+                    """,
+                    (tid, status, 1, 0, msg, 1, now, now, None, now),
+                )
+                self.conn.execute(
+                    """
+                    UPDATE scrape_state
+                    SET error_class = ?, retries = ?, next_retry_at = ?
+                    WHERE table_id = ?
+                    """,
+                    (error_class, retries, next_at, tid),
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return status
+
+    def claim_due_retries(self, limit: int = 20, lease: float = RETRY_LEASE) -> list:
+        """
+        Réserve jusqu'à `limit` tables dont le retry est échu: [(table_id, error_class)].
+        La réservation repousse next_retry_at de `lease` secondes (si le process
+        meurt, la table redevient éligible tout seul).
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute(
+                    """
+                    SELECT table_id, error_class FROM scrape_state
+                    WHERE status = 'retry' AND next_retry_at <= ?
+                    ORDER BY next_retry_at
+                    LIMIT ?
+                    """,
+                    (now, int(limit)),
+                ).fetchall()
+                self.conn.executemany(
+                    "UPDATE scrape_state SET next_retry_at = ? WHERE table_id = ?",
+                    [(now + lease, tid) for tid, _ in rows],
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    # ---------- marques hautes par joueur ----------
+    def get_watermark(self, player_id) -> int | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT newest_table_id FROM player_watermark WHERE player_id = ?",
+                (str(player_id),),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, player_id, table_id):
+        """N'avance jamais en arrière (MAX avec la valeur existante)."""
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO player_watermark (player_id, newest_table_id, updated_utc)
+                VALUES (?, ?, ?)
+                ON CONFLICT(player_id) DO UPDATE SET
+                    newest_table_id = MAX(player_watermark.newest_table_id,
+                                          excluded.newest_table_id),
+                    updated_utc = excluded.updated_utc
+                """,
+                (str(player_id), int(table_id), utc_now_iso()),
+            )
+
+    # ---------- migration ----------
+    def import_legacy_json(self, json_path) -> int:
+        """
+        Importe l'ancien cache {"scraped": [...], "imported": [...], "failed": {...}}.
+        Fait une seule fois (clé notée dans scrape_meta); le fichier n'est pas modifié.
+        Retourne le nombre de tables importées.
+        """
+        json_path = Path(json_path)
+        key = f"legacy_json:{json_path.name}"
+        with self._lock:
+            done = self.conn.execute(
+                "SELECT 1 FROM scrape_meta WHERE key = ?", (key,)
+            ).fetchone()
+        if done or not json_path.exists():
+            return 0
+
+        try:
+            data = json.loads(json_path.read_text(encoding="utf-8"))
+        except Exception:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+
+        scraped = {str(x) for x in data.get("scraped", [])}
+        imported = {str(x) for x in data.get("imported", [])}
+        failed = {str(k): str(v)[:800] for k, v in (data.get("failed") or {}).items()}
+        now = utc_now_iso()
+
+        rows = []
+        for tid in scraped | imported | set(failed):
+            if tid in imported:
+                status, error = "imported", None
+            elif tid in failed:
+                status, error = "failed", failed[tid]
+            else:
+                status, error = "ok", None
+            rows.append(
+                (
+                    tid,
+                    status,
+                    int(tid in scraped or tid in imported or tid in failed),
+                    int(tid in imported),
+                    error,
+                    1,
+                    now,
+                    now if tid in scraped else None,
+                    now if tid in imported else None,
+                    now,
+                )
+            )
+
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    INSERT_SQL + "ON CONFLICT(table_id) DO NOTHING",
+                    rows,
+                )
+                self.conn.execute(
+                    "INSERT INTO scrape_meta (key, value) VALUES (?, ?)", (key, now)
+                )
+                self._failed_to_retry()
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return len(rows)
@@ -0,0 +1,182 @@
+"""API: pool de connexions et opening explorer (sans PostgreSQL)."""
+
+import threading
+import time
+
+import psycopg2
+import pytest
+
+import app
+
+
+class FakeConn:
+    def __init__(self):
+        self.closed = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakePool:
+    created = 0
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        type(self).created += 1
+        time.sleep(0.05)  # élargit la fenêtre de course à la création
+        self.maxconn = maxconn
+        self.out = 0
+        self.max_out = 0
+        self.returned = []
+        self.lock = threading.Lock()
+
+    def getconn(self):
+        with self.lock:
+            self.out += 1
+            self.max_out = max(self.max_out, self.out)
+            if self.out > self.maxconn:
+                raise psycopg2.pool.PoolError("connection pool exhausted")
+        return FakeConn()
+
+    def putconn(self, conn, close=False):
+        with self.lock:
+            self.out -= 1
+            self.returned.append(close)
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    FakePool.created = 0
+    monkeypatch.setenv("DATABASE_URL", "postgres://u:p@localhost/db")
+    monkeypatch.setattr(app, "ThreadedConnectionPool", FakePool)
+    monkeypatch.setattr(app, "_POOL", None)
+    monkeypatch.setattr(app, "_POOL_SLOTS", threading.BoundedSemaphore(app.POOL_MAX))
+    return FakePool
+
+
+def test_pool_created_once_under_concurrency(fake_pool):
+    threads = [threading.Thread(target=app.get_pool) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert fake_pool.created == 1
+
+
+def test_requests_wait_for_a_connection_instead_of_failing(fake_pool):
+    errors = []
+
+    def request():
+        try:
+            with app.pooled_conn():
+                time.sleep(0.01)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=request) for _ in range(40)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert app.get_pool().max_out <= app.POOL_MAX
+
+
+def test_broken_connection_is_discarded(fake_pool):
+    with pytest.raises(psycopg2.OperationalError):
+        with app.pooled_conn():
+            raise psycopg2.OperationalError("server closed the connection")
+    with pytest.raises(ValueError):
+        with app.pooled_conn():
+            raise ValueError("requête invalide")
+    assert app.get_pool().returned == [True, False]
+
+
+# ---------- opening explorer ----------
+class StatsCursor:
+    def __init__(self, agg):
+        self.agg = agg
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        rows, cols, h = params
+        self.rows = [
+            (c, *counts) for (r, k, hh, c), counts in self.agg.items() if (r, k, hh) == (rows, cols, h)
+        ]
+
+    def fetchall(self):
+        return self.rows
+
+
+def explorer_with_games(monkeypatch, games, **query):
+    values = []
+    for moves, winner in games:
+        values.extend(app.explorer_rows_for_game(6, 7, "R", moves, winner))
+    agg = app.aggregate_explorer_rows(values)
+
+    class Conn:
+        def cursor(self):
+            return StatsCursor(agg)
+
+    @app.contextmanager
+    def fake_pooled_conn():
+        yield Conn()
+
+    monkeypatch.setattr(app, "pooled_conn", fake_pooled_conn)
+    return app.explorer(rows=6, cols=7, **query)
+
+
+GAMES = [
+    ([3, 3, 3, 3, 2, 2, 2], None),  # pas de résultat -> ignorée
+    ([3, 4, 3, 4, 3, 4, 3], "R"),
+    ([3, 2, 3, 2, 3, 2, 3], "R"),
+    ([2, 3, 2, 3, 2, 3, 2], "R"),
+    ([3, 4, 0, 4, 0, 4, 0, 4], "Y"),
+]
+
+
+def test_explorer_aggregates_outcomes(monkeypatch):
+    res = explorer_with_games(monkeypatch, GAMES)
+    by_col = {c["col"]: c for c in res["candidates"]}
+    assert res["total_games"] == 4
+    assert by_col[3]["games"] == 3
+    assert by_col[3]["red_rate"] == pytest.approx(2 / 3)
+    assert by_col[3]["yellow_rate"] == pytest.approx(1 / 3)
+    assert by_col[2]["games"] == 1 and by_col[2]["red_rate"] == 1.0
+
+
+def test_explorer_merges_mirrored_positions(monkeypatch):
+    # deux parties miroir l'une de l'autre: même position canonique après 3,4 / 3,2
+    games = [
+        ([3, 4, 2, 4, 2, 4, 2, 4], "Y"),
+        ([3, 2, 4, 2, 4, 2, 4, 2], "Y"),
+    ]
+    res = explorer_with_games(monkeypatch, games, moves="3,4")
+    assert [(c["col"], c["games"], c["yellow_rate"]) for c in res["candidates"]] == [(2, 2, 1.0)]
+    res = explorer_with_games(monkeypatch, games, moves="3,2")
+    assert [(c["col"], c["games"]) for c in res["candidates"]] == [(4, 2)]
+
+
+def test_refresh_runs_periodically(monkeypatch):
+    calls = []
+    stop = threading.Event()
+
+    def refresh():
+        calls.append(1)
+        if len(calls) == 3:
+            stop.set()
+        return 0
+
+    monkeypatch.setattr(app, "refresh_explorer_stats", refresh)
+    app.explorer_refresh_loop(every=0.01, stop=stop)
+    assert len(calls) == 3
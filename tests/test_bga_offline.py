@@ -0,0 +1,103 @@
+"""Chemin HTTP du scraper rejoué sur le faux BGA local (aucun Chrome, aucun réseau)."""
+
+import pytest
+
+import bga_to_db
+from bga_fixture_server import fixture_name, start_server
+
+
+@pytest.fixture
+def offline_bga(monkeypatch):
+    server, base = start_server()
+    monkeypatch.setattr(bga_to_db, "BASE", base)
+    monkeypatch.setattr(bga_to_db, "RAW_ARCHIVE", None)
+    yield bga_to_db.HttpFetcher([])
+    server.shutdown()
+    server.server_close()
+
+
+def test_fixture_routes():
+    assert fixture_name("/table?table=700000001") == "table_700000001.html"
+    assert fixture_name("/gamestats?player=111&game_id=1186&finished=1") == "gamestats_111.html"
+    assert (
+        fixture_name("/archive/replay/260101-1000/?table=700000001&player=111")
+        == "replay_700000001.html"
+    )
+    assert fixture_name("/gamepanel?game=connectfour") == "gamepanel.html"
+    assert fixture_name("/table?table=../../etc") is None
+
+
+def test_scrape_table_from_gamereview(offline_bga):
+    result = bga_to_db.scrape_table(None, "700000001", offline_bga)
+    assert result["status"] == "ok"
+    assert result["source"] == "gamereview_http"
+    assert result["size"] == (9, 9)
+    assert [m["col"] for m in result["moves"]] == [5, 6, 5, 6, 5, 6, 5]
+
+
+def test_scrape_table_falls_back_to_replay(offline_bga):
+    result = bga_to_db.scrape_table(None, "700000002", offline_bga)
+    assert result["status"] == "ok"
+    assert result["source"] == "replay_http"
+    assert [m["col"] for m in result["moves"]] == [4, 3, 4, 0]
+
+
+def test_scrape_table_skips_other_sizes(offline_bga):
+    result = bga_to_db.scrape_table(None, "700000003", offline_bga)
+    assert result["status"] == "skip_size"
+    assert result["size"] == (12, 12)
+    assert bga_to_db.classify_failure(result) is None
+
+
+def test_table_without_size_uses_selenium(offline_bga, monkeypatch):
+    # lien replay présent mais taille absente du HTML brut -> visite Selenium
+    visited = []
+
+    class RenderedDriver:
+        page_source = (
+            '<span id="gameoption_100_displayed_value">9x9</span>'
+            '<a href="/archive/replay/1/?table=700000004">replay</a>'
+        )
+
+    class NoWait:
+        def __init__(self, driver, timeout):
+            pass
+
+        def until(self, condition):
+            return True
+
+    monkeypatch.setattr(bga_to_db, "polite_get", lambda driver, url: visited.append(url))
+    monkeypatch.setattr(bga_to_db, "WebDriverWait", NoWait)
+    monkeypatch.setattr(bga_to_db.time, "sleep", lambda s: None)
+
+    info = bga_to_db.load_table_page(RenderedDriver(), "700000004", offline_bga)
+    assert visited == [f"{bga_to_db.BASE}/table?table=700000004"]
+    assert info["size"] == (9, 9)
+
+
+class CountingFetcher:
+    def __init__(self, inner):
+        self.inner = inner
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+        return self.inner.get(url)
+
+
+def test_table_page_is_loaded_once(offline_bga):
+    # 700000002: pas de coups sur /gamereview, lien replay lu sur /table
+    fetcher = CountingFetcher(offline_bga)
+    assert bga_to_db.scrape_table(None, "700000002", fetcher)["status"] == "ok"
+    assert sum("/table?" in u for u in fetcher.urls) == 1
+
+
+def test_known_missing_replay_link_does_not_refetch_table(offline_bga):
+    fetcher = CountingFetcher(offline_bga)
+    assert bga_to_db.fetch_pages_http(fetcher, "700000002", replay_url="") == []
+    assert not any("/table?" in u for u in fetcher.urls)
+
+    fetcher = CountingFetcher(offline_bga)
+    pages = bga_to_db.fetch_pages_http(fetcher, "700000002", replay_url=None)
+    assert [kind for kind, _ in pages] == ["replay"]
+    assert sum("/table?" in u for u in fetcher.urls) == 1
@@ -0,0 +1,100 @@
+from bga_parse import (
+    extract_gamelogs_from_html,
+    html_to_text,
+    moves_from_gamelogs,
+    parse_gamereview_moves,
+    parse_table_page,
+    player_links_from_html,
+)
+from connect4_core import replay_game
+
+
+# ============================================================
+# /gamereview
+# ============================================================
+
+
+def test_html_to_text_one_line_per_log_entry(fixture_html):
+    text = html_to_text(fixture_html("gamereview_700000001.html"))
+    lines = text.splitlines()
+    assert "Alice place un pion dans la colonne 5" in lines
+    assert "Bob & Co place un pion dans la colonne 6" in lines
+    # cellules d'une même ligne de tableau -> même ligne de texte
+    assert "1er Alice 1" in lines
+
+
+def test_html_to_text_skips_script_and_style(fixture_html):
+    text = html_to_text(fixture_html("gamereview_700000001.html"))
+    assert "colonne 9" not in text
+    assert "font-weight" not in text
+
+
+def test_player_links_from_html_normalizes_names(fixture_html):
+    links = player_links_from_html(fixture_html("gamereview_700000001.html"))
+    assert links == {"Alice": "111", "Bob & Co": "222"}
+
+
+def test_parse_gamereview_moves(fixture_html):
+    page = fixture_html("gamereview_700000001.html")
+    moves = parse_gamereview_moves(html_to_text(page), player_links_from_html(page))
+
+    assert [m["col"] for m in moves] == [5, 6, 5, 6, 5, 6, 5]
+    assert [m["move_id"] for m in moves] == list(range(1, 8))
+    assert {m["player_name"]: m["player_id"] for m in moves} == {
+        "Alice": "111",
+        "Bob & Co": "222",
+    }
+    # colonnes 1-based -> partie légale, gagnée par le premier joueur
+    replay = replay_game(9, 9, [m["col"] - 1 for m in moves])
+    assert replay["winner"] == "R" and replay["win_ply"] == 7
+
+
+def test_parse_gamereview_moves_without_review(fixture_html):
+    page = fixture_html("gamereview_700000002.html")
+    assert parse_gamereview_moves(html_to_text(page), player_links_from_html(page)) == []
+
+
+# ============================================================
+# Replay (g_gamelogs)
+# ============================================================
+
+
+def test_extract_gamelogs_from_html(fixture_html):
+    logs = extract_gamelogs_from_html(fixture_html("replay_700000002.html"))
+    assert isinstance(logs, list) and len(logs) == 7
+
+
+def test_extract_gamelogs_missing():
+    assert extract_gamelogs_from_html("<html><body>rien</body></html>") is None
+    assert extract_gamelogs_from_html("<script>var g_gamelogs = [ {cassé</script>") is None
+
+
+def test_moves_from_gamelogs_dedup_and_order(fixture_html):
+    logs = extract_gamelogs_from_html(fixture_html("replay_700000002.html"))
+    assert moves_from_gamelogs(logs) == [
+        {"move_id": 1, "col": 4, "player_id": "333"},
+        {"move_id": 2, "col": 3, "player_id": "444"},
+        {"move_id": 3, "col": 4, "player_id": "333"},
+        {"move_id": 4, "col": 0, "player_id": "444"},
+    ]
+
+
+# ============================================================
+# /table
+# ============================================================
+
+
+def test_parse_table_page(fixture_html):
+    info = parse_table_page(fixture_html("table_700000001.html"), "https://bga.test")
+    assert info["size"] == (9, 9)
+    assert info["replay_url"] == (
+        "https://bga.test/archive/replay/260101-1000/"
+        "?table=700000001&player=111&comments=111;"
+    )
+    assert info["players"] == {"Alice": "111", "Bob & Co": "222"}
+
+
+def test_parse_table_page_other_size_without_replay(fixture_html):
+    info = parse_table_page(fixture_html("table_700000003.html"))
+    assert info["size"] == (12, 12)
+    assert info["replay_url"] is None
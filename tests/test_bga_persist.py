@@ -0,0 +1,62 @@
+"""Étage persist du scraper: état local + JSON + import via bga_import."""
+
+import json
+
+import pytest
+
+import bga_import
+import bga_to_db
+from scrape_state import ScrapeState
+
+
+@pytest.fixture
+def persist_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(bga_to_db, "OUT_DIR", tmp_path)
+    imported = []
+
+    def fake_many(games, conn=None, skip_invalid=False):
+        # seule la connexion PostgreSQL est remplacée: import_into_db ->
+        # bga_import.import_bga_moves sont les vrais
+        games = list(games)
+        imported.extend(games)
+        return [100 + i for i in range(len(games))]
+
+    monkeypatch.setattr(bga_import, "import_bga_moves_many", fake_many)
+    state = ScrapeState(tmp_path / "state.db")
+    yield state, imported
+    state.close()
+
+
+MOVES = [
+    {"move_no": 1, "player_name": "Alice", "player_id": "111", "col": 5},
+    {"move_no": 2, "player_name": "Bob", "player_id": "222", "col": 6},
+]
+
+
+def test_handle_result_imports_the_table(persist_env, tmp_path):
+    state, imported = persist_env
+    counters = bga_to_db.new_counters()
+    result = {"table_id": "700000001", "status": "ok", "moves": MOVES}
+
+    bga_to_db.handle_result(state, result, "Alice", "111", counters)
+
+    assert counters["imported"] == 1 and counters["retry_scheduled"] == 0
+    assert state.is_scraped("700000001") and state.is_imported("700000001")
+    (game,) = imported
+    assert game["moves"] == MOVES
+    assert (game["rows"], game["cols"], game["confiance"]) == (9, 9, 3)
+    assert game["save_name"] == "BGA_table_700000001_from_Alice"
+    assert (tmp_path / "moves_Alice_111_table_700000001.json").exists()
+
+
+def test_handle_reimport_uses_the_saved_json(persist_env, tmp_path):
+    state, imported = persist_env
+    path = tmp_path / "moves_Alice_111_table_700000001.json"
+    path.write_text(json.dumps(MOVES), encoding="utf-8")
+    counters = bga_to_db.new_counters()
+
+    bga_to_db.handle_reimport(state, "700000001", counters)
+
+    assert counters["imported"] == 1
+    assert imported[0]["save_name"] == "BGA_table_700000001_from_Alice"
+    assert state.is_imported("700000001")
@@ -0,0 +1,84 @@
+"""Reconstruction des parties du bot avant export vers saved_games."""
+
+import sqlite3
+
+import pytest
+
+from bot_export import build_row, read_batch, rebuild_columns
+
+
+def test_rebuild_columns_uses_stored_offset():
+    rows = [(0, "111", 5), (1, "222", 4), (2, "111", 5)]
+    assert rebuild_columns(rows, 1) == [4, 3, 4]
+    # plateau 0-based qui n'a jamais utilisé la colonne 0: rien n'est décalé
+    assert rebuild_columns(rows, 0) == [5, 4, 5]
+
+
+def test_unknown_offset_is_rejected():
+    with pytest.raises(ValueError, match="col_offset"):
+        rebuild_columns([(0, "111", 5)], None)
+
+
+def test_ply_0_lost_to_our_fallback_row_is_rejected():
+    # ancienne base: notre ligne "ME" d'index 0 a pris la place du coup JS 0
+    rows = [(0, "ME", 5), (1, "222", 4), (2, "111", 5)]
+    with pytest.raises(ValueError, match="contigus"):
+        rebuild_columns(rows, 0)
+
+
+def test_gap_in_js_indices_is_rejected():
+    with pytest.raises(ValueError, match="contigus"):
+        rebuild_columns([(0, "111", 5), (2, "222", 4)], 0)
+
+
+def test_column_off_the_board_is_rejected():
+    with pytest.raises(ValueError):
+        build_row(1, "123", [(0, "111", 0)], (1, 9, 9))
+
+
+def test_build_row_complete_game():
+    rows = [(i, "p", c) for i, c in enumerate([1, 2, 1, 2, 1, 2, 1])]
+    conf, row = build_row(7, "123", rows, (1, 9, 9))
+    assert conf == 2
+    assert row[3] == [0, 1, 0, 1, 0, 1, 0]
+    assert row[4]["winner"] == "R"
+
+
+def test_build_row_uses_the_stored_board_size():
+    # nul sur 6x7: 42 pions, plateau plein (sur 9x9 la partie serait "incomplète")
+    order = [0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0]
+    cols = []
+    for a, b in ((0, 1), (2, 3), (4, 5)):
+        cols += [(a, b)[i] for i in order]
+    cols += [6] * 6
+    rows = [(i, "p", c) for i, c in enumerate(cols)]
+    conf, row = build_row(8, "123", rows, (0, 6, 7))
+    assert (row[1], row[2]) == (6, 7)
+    assert row[4]["winner"] == "D"
+    assert conf == 2
+
+
+def test_unknown_board_size_is_rejected():
+    with pytest.raises(ValueError, match="taille"):
+        build_row(1, "123", [(0, "111", 4)], (0, None, None))
+
+
+def test_read_batch_without_board_columns(tmp_path):
+    # base créée avant col_offset / board_rows / board_cols: lus comme NULL
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute(
+        "CREATE TABLE games_live (id INTEGER PRIMARY KEY, bga_table_id TEXT, "
+        "game_name TEXT, started_at_utc TEXT, ended_at_utc TEXT, status TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE moves_live (id INTEGER PRIMARY KEY, game_id INTEGER, "
+        "move_index INTEGER, player TEXT, col INTEGER, raw TEXT, created_at_utc TEXT)"
+    )
+    conn.execute("INSERT INTO games_live VALUES (1, '9', 'connectfour', 'x', 'y', 'FINISHED')")
+    conn.execute("INSERT INTO moves_live VALUES (1, 1, 0, '111', 4, NULL, 'x')")
+    games, moves, horizon = read_batch(conn, 0, 10, "z")
+    conn.close()
+    assert games == [(1, "9", "FINISHED", None, None, None)]
+    assert moves == {1: [(0, "111", 4)]}
+    assert horizon is None
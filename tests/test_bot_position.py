@@ -0,0 +1,66 @@
+"""Position du moteur reconstruite depuis les coups lus côté page."""
+
+import pytest
+
+pytest.importorskip("undetected_chromedriver")
+
+from main import BGABot  # noqa: E402
+
+
+class FakeSquare:
+    def __init__(self, col):
+        self.col = col
+
+    def get_attribute(self, name):
+        return str(self.col) if name == "data-col" else None
+
+
+class FakeDriver:
+    def __init__(self, discs, rows=9, cols=9, base=0):
+        self.discs = discs
+        self.squares = [FakeSquare(base + c) for _ in range(rows) for c in range(cols)]
+
+    def execute_script(self, script, *args):
+        return self.discs
+
+    def find_elements(self, by, selector):
+        return self.squares
+
+
+def bot_with(js_cols, discs, rows=9, cols=9, base=0):
+    bot = object.__new__(BGABot)
+    bot.driver = FakeDriver(discs, rows, cols, base)
+    bot.js_cols = dict(js_cols)
+    bot.col_offset = bot.board_rows = bot.board_cols = None
+    bot.current_game_id = None
+    assert bot.read_board()
+    return bot
+
+
+def test_contiguous_history_matching_board():
+    pos = bot_with({0: 4, 1: 3, 2: 4}, discs=3).current_position()
+    assert pos is not None
+
+
+def test_gap_in_move_index_is_rejected():
+    # index 1 absent (entrée de log sans coup, ou coup manqué)
+    assert bot_with({0: 4, 2: 3, 3: 4}, discs=3).current_position() is None
+
+
+def test_history_shorter_than_board_is_rejected():
+    assert bot_with({0: 4, 1: 3}, discs=3).current_position() is None
+    assert bot_with({0: 4, 1: 3}, discs=None).current_position() is None
+
+
+def test_board_size_read_from_the_page():
+    bot = bot_with({0: 1, 1: 7}, discs=2, rows=6, cols=7, base=1)
+    assert (bot.board_rows, bot.board_cols, bot.col_offset) == (6, 7, 1)
+    pos = bot.current_position()
+    assert (pos.rows, pos.cols) == (6, 7)
+
+
+def test_history_impossible_on_the_real_board_is_rejected():
+    # 7 pions dans une colonne: légal en 9x9, pas sur un plateau de 6 lignes
+    js_cols = {i: 3 for i in range(7)}
+    assert bot_with(js_cols, discs=7, rows=9, cols=9).current_position() is not None
+    assert bot_with(js_cols, discs=7, rows=6, cols=7).current_position() is None
@@ -0,0 +1,28 @@
+"""DBWriter write-behind: échecs du thread writer remontés à l'appelant."""
+
+import pytest
+
+pytest.importorskip("undetected_chromedriver")
+
+from main import DBWriter  # noqa: E402
+
+
+def test_connect_error_is_raised_at_startup(tmp_path):
+    with pytest.raises(Exception):
+        DBWriter(db_path=str(tmp_path / "absent" / "bot.db"), write_behind=True)
+
+
+def test_call_fails_when_writer_is_dead(tmp_path):
+    db = DBWriter(db_path=str(tmp_path / "bot.db"), write_behind=True)
+    db.CALL_POLL = 0.05
+    db.close()
+    with pytest.raises(RuntimeError):
+        db.start_game("connectfour", "1")
+
+
+def test_write_behind_roundtrip(tmp_path):
+    db = DBWriter(db_path=str(tmp_path / "bot.db"), write_behind=True)
+    try:
+        assert db.start_game("connectfour", "1") == 1
+    finally:
+        db.close()
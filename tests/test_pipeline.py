@@ -0,0 +1,42 @@
+"""Étages du pipeline: un item qui fait lever l'étage n'est pas perdu."""
+
+from pipeline import Channel, Stage
+
+
+def run_stage(fn, items, on_error=None):
+    in_ch = Channel("in", 10)
+    out_ch = Channel("out", 10)  # sans consommateur: les sorties restent dans la file
+    stage = Stage("test", fn, in_ch, out_ch, [None, None], on_error=on_error)
+    in_ch.add_producer()
+    stage.start()
+    for it in items:
+        in_ch.put(it)
+    in_ch.producer_done()
+    stage.join()
+    return stage, list(out_ch.q.queue)
+
+
+def boom_on_odd(ctx, item):
+    if item % 2:
+        raise ValueError(f"item {item}")
+    return [("ok", item)]
+
+
+def test_error_without_handler_is_counted_and_dropped():
+    stage, outputs = run_stage(boom_on_odd, [0, 1, 2])
+    assert sorted(outputs) == [("ok", 0), ("ok", 2)]
+    assert (stage.n_in, stage.n_out, stage.n_errors) == (3, 2, 1)
+
+
+def test_error_is_forwarded_by_on_error():
+    def on_error(ctx, item, exc):
+        return [("error", item, str(exc))]
+
+    stage, outputs = run_stage(boom_on_odd, [0, 1, 2, 3], on_error=on_error)
+    assert sorted(outputs) == [
+        ("error", 1, "item 1"),
+        ("error", 3, "item 3"),
+        ("ok", 0),
+        ("ok", 2),
+    ]
+    assert (stage.n_in, stage.n_out, stage.n_errors) == (4, 4, 2)
@@ -0,0 +1,20 @@
+"""Générateur NumPy: lots successifs, parties valides rejouées par connect4_core."""
+
+import types
+
+from connect4_core import replay_game
+from random_games_np import generate_random_games, iter_games
+
+
+def test_yields_batches_without_concatenating():
+    gen = generate_random_games(2500, rows=6, cols=7, seed=3, batch_size=1000)
+    assert isinstance(gen, types.GeneratorType)
+    sizes = [len(batch["lengths"]) for batch in gen]
+    assert sizes == [1000, 1000, 500]
+
+
+def test_games_replay_with_the_same_result():
+    for batch in generate_random_games(300, rows=6, cols=7, starting_color="random", seed=7, batch_size=128):
+        for moves, winner, starting in iter_games(batch):
+            res = replay_game(6, 7, moves, starting)
+            assert res["winner"] == (winner or "D")
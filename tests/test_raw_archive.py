@@ -0,0 +1,86 @@
+import json
+
+from bga_bulk_import import parse_file
+from raw_archive import (
+    KIND_GAMEREVIEW,
+    KIND_REPLAY,
+    KIND_TABLE,
+    RawArchive,
+    reparse_table,
+)
+
+
+def archive_pages(tmp_path, fixture_html, table_id, pages):
+    archive = RawArchive(tmp_path / "raw_pages")
+    for kind, name in pages:
+        archive.put(table_id, kind, fixture_html(name))
+    return archive
+
+
+def run_reparse(tmp_path, archive, table_id):
+    out_dir = tmp_path / "out"
+    out_dir.mkdir(exist_ok=True)
+    kinds = archive.latest_by_table()[table_id]
+    result = reparse_table((str(archive.root), table_id, kinds, str(out_dir)))
+    return result, out_dir / f"moves_archive_0_table_{table_id}.json"
+
+
+def test_reparse_gamereview_writes_size_and_0_based(tmp_path, fixture_html):
+    archive = archive_pages(
+        tmp_path,
+        fixture_html,
+        "700000001",
+        [(KIND_TABLE, "table_700000001.html"), (KIND_GAMEREVIEW, "gamereview_700000001.html")],
+    )
+    result, out = run_reparse(tmp_path, archive, "700000001")
+    assert result == ("700000001", KIND_GAMEREVIEW, None)
+
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["size"] == [9, 9]
+    assert [m["col"] for m in data["moves"]] == [4, 5, 4, 5, 4, 5, 4]
+
+    _name, row, err = parse_file(str(out))
+    assert err is None
+    assert row[1:4] == (9, 9, [4, 5, 4, 5, 4, 5, 4])
+    assert row[4]["winner"] == "R"
+
+
+def test_reparse_keeps_non_9x9_size(tmp_path, fixture_html):
+    # même page gamereview, mais /table annonce un 12x12
+    archive = archive_pages(
+        tmp_path,
+        fixture_html,
+        "700000003",
+        [(KIND_TABLE, "table_700000003.html"), (KIND_GAMEREVIEW, "gamereview_700000001.html")],
+    )
+    _result, out = run_reparse(tmp_path, archive, "700000003")
+    _name, row, err = parse_file(str(out))
+    assert err is None
+    assert (row[1], row[2]) == (12, 12)
+
+
+def test_reparse_replay(tmp_path, fixture_html):
+    archive = archive_pages(
+        tmp_path,
+        fixture_html,
+        "700000002",
+        [
+            (KIND_TABLE, "table_700000002.html"),
+            (KIND_GAMEREVIEW, "gamereview_700000002.html"),
+            (KIND_REPLAY, "replay_700000002.html"),
+        ],
+    )
+    result, out = run_reparse(tmp_path, archive, "700000002")
+    assert result[1] == KIND_REPLAY
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["size"] == [9, 9]
+    assert [m["col"] for m in data["moves"]] == [4, 3, 4, 0]
+
+
+def test_reparse_unknown_size_is_an_error(tmp_path, fixture_html):
+    archive = archive_pages(
+        tmp_path, fixture_html, "700000002", [(KIND_REPLAY, "replay_700000002.html")]
+    )
+    result, out = run_reparse(tmp_path, archive, "700000002")
+    assert result[1] is None and "taille" in result[2]
+    assert not out.exists()
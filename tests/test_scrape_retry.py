@@ -0,0 +1,83 @@
+"""Classement des échecs du scraper (timeouts) et backoff de la file de retry."""
+
+import json
+import socket
+
+import bga_to_db
+from scrape_state import (
+    ERR_DB,
+    ERR_TIMEOUT,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY,
+    ScrapeState,
+)
+from selenium.common.exceptions import TimeoutException
+
+
+class TimeoutFetcher:
+    def get(self, url):
+        raise socket.timeout("timed out")
+
+
+def fake_table_page(size, timeout=None):
+    def load(driver, table_id, fetcher=None):
+        return {"size": size, "players": {}, "replay_url": None, "html": "", "timeout": timeout}
+
+    return load
+
+
+def test_timeouts_are_not_recorded_as_no_moves(monkeypatch):
+    def gamereview_timeout(driver, tid):
+        raise TimeoutException("gamereview")
+
+    monkeypatch.setattr(bga_to_db, "load_table_page", fake_table_page((9, 9)))
+    monkeypatch.setattr(
+        bga_to_db, "extract_size_and_moves_from_gamereview", gamereview_timeout
+    )
+    monkeypatch.setattr(bga_to_db, "resolve_real_replay_url_from_table", lambda d, t: None)
+
+    result = bga_to_db.scrape_table(None, "700000009", TimeoutFetcher())
+    assert result["status"] == "error"
+    assert bga_to_db.classify_failure(result) == ERR_TIMEOUT
+
+
+def test_table_timeout_is_not_size_unknown(monkeypatch):
+    monkeypatch.setattr(
+        bga_to_db, "load_table_page", fake_table_page(None, TimeoutException("/table"))
+    )
+    result = bga_to_db.scrape_table(None, "700000009", None)
+    assert bga_to_db.classify_failure(result) == ERR_TIMEOUT
+
+
+def test_backoff_reaches_max_delay_before_giving_up(tmp_path, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr("scrape_state.time.time", lambda: now)
+    state = ScrapeState(tmp_path / "state.db")
+    delays = []
+    for _ in range(RETRY_MAX_ATTEMPTS - 1):
+        assert state.schedule_retry("1", ERR_TIMEOUT, "timeout") == "retry"
+        (next_at,) = state.conn.execute(
+            "SELECT next_retry_at FROM scrape_state WHERE table_id = '1'"
+        ).fetchone()
+        delays.append(next_at - now)
+    assert state.schedule_retry("1", ERR_TIMEOUT, "timeout") == "gave_up"
+    state.close()
+
+    assert delays == sorted(delays)
+    assert delays[-1] == RETRY_MAX_DELAY
+    assert sum(delays) >= 12 * 3600
+
+
+def test_legacy_failed_tables_are_retried(tmp_path):
+    legacy = tmp_path / "scraped_tables.json"
+    legacy.write_text(
+        json.dumps({"scraped": ["1", "2"], "imported": ["1"], "failed": {"2": "boom"}}),
+        encoding="utf-8",
+    )
+    state = ScrapeState(tmp_path / "state.db", legacy_json_path=legacy)
+    try:
+        assert state.claim_due_retries() == [("2", ERR_DB)]
+        assert state.counts()["retry"] == 1
+        assert state.is_imported("1")
+    finally:
+        state.close()